@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import Order, OrderItem
+from .models import Order, OrderItem, OutboxMessage
 
 
 class OrderItemInline(admin.TabularInline):
@@ -12,3 +12,9 @@ class OrderAdmin(admin.ModelAdmin):
     list_display = ("id", "store", "status", "created_at")
     list_filter = ("status", "store")
     inlines = [OrderItemInline]
+
+
+@admin.register(OutboxMessage)
+class OutboxMessageAdmin(admin.ModelAdmin):
+    list_display = ("id", "topic", "status", "attempts", "created_at", "sent_at")
+    list_filter = ("status", "topic")
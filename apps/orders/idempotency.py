@@ -0,0 +1,148 @@
+import hashlib
+import json
+import threading
+import time
+
+from django.conf import settings
+from rest_framework.utils.encoders import JSONEncoder
+
+from project.lru import LocalLRU
+from project.redis_client import REDIS_ERRORS, redis_client
+
+PENDING = b"__pending__"
+
+
+class IdempotencyConflict(Exception):
+    """The key is still being processed by another request (wait timed out)."""
+
+
+class IdempotencyMismatch(Exception):
+    """The key was already used with a different request body."""
+
+
+def fingerprint(data):
+    return hashlib.sha256(
+        json.dumps(data, sort_keys=True, cls=JSONEncoder).encode()
+    ).hexdigest()
+
+
+class LocalLRUStore:
+    """
+    Completed responses in a bounded LocalLRU, used when Redis is down.
+    In-flight keys carry an Event so duplicates wait for the first request.
+    """
+
+    def __init__(self, max_entries):
+        self._entries = LocalLRU(max_entries)
+        self._pending = {}  # key -> threading.Event
+        self._lock = threading.Lock()
+
+    def claim(self, key, timeout):
+        """Returns None if the caller now owns the key, else the stored value."""
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._lock:
+                value = self._entries.get(key)
+                if value is not None:
+                    return value
+                event = self._pending.get(key)
+                if event is None:
+                    self._pending[key] = threading.Event()
+                    return None
+            if not event.wait(max(0, deadline - time.monotonic())):
+                raise IdempotencyConflict(key)
+
+    def store(self, key, value, ttl):
+        with self._lock:
+            self._entries.set(key, value, ttl)
+            event = self._pending.pop(key, None)
+        if event:
+            event.set()
+
+    def release(self, key):
+        with self._lock:
+            event = self._pending.pop(key, None)
+        if event:
+            event.set()
+
+
+class IdempotencyStore:
+    """
+    Stores the serialized response of a request under its Idempotency-Key.
+
+    Redis is used when reachable: the first request claims the key with
+    SET NX (value PENDING, expiring after `lock_ttl`), duplicates poll until
+    the final response is written (kept for `ttl`). A claim that is never
+    completed or released (worker died, release failed) only blocks retries
+    until the lock expires. When Redis is unreachable we fall back to a bounded in-process
+    LRU so retries on the same worker are still de-duplicated.
+    """
+
+    poll_interval = 0.01
+
+    def __init__(self, client, ttl, lock_ttl, local_max_entries, wait_timeout):
+        self.client = client
+        self.ttl = ttl
+        self.lock_ttl = lock_ttl
+        self.wait_timeout = wait_timeout
+        self.local = LocalLRUStore(local_max_entries)
+
+    def key(self, scope, idempotency_key):
+        return f"idem:{scope}:{idempotency_key}"
+
+    def begin(self, key, request_fingerprint):
+        """
+        Claim `key`. Returns None when the caller must process the request,
+        or the stored (status_code, data) when it was already processed.
+        """
+        try:
+            raw = self._claim_redis(key)
+        except REDIS_ERRORS:
+            raw = self.local.claim(key, self.wait_timeout)
+        if raw is None:
+            return None
+
+        stored = json.loads(raw)
+        if stored["fingerprint"] != request_fingerprint:
+            raise IdempotencyMismatch(key)
+        return stored["status"], stored["data"]
+
+    def _claim_redis(self, key):
+        deadline = time.monotonic() + self.wait_timeout
+        while True:
+            if self.client.set(key, PENDING, nx=True, ex=self.lock_ttl):
+                return None
+            raw = self.client.get(key)
+            if raw is not None and raw != PENDING:
+                return raw
+            if time.monotonic() >= deadline:
+                raise IdempotencyConflict(key)
+            time.sleep(self.poll_interval)
+
+    def complete(self, key, request_fingerprint, status_code, data):
+        raw = json.dumps(
+            {"fingerprint": request_fingerprint, "status": status_code, "data": data},
+            cls=JSONEncoder,
+        )
+        try:
+            self.client.set(key, raw, ex=self.ttl)
+        except REDIS_ERRORS:
+            pass
+        self.local.store(key, raw, self.ttl)
+
+    def release(self, key):
+        """Forget an in-flight key so the client can retry (request failed)."""
+        try:
+            self.client.delete(key)
+        except REDIS_ERRORS:
+            pass
+        self.local.release(key)
+
+
+idempotency_store = IdempotencyStore(
+    redis_client,
+    ttl=settings.IDEMPOTENCY_TTL,
+    lock_ttl=settings.IDEMPOTENCY_LOCK_TTL,
+    local_max_entries=settings.IDEMPOTENCY_LOCAL_MAX_ENTRIES,
+    wait_timeout=settings.IDEMPOTENCY_WAIT_TIMEOUT,
+)
@@ -0,0 +1,128 @@
+import queue
+import threading
+import time
+from concurrent.futures import Future, TimeoutError
+
+from django.conf import settings
+from django.db import close_old_connections, transaction
+
+from project.metrics import Histogram
+from .services import place_order
+
+
+class IntakeTimeout(Exception):
+    """The order's batch did not start within ORDER_BATCH_RESULT_TIMEOUT; it was withdrawn, not placed."""
+
+
+class OrderIntakeQueue:
+    """
+    Group-commit intake for order placement.
+
+    Callers submit (store, items) and block on a Future. A single worker
+    thread drains the queue in micro-batches (ORDER_BATCH_MAX_SIZE orders or
+    ORDER_BATCH_MAX_WAIT_MS, whichever comes first) and places the whole
+    batch in ONE transaction. Every order runs in its own savepoint, so it is
+    still confirmed or rejected on its own stock, and an error in one order
+    (e.g. unknown product) only fails that caller.
+    """
+
+    def __init__(self):
+        self._queue = queue.Queue()
+        self._worker = None
+        self._start_lock = threading.Lock()
+        self.batch_size = Histogram((1, 2, 4, 8, 16, 32, 64, 128))
+        # seconds from submit() until the batch containing the order committed
+        self.latency = Histogram((0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1))
+        # seconds spent inside the batch transaction
+        self.commit_time = Histogram((0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1))
+
+    def submit(self, store, items_data):
+        """
+        Queue an order and wait for the batch that places it. Returns the Order.
+
+        Raises IntakeTimeout if no batch picked the order up in time. The
+        order is cancelled then, so it is never placed and the client can
+        safely retry; once its batch has started, the batch's result is
+        awaited instead.
+        """
+        self._ensure_worker()
+        future = Future()
+        self._queue.put((store, items_data, future, time.perf_counter()))
+        try:
+            return future.result(timeout=settings.ORDER_BATCH_RESULT_TIMEOUT)
+        except TimeoutError:
+            if future.cancel():
+                raise IntakeTimeout() from None
+        return future.result()
+
+    def stats(self):
+        return {
+            "pending": self._queue.qsize(),
+            "batch_size": self.batch_size.snapshot(),
+            "latency_seconds": self.latency.snapshot(),
+            "commit_seconds": self.commit_time.snapshot(),
+        }
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._start_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(
+                    target=self._run, name="order-intake", daemon=True
+                )
+                self._worker.start()
+
+    def _next_batch(self):
+        batch = [self._queue.get()]
+        max_size = settings.ORDER_BATCH_MAX_SIZE
+        deadline = time.perf_counter() + settings.ORDER_BATCH_MAX_WAIT_MS / 1000
+        while len(batch) < max_size:
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            close_old_connections()
+            self._place_batch(batch)
+
+    def _place_batch(self, batch):
+        # drop orders whose caller gave up waiting; the rest can no longer be cancelled
+        batch = [entry for entry in batch if entry[2].set_running_or_notify_cancel()]
+        if not batch:
+            return
+        results = []
+        start = time.perf_counter()
+        try:
+            with transaction.atomic():
+                for store, items_data, future, _ in batch:
+                    try:
+                        with transaction.atomic():
+                            results.append((future, place_order(store, items_data), None))
+                    except Exception as exc:
+                        results.append((future, None, exc))
+        except Exception as exc:
+            # the batch transaction itself failed: nothing was committed
+            for _, _, future, _ in batch:
+                future.set_exception(exc)
+            return
+
+        done = time.perf_counter()
+        self.batch_size.observe(len(batch))
+        self.commit_time.observe(done - start)
+        for (_, _, _, submitted), (future, order, exc) in zip(batch, results):
+            self.latency.observe(done - submitted)
+            if exc is not None:
+                future.set_exception(exc)
+            else:
+                future.set_result(order)
+
+
+intake_queue = OrderIntakeQueue()
@@ -0,0 +1,40 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from apps.orders.outbox import dispatch_pending
+
+
+class Command(BaseCommand):
+    help = "Publish pending outbox messages (order confirmation emails) in batches"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--batch-size", type=int, default=500)
+        parser.add_argument(
+            "--loop", action="store_true", help="Keep polling instead of exiting when drained"
+        )
+        parser.add_argument("--interval", type=float, default=1.0, help="Poll interval in seconds")
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        while True:
+            start = time.perf_counter()
+            total = 0
+            try:
+                while True:
+                    sent = dispatch_pending(batch_size)
+                    if not sent:
+                        break
+                    total += sent
+            except Exception as exc:
+                self.stderr.write(f"Dispatch failed, will retry: {exc}")
+
+            elapsed = time.perf_counter() - start
+            if total:
+                self.stdout.write(
+                    f"Dispatched {total} messages in {elapsed:.3f}s "
+                    f"({total / elapsed:.0f} msg/s)"
+                )
+            if not options["loop"]:
+                break
+            time.sleep(options["interval"])
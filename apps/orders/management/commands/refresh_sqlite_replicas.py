@@ -0,0 +1,47 @@
+import sqlite3
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import DEFAULT_DB_ALIAS, connections
+
+
+class Command(BaseCommand):
+    help = (
+        "Copy the default SQLite database into every SQLite replica (DATABASE_REPLICAS), "
+        "standing in for replication when trying replica routing locally"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--every", type=float, default=None, help="keep copying, every this many seconds (Ctrl-C to stop)"
+        )
+
+    def handle(self, *args, **options):
+        primary = connections[DEFAULT_DB_ALIAS]
+        if primary.vendor != "sqlite":
+            raise CommandError("The default database is not SQLite; replicate it with the database's own tools")
+        if not settings.DATABASE_REPLICAS:
+            raise CommandError("No replicas configured; set DATABASE_REPLICAS to one or more SQLite files")
+        while True:
+            started = time.perf_counter()
+            for alias in settings.DATABASE_REPLICAS:
+                copy_database(primary, connections[alias])
+            self.stdout.write(
+                f"Copied {primary.settings_dict['NAME']} to {len(settings.DATABASE_REPLICAS)} replicas "
+                f"in {time.perf_counter() - started:.2f}s"
+            )
+            if options["every"] is None:
+                return
+            time.sleep(options["every"])
+
+
+def copy_database(primary, replica):
+    """Online copy through SQLite's backup API: readers of the primary aren't blocked."""
+    replica.close()
+    primary.ensure_connection()
+    target = sqlite3.connect(replica.settings_dict["NAME"])
+    try:
+        primary.connection.backup(target)
+    finally:
+        target.close()
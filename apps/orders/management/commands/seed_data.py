@@ -1,61 +1,278 @@
-from django.core.management.base import BaseCommand
-from faker import Faker
+import itertools
+import multiprocessing
 import random
+import time
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+from django.utils import timezone
+from faker import Faker
 
+from apps.orders.models import Order, OrderItem, OutboxMessage
 from apps.products.models import Category, Product
-from apps.stores.models import Store, Inventory
+from apps.stores.availability import is_enabled as availability_enabled, rebuild_availability
+from apps.stores.models import Store, Inventory, StoreProductAvailability
+from apps.search.backends import get_search_backend, index_tables
+from apps.search.signals import bump_generations
 
-fake = Faker()
+CATEGORY_NAMES = ["Electronics", "Books", "Groceries", "Fashion", "Home"]
+ORDER_HISTORY_DAYS = 90
+REJECTED_SHARE = 0.1
 
+# everything generate_* needs, set before the worker processes are forked
+_state = {}
 
-class Command(BaseCommand):
-    help = "Seed dummy data for categories, products, stores, and inventory"
 
-    def handle(self, *args, **options):
-        self.stdout.write("Seeding data...")
+def chunk_rng(phase, index):
+    """Per-chunk RNG: with explicit ids, the data only depends on --seed, not on --workers."""
+    return random.Random(f"{_state['seed']}:{phase}:{index}")
 
-        Category.objects.all().delete()
-        Product.objects.all().delete()
-        Store.objects.all().delete()
-        Inventory.objects.all().delete()
 
-        categories = [
-            Category.objects.create(name=name)
-            for name in ["Electronics", "Books", "Groceries", "Fashion", "Home"]
-        ]
+def build_text_pool(seed, size=2000):
+    """Faker is slow per call, so rows draw from text generated once up front."""
+    fake = Faker()
+    fake.seed_instance(seed)
+    return {
+        "words": [fake.word() for _ in range(size)],
+        "descriptions": [fake.text(max_nb_chars=100) for _ in range(size // 4)],
+        "companies": [fake.company() for _ in range(size // 4)],
+        "cities": [fake.city() for _ in range(size // 4)],
+    }
 
-        products = []
-        for _ in range(200):
-            cat = random.choice(categories)
-            products.append(
-                Product.objects.create(
-                    title=fake.sentence(nb_words=3),
-                    description=fake.text(max_nb_chars=100),
-                    price=round(random.uniform(50, 5000), 2),
-                    category=cat,
-                )
-            )
 
-        stores = []
-        for _ in range(5):
-            stores.append(
-                Store.objects.create(
-                    name=fake.company(),
-                    location=fake.city(),
-                )
-            )
+def zipf_cum_weights(n, exponent):
+    """Cumulative Zipf weights of ranks 1..n, for random.choices(cum_weights=...)."""
+    return list(itertools.accumulate(1 / rank**exponent for rank in range(1, n + 1)))
+
+
+def zipf_stock_factor(cum_weights, target):
+    """
+    c such that sum(min(1, c * w_r)) == target, with w_r the Zipf weight of
+    rank r: the popular head is stocked everywhere, the tail proportionally.
+    """
+    n = len(cum_weights)
+    if target >= n:
+        return float("inf")
+    for head in range(int(target) + 1):
+        # ranks 1..head are always stocked, rank r > head with c * w_r
+        done = cum_weights[head - 1] if head else 0.0
+        c = (target - head) / (cum_weights[-1] - done)
+        if c * (cum_weights[head] - done) <= 1:
+            return c
+    return float("inf")
 
-        for store in stores:
-            sample_products = random.sample(products, 80)
+
+def generate_products(index, start, count):
+    rng = chunk_rng("products", index)
+    pool = _state["pool"]
+    words, descriptions = pool["words"], pool["descriptions"]
+    category_ids = _state["category_ids"]
+    products = [
+        Product(
+            id=product_id,
+            title=" ".join(rng.choices(words, k=3)).capitalize(),
+            description=rng.choice(descriptions),
+            price=round(rng.uniform(50, 5000), 2),
+            category_id=rng.choice(category_ids),
+        )
+        for product_id in range(start + 1, start + count + 1)
+    ]
+    with transaction.atomic():
+        Product.objects.bulk_create(products, batch_size=_state["batch_size"])
+    return count
+
+
+def generate_inventory(index, store_id):
+    rng = chunk_rng("inventory", index)
+    ranked = _state["ranked_product_ids"]
+    if _state["zipf"]:
+        factor = _state["stock_factor"]
+        exponent = _state["exponent"]
+        product_ids = [
+            product_id
+            for rank, product_id in enumerate(ranked, start=1)
+            if rng.random() < factor / rank**exponent
+        ]
+    else:
+        product_ids = rng.sample(ranked, round(len(ranked) * _state["coverage"]))
+    batch = _state["batch_size"]
+    for start in range(0, len(product_ids), batch):
+        with transaction.atomic():
             Inventory.objects.bulk_create(
                 [
-                    Inventory(
-                        store=store,
-                        product=p,
-                        quantity=random.randint(0, 100),
-                    )
-                    for p in sample_products
+                    Inventory(store_id=store_id, product_id=product_id, quantity=rng.randint(0, 100))
+                    for product_id in product_ids[start:start + batch]
                 ]
             )
+    return len(product_ids)
+
+
+def generate_orders(index, start, count):
+    rng = chunk_rng("orders", index)
+    now = timezone.now()
+    store_ids = _state["store_ids"]
+    ranked = _state["ranked_product_ids"]
+    if _state["zipf"]:
+        stores = rng.choices(store_ids, cum_weights=_state["store_cum_weights"], k=count)
+    else:
+        stores = rng.choices(store_ids, k=count)
+    orders = [
+        Order(
+            id=start + i + 1,
+            store_id=store_id,
+            status=Order.STATUS_REJECTED if rng.random() < REJECTED_SHARE else Order.STATUS_CONFIRMED,
+            created_at=now - timedelta(seconds=rng.uniform(0, ORDER_HISTORY_DAYS * 86400)),
+        )
+        for i, store_id in enumerate(stores)
+    ]
+    with transaction.atomic():
+        Order.objects.bulk_create(orders, batch_size=_state["batch_size"])
+        items = []
+        for order in orders:
+            lines = rng.randint(1, 4)
+            if _state["zipf"]:
+                product_ids = rng.choices(ranked, cum_weights=_state["product_cum_weights"], k=lines)
+            else:
+                product_ids = rng.choices(ranked, k=lines)
+            items.extend(
+                OrderItem(order_id=order.id, product_id=product_id, quantity_requested=rng.randint(1, 5))
+                for product_id in set(product_ids)
+            )
+        OrderItem.objects.bulk_create(items, batch_size=_state["batch_size"])
+    return count
+
+
+def chunk_tasks(function, total, size):
+    """(function, (index, start, count)) per `size` rows of `total`."""
+    return [(function, (i, start, min(size, total - start))) for i, start in enumerate(range(0, total, size))]
+
+
+def run_task(task):
+    function, args = task
+    return function(*args)
+
+
+class Command(BaseCommand):
+    help = "Seed dummy data for categories, products, stores, inventory and orders"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--products", type=int, default=200)
+        parser.add_argument("--stores", type=int, default=5)
+        parser.add_argument("--orders", type=int, default=0)
+        parser.add_argument(
+            "--coverage", type=float, default=0.4, help="share of the catalog each store stocks (0-1)"
+        )
+        parser.add_argument(
+            "--distribution",
+            choices=["uniform", "zipf"],
+            default="uniform",
+            help="zipf: a few products are stocked everywhere and ordered most, a few stores get most orders",
+        )
+        parser.add_argument("--zipf-exponent", type=float, default=1.1)
+        parser.add_argument("--seed", type=int, default=None, help="same seed, same data")
+        parser.add_argument("--workers", type=int, default=1, help="processes generating rows in parallel")
+        parser.add_argument("--chunk-size", type=int, default=10_000, help="rows per task")
+        parser.add_argument("--batch-size", type=int, default=2000, help="rows per INSERT")
+
+    def handle(self, *args, **options):
+        if not 0 <= options["coverage"] <= 1:
+            raise CommandError("--coverage must be between 0 and 1")
+        if options["products"] < 1 or options["stores"] < 1:
+            raise CommandError("--products and --stores must be at least 1")
+        seed = options["seed"] if options["seed"] is not None else random.randrange(2**32)
+        workers = options["workers"]
+        if workers > 1 and "fork" not in multiprocessing.get_all_start_methods():
+            self.stderr.write("Parallel workers need fork(); seeding in one process.")
+            workers = 1
+
+        self.stdout.write(f"Seeding data (seed {seed})...")
+        started = time.perf_counter()
+        self.clear()
+
+        rng = random.Random(seed)
+        pool = build_text_pool(seed)
+        categories = Category.objects.bulk_create([Category(name=name) for name in CATEGORY_NAMES])
+        stores = Store.objects.bulk_create(
+            [
+                Store(name=rng.choice(pool["companies"]), location=rng.choice(pool["cities"]))
+                for _ in range(options["stores"])
+            ]
+        )
+        _state.clear()
+        _state.update(
+            seed=seed,
+            pool=pool,
+            batch_size=options["batch_size"],
+            category_ids=[c.id for c in categories],
+            store_ids=[s.id for s in stores],
+            zipf=options["distribution"] == "zipf",
+            exponent=options["zipf_exponent"],
+            coverage=options["coverage"],
+        )
+
+        chunk = options["chunk_size"]
+        self.run_phase("products", chunk_tasks(generate_products, options["products"], chunk), workers)
+
+        # popularity rank: a seeded shuffle, so hot products aren't just the oldest ids
+        ranked = list(range(1, options["products"] + 1))
+        rng.shuffle(ranked)
+        _state["ranked_product_ids"] = ranked
+        if _state["zipf"]:
+            cum_weights = zipf_cum_weights(len(ranked), options["zipf_exponent"])
+            _state["product_cum_weights"] = cum_weights
+            _state["store_cum_weights"] = zipf_cum_weights(len(stores), options["zipf_exponent"])
+            _state["stock_factor"] = zipf_stock_factor(cum_weights, len(ranked) * options["coverage"])
+
+        self.run_phase(
+            "inventory", [(generate_inventory, (i, store.id)) for i, store in enumerate(stores)], workers
+        )
+        self.run_phase("orders", chunk_tasks(generate_orders, options["orders"], chunk), workers)
+
+        # products and orders were inserted with explicit ids (sequences were
+        # reset by clear()); move the sequences past them
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), [Product, Order]):
+                cursor.execute(sql)
+
+        # bulk inserts skip the model signals: rebuild the full-text index (and
+        # the availability read model) and drop every cached search result explicitly
+        indexed = get_search_backend().rebuild()
+        if availability_enabled():
+            rebuild_availability([s.id for s in stores])
+        bump_generations("catalog", *[f"store:{s.id}" for s in stores])
+
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Seeding complete: {len(ranked)} products ({indexed} indexed), {len(stores)} stores, "
+                f"{options['orders']} orders in {time.perf_counter() - started:.1f}s."
+            )
+        )
+
+    def clear(self):
+        """Empty the seeded tables with the backend's flush statements (fast on millions of rows)."""
+        tables = [
+            model._meta.db_table
+            for model in (
+                OutboxMessage, OrderItem, Order, StoreProductAvailability, Inventory, Product, Category, Store
+            )
+        ]
+        # the full-text index references products (on Postgres with a foreign
+        # key, so TRUNCATE needs it in the same statement)
+        tables += index_tables()
+        with transaction.atomic():
+            with connection.cursor() as cursor:
+                for sql in connection.ops.sql_flush(no_style(), tables, reset_sequences=True):
+                    cursor.execute(sql)
 
-        self.stdout.write(self.style.SUCCESS("Seeding complete."))
+    def run_phase(self, name, tasks, workers):
+        started = time.perf_counter()
+        if workers > 1 and len(tasks) > 1:
+            # children inherit _state; each opens its own database connection
+            connections.close_all()
+            with multiprocessing.get_context("fork").Pool(min(workers, len(tasks))) as pool:
+                rows = sum(pool.imap_unordered(run_task, tasks))
+        else:
+            rows = sum(run_task(task) for task in tasks)
+        self.stdout.write(f"  {name}: {rows} rows in {time.perf_counter() - started:.1f}s")
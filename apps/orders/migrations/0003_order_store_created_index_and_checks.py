@@ -0,0 +1,28 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:47
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("orders", "0002_outboxmessage"),
+        ("products", "0002_product_sort_indexes"),
+        ("stores", "0002_storeproductavailability"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="order",
+            index=models.Index(
+                fields=["store", "-created_at", "-id"], name="order_store_created_idx"
+            ),
+        ),
+        migrations.AddConstraint(
+            model_name="orderitem",
+            constraint=models.CheckConstraint(
+                check=models.Q(("quantity_requested__gte", 1)),
+                name="orderitem_quantity_positive",
+            ),
+        ),
+    ]
@@ -18,6 +18,12 @@ class Order(models.Model):
     status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
     created_at = models.DateTimeField(default=timezone.now)
 
+    class Meta:
+        indexes = [
+            # StoreOrderListView: WHERE store_id = .. ORDER BY created_at DESC, id DESC
+            models.Index(fields=["store", "-created_at", "-id"], name="order_store_created_idx"),
+        ]
+
     def __str__(self):
         return f"Order #{self.id} ({self.status})"
 
@@ -27,5 +33,40 @@ class OrderItem(models.Model):
     product = models.ForeignKey(Product, on_delete=models.PROTECT, related_name="order_items")
     quantity_requested = models.PositiveIntegerField()
 
+    class Meta:
+        constraints = [
+            models.CheckConstraint(check=models.Q(quantity_requested__gte=1), name="orderitem_quantity_positive"),
+        ]
+
     def __str__(self):
         return f"{self.order} - {self.product} x {self.quantity_requested}"
+
+
+class OutboxMessage(models.Model):
+    """
+    Transactional outbox: side effects (e.g. confirmation emails) are recorded
+    in the same transaction as the order and published later by the
+    dispatcher, so requests never talk to the broker.
+    """
+
+    TOPIC_ORDER_CONFIRMATION = "order_confirmation"
+
+    STATUS_PENDING = "PENDING"
+    STATUS_SENT = "SENT"
+    STATUS_CHOICES = [
+        (STATUS_PENDING, "Pending"),
+        (STATUS_SENT, "Sent"),
+    ]
+
+    topic = models.CharField(max_length=50)
+    payload = models.JSONField()
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    attempts = models.PositiveIntegerField(default=0)
+    created_at = models.DateTimeField(default=timezone.now)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [models.Index(fields=["status", "id"], name="outbox_status_id_idx")]
+
+    def __str__(self):
+        return f"Outbox #{self.id} {self.topic} ({self.status})"
@@ -0,0 +1,93 @@
+from django.conf import settings
+from django.db import connection, transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .models import OutboxMessage
+
+
+def enqueue_order_confirmation(order):
+    """Record the confirmation email for `order`; call inside the order's transaction."""
+    return OutboxMessage.objects.create(
+        topic=OutboxMessage.TOPIC_ORDER_CONFIRMATION,
+        payload={"order_id": order.id},
+    )
+
+
+def publish_order_confirmations(messages):
+    """
+    Publish confirmation emails for a batch of outbox rows as
+    send_order_confirmations_batch tasks of up to
+    settings.ORDER_CONFIRMATION_EMAIL_BATCH_SIZE orders each, over one broker
+    connection. Raises the broker error if publishing fails.
+    """
+    from .tasks import send_order_confirmations_batch
+
+    order_ids = [msg.payload["order_id"] for msg in messages]
+    size = settings.ORDER_CONFIRMATION_EMAIL_BATCH_SIZE
+    with send_order_confirmations_batch.app.producer_or_acquire() as producer:
+        for i in range(0, len(order_ids), size):
+            send_order_confirmations_batch.apply_async(
+                (order_ids[i:i + size],), producer=producer
+            )
+
+
+PUBLISHERS = {
+    OutboxMessage.TOPIC_ORDER_CONFIRMATION: publish_order_confirmations,
+}
+
+
+def dispatch_pending(batch_size=500):
+    """
+    Publish one batch of pending outbox rows and mark them sent.
+
+    Rows are claimed with SELECT ... FOR UPDATE SKIP LOCKED where supported,
+    so several dispatchers can run side by side. If publishing fails the rows
+    stay pending (attempts is bumped) and the error is re-raised.
+
+    Returns the number of rows sent.
+    """
+    with transaction.atomic():
+        qs = OutboxMessage.objects.filter(status=OutboxMessage.STATUS_PENDING).order_by("id")
+        if connection.features.has_select_for_update_skip_locked:
+            qs = qs.select_for_update(skip_locked=True)
+        messages = list(qs[:batch_size])
+        if not messages:
+            return 0
+
+        by_topic = {}
+        for msg in messages:
+            by_topic.setdefault(msg.topic, []).append(msg)
+
+        ids = [msg.id for msg in messages]
+        try:
+            for topic, batch in by_topic.items():
+                PUBLISHERS[topic](batch)
+        except Exception as exc:
+            # keep the rows pending, but record the attempt (committed below)
+            OutboxMessage.objects.filter(id__in=ids).update(attempts=F("attempts") + 1)
+            error = exc
+        else:
+            error = None
+            OutboxMessage.objects.filter(id__in=ids).update(
+                status=OutboxMessage.STATUS_SENT,
+                sent_at=timezone.now(),
+                attempts=F("attempts") + 1,
+            )
+
+    if error is not None:
+        raise error
+    return len(messages)
+
+
+def dispatch_all(batch_size=500, max_batches=None):
+    """Dispatch batches until the outbox is drained (or max_batches is hit)."""
+    total = 0
+    batches = 0
+    while max_batches is None or batches < max_batches:
+        sent = dispatch_pending(batch_size)
+        if not sent:
+            break
+        total += sent
+        batches += 1
+    return total
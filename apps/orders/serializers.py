@@ -31,3 +31,10 @@ class OrderSerializer(serializers.ModelSerializer):
     class Meta:
         model = Order
         fields = ["id", "store", "status", "created_at", "items"]
+
+
+class StoreOrderSerializer(OrderSerializer):
+    total_items = serializers.IntegerField(read_only=True)
+
+    class Meta(OrderSerializer.Meta):
+        fields = OrderSerializer.Meta.fields + ["total_items"]
@@ -0,0 +1,189 @@
+from collections import OrderedDict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.http import Http404
+
+from .models import Order, OrderItem
+from .outbox import enqueue_order_confirmation
+from apps.stores.availability import sync_availability
+from apps.stores.models import Inventory
+from apps.stores.signals import inventory_changed
+from apps.products.models import Product
+
+
+def aggregate_lines(items_data):
+    """
+    Collapse basket lines into {product_id: total quantity}, keeping the
+    first-seen order of products. A product listed twice must be checked
+    and deducted for the sum of both lines.
+    """
+    totals = OrderedDict()
+    for item in items_data:
+        pid = item["product_id"]
+        totals[pid] = totals.get(pid, 0) + item["quantity_requested"]
+    return totals
+
+
+def load_products(product_ids):
+    """
+    Fetch every product of the basket in one query.
+    Raises Http404 if any of them does not exist (same behaviour as the old
+    per-line get_object_or_404).
+    """
+    products = Product.objects.in_bulk(list(product_ids))
+    if len(products) != len(set(product_ids)):
+        raise Http404("No Product matches the given query.")
+    return products
+
+
+ENGINE_LOCKING = "locking"
+ENGINE_CONDITIONAL = "conditional"
+
+
+class InsufficientStock(Exception):
+    """Raised inside a savepoint to undo partial stock decrements."""
+
+
+def get_placement_engine():
+    engine = getattr(settings, "ORDER_PLACEMENT_ENGINE", ENGINE_LOCKING)
+    try:
+        return ENGINES[engine]
+    except KeyError:
+        raise ValueError(f"Unknown ORDER_PLACEMENT_ENGINE: {engine!r}")
+
+
+def place_order(store, items_data):
+    """
+    Place an order with the engine selected by settings.ORDER_PLACEMENT_ENGINE.
+    A confirmed order also gets its confirmation email recorded in the outbox,
+    in the same transaction, copies the new stock levels into the
+    availability read model, and announces the stock change with
+    inventory_changed once committed. Must be called inside transaction.atomic().
+    """
+    order = get_placement_engine()(store, items_data)
+    if order.status == Order.STATUS_CONFIRMED:
+        enqueue_order_confirmation(order)
+        product_ids = sorted({item["product_id"] for item in items_data})
+        sync_availability(store_id=store.id, product_ids=product_ids)
+        transaction.on_commit(
+            lambda: inventory_changed.send(
+                sender=Inventory, store_id=store.id, product_ids=product_ids
+            )
+        )
+    return order
+
+
+def place_order_locking(store, items_data):
+    """
+    Place an order with a fixed number of queries, whatever the basket size:
+
+    1. load all products
+    2. insert the order
+    3. lock all inventory rows of the basket (ordered by product id, so two
+       baskets sharing products always lock in the same order)
+    4. bulk insert the order items
+    5. bulk update the inventory rows (only when confirmed)
+    6. update the order status
+
+    Must be called inside transaction.atomic().
+    """
+    totals = aggregate_lines(items_data)
+    products = load_products(totals.keys())
+
+    order = Order.objects.create(store=store, status=Order.STATUS_PENDING)
+
+    inventories = {
+        inv.product_id: inv
+        for inv in Inventory.objects.select_for_update()
+        .filter(store=store, product_id__in=list(totals))
+        .order_by("product_id")
+    }
+
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(
+                order=order,
+                product=products[item["product_id"]],
+                quantity_requested=item["quantity_requested"],
+            )
+            for item in items_data
+        ]
+    )
+
+    insufficient_stock = any(
+        pid not in inventories or inventories[pid].quantity < qty
+        for pid, qty in totals.items()
+    )
+
+    if insufficient_stock:
+        order.status = Order.STATUS_REJECTED
+    else:
+        # deduct stock
+        for pid, qty in totals.items():
+            inventories[pid].quantity -= qty
+        Inventory.objects.bulk_update(inventories.values(), ["quantity"])
+        order.status = Order.STATUS_CONFIRMED
+
+    order.save(update_fields=["status"])
+    return order
+
+
+def place_order_conditional(store, items_data):
+    """
+    Place an order without explicit row locks.
+
+    Each product is decremented with one guarded statement:
+
+        UPDATE inventory SET quantity = quantity - n
+        WHERE store_id = .. AND product_id = .. AND quantity >= n
+
+    An affected-row count of 0 means missing or insufficient stock; the
+    decrements already applied for that basket are rolled back through a
+    savepoint and the order is rejected. Products are decremented in id order
+    so concurrent baskets never wait on each other in a cycle.
+
+    Must be called inside transaction.atomic().
+    """
+    totals = aggregate_lines(items_data)
+    products = load_products(totals.keys())
+
+    order = Order.objects.create(store=store, status=Order.STATUS_PENDING)
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(
+                order=order,
+                product=products[item["product_id"]],
+                quantity_requested=item["quantity_requested"],
+            )
+            for item in items_data
+        ]
+    )
+
+    try:
+        with transaction.atomic():
+            for pid in sorted(totals):
+                qty = totals[pid]
+                updated = Inventory.objects.filter(
+                    store=store, product_id=pid, quantity__gte=qty
+                ).update(quantity=F("quantity") - qty)
+                if not updated:
+                    raise InsufficientStock(pid)
+        order.status = Order.STATUS_CONFIRMED
+    except InsufficientStock:
+        order.status = Order.STATUS_REJECTED
+
+    order.save(update_fields=["status"])
+    return order
+
+
+ENGINES = {
+    ENGINE_LOCKING: place_order_locking,
+    ENGINE_CONDITIONAL: place_order_conditional,
+}
+
+
+def load_order_for_response(order_id):
+    """Re-read an order with its items and products in a constant number of queries."""
+    return Order.objects.prefetch_related("items__product").get(pk=order_id)
@@ -1,7 +1,19 @@
 from celery import shared_task
-from django.core.mail import send_mail
+from django.core.mail import send_mail, get_connection, EmailMessage
 from django.conf import settings
-from .models import Order
+from .models import Order, OrderItem
+
+RECIPIENT = "test@example.com"  # placeholder
+
+
+def render_confirmation(order, items=()):
+    """Subject and body of the confirmation email for `order`."""
+    subject = f"Order #{order.id} {order.status}"
+    lines = [f"Your order #{order.id} is {order.status}."]
+    if items:
+        lines.append("")
+        lines.extend(f"- {item.product.title} x {item.quantity_requested}" for item in items)
+    return subject, "\n".join(lines)
 
 
 @shared_task
@@ -11,14 +23,74 @@ def send_order_confirmation_email(order_id):
     except Order.DoesNotExist:
         return
 
-    subject = f"Order #{order.id} {order.status}"
-    message = f"Your order #{order.id} is {order.status}."
-    recipient = "test@example.com"  # placeholder
+    subject, message = render_confirmation(order)
 
     send_mail(
         subject,
         message,
         settings.DEFAULT_FROM_EMAIL,
-        [recipient],
+        [RECIPIENT],
         fail_silently=True,
     )
+
+
+@shared_task
+def send_order_confirmations_batch(order_ids):
+    """
+    Send the confirmation emails of many orders at once.
+
+    Orders and their items are loaded with a single query and every message
+    goes out over one mail connection. Returns
+    {"sent": [order ids], "failed": {order id: reason}}.
+    """
+    order_ids = list(dict.fromkeys(order_ids))
+    items_by_order = {}
+    orders = {}
+    for item in (
+        OrderItem.objects.filter(order_id__in=order_ids)
+        .select_related("order", "product")
+        .order_by("order_id", "id")
+    ):
+        orders[item.order_id] = item.order
+        items_by_order.setdefault(item.order_id, []).append(item)
+
+    sent = []
+    failed = {}
+    messages = []
+    for order_id in order_ids:
+        order = orders.get(order_id)
+        if order is None:
+            failed[order_id] = "order not found"
+            continue
+        subject, body = render_confirmation(order, items_by_order[order_id])
+        messages.append(
+            (order_id, EmailMessage(subject, body, settings.DEFAULT_FROM_EMAIL, [RECIPIENT]))
+        )
+
+    if messages:
+        connection = get_connection(fail_silently=False)
+        try:
+            connection.open()
+        except Exception as exc:
+            failed.update({order_id: f"connection failed: {exc}" for order_id, _ in messages})
+            return {"sent": sent, "failed": failed}
+        try:
+            for order_id, message in messages:
+                # one message per call so a bad address only fails its own order
+                try:
+                    connection.send_messages([message])
+                    sent.append(order_id)
+                except Exception as exc:
+                    failed[order_id] = str(exc)
+        finally:
+            connection.close()
+
+    return {"sent": sent, "failed": failed}
+
+
+@shared_task
+def dispatch_order_outbox(batch_size=500, max_batches=20):
+    """Celery beat entry point for the transactional outbox dispatcher."""
+    from .outbox import dispatch_all
+
+    return dispatch_all(batch_size=batch_size, max_batches=max_batches)
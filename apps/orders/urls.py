@@ -1,7 +1,9 @@
 from django.urls import path
-from .views import OrderCreateView, StoreOrderListView
+from .views import OrderCreateView, OrderIntakeStatsView, StoreOrderExportView, StoreOrderListView
 
 urlpatterns = [
     path("", OrderCreateView.as_view(), name="order-create"),
     path("store/<int:store_id>/", StoreOrderListView.as_view(), name="store-orders"),
+    path("store/<int:store_id>/export.<str:fmt>", StoreOrderExportView.as_view(), name="store-orders-export"),
+    path("intake/stats/", OrderIntakeStatsView.as_view(), name="order-intake-stats"),
 ]
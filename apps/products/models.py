@@ -15,5 +15,13 @@ class Product(models.Model):
     category = models.ForeignKey(Category, on_delete=models.PROTECT, related_name="products")
     created_at = models.DateTimeField(auto_now_add=True)
 
+    class Meta:
+        indexes = [
+            # product search sorts (?sort=title|price|newest), each ending with the id tie-breaker
+            models.Index(fields=["title", "id"], name="product_title_idx"),
+            models.Index(fields=["price", "id"], name="product_price_idx"),
+            models.Index(fields=["-created_at", "-id"], name="product_newest_idx"),
+        ]
+
     def __str__(self):
         return self.title
@@ -6,3 +6,4 @@ from .serializers import ProductSerializer
 class ProductListView(ListAPIView):
     queryset = Product.objects.all().select_related("category").order_by("title")
     serializer_class = ProductSerializer
+    read_replica = True  # see project/replicas.py
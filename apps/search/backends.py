@@ -0,0 +1,214 @@
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import SearchQuery, SearchRank
+from django.db import connection
+from django.db.models import F, Q, Case, When, IntegerField
+
+from apps.products.models import Category, Product
+from project.sql import in_lists
+
+TOKEN_RE = re.compile(r"\w+", re.UNICODE)
+
+
+def tokenize(q):
+    return TOKEN_RE.findall(q.lower())
+
+
+class IcontainsSearchBackend:
+    """
+    Original behaviour: substring match on title, description and category
+    name, with a 3/2/1 relevance heuristic. No index, no sync needed.
+    """
+
+    name = "icontains"
+
+    def search(self, qs, q):
+        return qs.filter(
+            Q(title__icontains=q)
+            | Q(description__icontains=q)
+            | Q(category__name__icontains=q)
+        ).annotate(
+            relevance=Case(
+                When(title__icontains=q, then=3),
+                When(description__icontains=q, then=2),
+                When(category__name__icontains=q, then=1),
+                default=0,
+                output_field=IntegerField(),
+            )
+        )
+
+    def index_products(self, products):
+        pass
+
+    def index_category(self, category_id):
+        pass
+
+    def remove_products(self, product_ids):
+        pass
+
+    def rebuild(self, chunk_size=5000):
+        return 0
+
+
+class FullTextSearchBackend(IcontainsSearchBackend):
+    """
+    Common part of the full-text backends: a side table with one document per
+    product (title, description, category name), kept in sync from Product
+    and Category saves (apps/search/signals.py) and rebuilt with
+    `manage.py rebuild_search_index`.
+
+    Every query token is matched as a prefix ("iph" finds "iPhone"); all
+    tokens must match. Documents are (re)built in SQL straight from the
+    product and category tables, so indexing never round-trips rows through
+    Python.
+    """
+
+    table = None
+    key_column = None
+
+    def index_products(self, products):
+        ids = [p.id if isinstance(p, Product) else p for p in products]
+        for placeholders, chunk in in_lists(ids):
+            self.index_where(f"p.id IN ({placeholders})", chunk)
+
+    def index_category(self, category_id):
+        self.index_where("p.category_id = %s", [category_id])
+
+    def remove_products(self, product_ids):
+        with connection.cursor() as cursor:
+            for placeholders, chunk in in_lists(product_ids):
+                cursor.execute(
+                    f"DELETE FROM {self.table} WHERE {self.key_column} IN ({placeholders})", chunk
+                )
+
+    def rebuild(self, chunk_size=50_000):
+        """
+        Re-index every product, `chunk_size` product ids per statement.
+        Returns the number of indexed products.
+        """
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+        total = 0
+        last_id = 0
+        while True:
+            ids = list(
+                Product.objects.filter(id__gt=last_id)
+                .order_by("id")
+                .values_list("id", flat=True)[:chunk_size]
+            )
+            if not ids:
+                return total
+            self.index_where("p.id BETWEEN %s AND %s", [ids[0], ids[-1]])
+            total += len(ids)
+            last_id = ids[-1]
+
+    def index_where(self, where, params):
+        raise NotImplementedError
+
+    @staticmethod
+    def source_sql(columns, where):
+        return (
+            f"SELECT {columns} FROM {Product._meta.db_table} p "
+            f"JOIN {Category._meta.db_table} c ON c.id = p.category_id WHERE {where}"
+        )
+
+
+class SQLiteFTS5SearchBackend(FullTextSearchBackend):
+    """FTS5 virtual table keyed by product id (rowid), ranked with weighted bm25."""
+
+    name = "fts5"
+    table = "search_product_fts"
+    key_column = "rowid"
+
+    def search(self, qs, q):
+        tokens = tokenize(q)
+        if not tokens:
+            return qs.none()
+        expr = " AND ".join('"{}"*'.format(t.replace('"', '""')) for t in tokens)
+        # FTS5 rank is bm25: lower is better, relevance is higher-is-better
+        return qs.filter(fts_document__match=expr).annotate(
+            relevance=-F("fts_document__rank")
+        )
+
+    def index_where(self, where, params):
+        with connection.cursor() as cursor:
+            # FTS5 has no upsert: drop the old documents first
+            cursor.execute(
+                f"DELETE FROM {self.table} WHERE rowid IN "
+                f"(SELECT p.id FROM {Product._meta.db_table} p WHERE {where})",
+                params,
+            )
+            cursor.execute(
+                f"INSERT INTO {self.table} (rowid, title, description, category) "
+                + self.source_sql("p.id, p.title, COALESCE(p.description, ''), c.name", where),
+                params,
+            )
+
+
+class PostgresSearchBackend(FullTextSearchBackend):
+    """tsvector document table with a GIN index, ranked with ts_rank."""
+
+    name = "postgres"
+    table = "search_product_document"
+    key_column = "product_id"
+
+    def search(self, qs, q):
+        tokens = tokenize(q)
+        if not tokens:
+            return qs.none()
+        query = SearchQuery(
+            " & ".join(f"{t}:*" for t in tokens),
+            config=settings.SEARCH_TEXT_CONFIG,
+            search_type="raw",
+        )
+        return qs.filter(search_document__document=query).annotate(
+            relevance=SearchRank(F("search_document__document"), query)
+        )
+
+    def index_where(self, where, params):
+        config = settings.SEARCH_TEXT_CONFIG
+        document = (
+            "setweight(to_tsvector(%s::regconfig, p.title), 'A') || "
+            "setweight(to_tsvector(%s::regconfig, COALESCE(p.description, '')), 'B') || "
+            "setweight(to_tsvector(%s::regconfig, c.name), 'C')"
+        )
+        with connection.cursor() as cursor:
+            cursor.execute(
+                f"INSERT INTO {self.table} (product_id, document) "
+                + self.source_sql(f"p.id, {document}", where)
+                + " ON CONFLICT (product_id) DO UPDATE SET document = EXCLUDED.document",
+                [config, config, config] + params,
+            )
+
+
+BACKENDS = {
+    IcontainsSearchBackend.name: IcontainsSearchBackend,
+    SQLiteFTS5SearchBackend.name: SQLiteFTS5SearchBackend,
+    PostgresSearchBackend.name: PostgresSearchBackend,
+}
+
+AUTO_BACKENDS = {
+    "sqlite": SQLiteFTS5SearchBackend.name,
+    "postgresql": PostgresSearchBackend.name,
+}
+
+
+def index_tables():
+    """The full-text index table(s) the search migration created on this database."""
+    name = AUTO_BACKENDS.get(connection.vendor)
+    return [BACKENDS[name].table] if name else []
+
+
+def get_search_backend():
+    """
+    Backend named by settings.SEARCH_BACKEND; "auto" picks the full-text
+    backend of the current database (falling back to icontains).
+    """
+    name = settings.SEARCH_BACKEND
+    if name == "auto":
+        name = AUTO_BACKENDS.get(connection.vendor, IcontainsSearchBackend.name)
+    try:
+        return BACKENDS[name]()
+    except KeyError:
+        raise ValueError(f"Unknown SEARCH_BACKEND: {name!r}")
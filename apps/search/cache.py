@@ -0,0 +1,167 @@
+import hashlib
+import json
+import threading
+
+from django.conf import settings
+
+from project.lru import LocalLRU
+from project.redis_client import REDIS_ERRORS, redis_client
+
+# query parameters that change ProductSearchView's output
+FILTER_PARAMS = ("q", "category", "price_min", "price_max", "store_id", "in_stock")
+CACHED_PARAMS = FILTER_PARAMS + (
+    "sort", "page", "page_size", "paginate", "cursor", "estimate_count", "facets",
+)
+
+
+class SearchResultCache:
+    """
+    Two-tier cache of rendered ProductSearchView responses (JSON bytes).
+
+    Keys are built from the normalized query parameters plus the current
+    value of every generation counter the result depends on:
+
+    - "catalog" for searches without a category filter, or
+      "category:<id>" when one is given (bumped by Product/Category writes)
+    - "store:<id>" for every store_id asked for (bumped by Inventory writes
+      and inventory_changed)
+
+    Bumping a counter makes all dependent keys unreachable; nothing is
+    deleted, old entries simply age out. So a stock change in one store only
+    invalidates searches for that store.
+
+    Counters and the shared tier live in Redis. The local LRU tier sits in
+    front of it with a short TTL, which also bounds staleness when Redis is
+    down (counters then fall back to this process's own).
+    """
+
+    def __init__(self, client, local_max_entries):
+        self.client = client
+        self.local = LocalLRU(local_max_entries)
+        self._local_gens = {}
+        self._lock = threading.Lock()
+        self.stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "redis_errors": 0}
+
+    # -- generations -------------------------------------------------------
+
+    @staticmethod
+    def gen_key(scope):
+        return f"search:gen:{scope}"
+
+    def bump(self, *scopes):
+        with self._lock:
+            for scope in scopes:
+                self._local_gens[scope] = self._local_gens.get(scope, 0) + 1
+        try:
+            with self.client.pipeline(transaction=False) as pipe:
+                for scope in scopes:
+                    pipe.incr(self.gen_key(scope))
+                pipe.execute()
+        except REDIS_ERRORS:
+            self._count("redis_errors")
+
+    def generations(self, scopes):
+        try:
+            values = self.client.mget([self.gen_key(scope) for scope in scopes])
+            return [int(v or 0) for v in values]
+        except REDIS_ERRORS:
+            self._count("redis_errors")
+            with self._lock:
+                return [f"local{self._local_gens.get(scope, 0)}" for scope in scopes]
+
+    # -- keys --------------------------------------------------------------
+
+    @staticmethod
+    def normalize(query_params, names=CACHED_PARAMS):
+        """
+        Page mode: the known parameters, empty ones dropped, q lowercased and
+        whitespace-collapsed. Cursor mode bodies embed the request URL in
+        "next", so every parameter is kept as sent.
+        """
+        if names is CACHED_PARAMS and (
+            query_params.get("cursor") or query_params.get("paginate") == "cursor"
+        ):
+            return {name: ",".join(query_params.getlist(name)) for name in query_params}
+        params = {}
+        for name in names:
+            value = query_params.get(name)
+            if value is None or value == "":
+                continue
+            if name == "q":
+                value = " ".join(value.lower().split())
+            params[name] = value
+        return params
+
+    @staticmethod
+    def scopes(params):
+        scopes = [f"category:{params['category']}" if params.get("category") else "catalog"]
+        if params.get("store_id"):
+            scopes += [f"store:{sid.strip()}" for sid in params["store_id"].split(",") if sid.strip()]
+        return scopes
+
+    def key_for(self, query_params, host=""):
+        return self._key("result", self.normalize(query_params), host)
+
+    def facets_key_for(self, query_params, facets):
+        """Facets depend on the filters only, not on sorting or paging."""
+        params = self.normalize(query_params, FILTER_PARAMS)
+        params["facets"] = ",".join(sorted(facets))
+        return self._key("facets", params)
+
+    def _key(self, kind, params, host=""):
+        scopes = self.scopes(params)
+        gens = self.generations(scopes)
+        raw = json.dumps([host, sorted(params.items()), scopes, gens], separators=(",", ":"))
+        return f"search:{kind}:" + hashlib.sha1(raw.encode()).hexdigest()
+
+    # -- values ------------------------------------------------------------
+
+    def get(self, key):
+        body = self.local.get(key)
+        if body is not None:
+            self._count("local_hits")
+            return body
+        try:
+            body = self.client.get(key)
+        except REDIS_ERRORS:
+            self._count("redis_errors")
+            body = None
+        if body is not None:
+            self._count("redis_hits")
+            self.local.set(key, body, settings.SEARCH_CACHE_LOCAL_TTL)
+            return body
+        self._count("misses")
+        return None
+
+    def set(self, key, body):
+        self.local.set(key, body, settings.SEARCH_CACHE_LOCAL_TTL)
+        try:
+            self.client.set(key, body, ex=settings.SEARCH_CACHE_TTL)
+        except REDIS_ERRORS:
+            self._count("redis_errors")
+
+    # -- metrics -----------------------------------------------------------
+
+    def _count(self, name):
+        with self._lock:
+            self.stats[name] += 1
+
+    def snapshot(self):
+        with self._lock:
+            stats = dict(self.stats)
+        lookups = stats["local_hits"] + stats["redis_hits"] + stats["misses"]
+        hits = stats["local_hits"] + stats["redis_hits"]
+        stats["lookups"] = lookups
+        stats["hit_rate"] = round(hits / lookups, 4) if lookups else None
+        stats["local_entries"] = len(self.local)
+        return stats
+
+    def reset(self):
+        self.local.clear()
+        with self._lock:
+            self._local_gens.clear()
+            for name in self.stats:
+                self.stats[name] = 0
+
+
+search_cache = SearchResultCache(redis_client, local_max_entries=settings.SEARCH_CACHE_LOCAL_MAX_ENTRIES)
@@ -0,0 +1,76 @@
+from decimal import Decimal
+
+from django.conf import settings
+from django.db.models import Count, Q
+from rest_framework.exceptions import ValidationError
+
+FACETS = ("category", "price", "in_stock")
+
+
+def parse_facets(value):
+    """?facets=category,price -> ["category", "price"] (known names, deduplicated)."""
+    names = list(dict.fromkeys(part.strip() for part in value.split(",") if part.strip()))
+    unknown = [name for name in names if name not in FACETS]
+    if unknown:
+        raise ValidationError({"facets": f"Unknown facets: {', '.join(unknown)}. Choose from {', '.join(FACETS)}."})
+    return names
+
+
+def price_buckets():
+    """[(label, lower, upper)] from settings.SEARCH_PRICE_BUCKETS; the last one is open-ended."""
+    edges = [Decimal(0)] + [Decimal(str(edge)) for edge in settings.SEARCH_PRICE_BUCKETS]
+    buckets = [(f"{lo}-{hi}", lo, hi) for lo, hi in zip(edges, edges[1:])]
+    buckets.append((f"{edges[-1]}+", edges[-1], None))
+    return buckets
+
+
+def compute_facets(queryset, names, with_stock):
+    """
+    All requested facets of `queryset` (the filtered search queryset) in one
+    query: rows are grouped by category and every price bucket and the
+    in-stock count are conditional COUNTs in the same pass, so adding a facet
+    adds a column, not a query. Per-category rows are then folded in Python.
+
+    `with_stock`: whether `queryset` carries a store quantity; without a store
+    the in_stock facet is null.
+    """
+    aggregates = {"n": Count("id")}
+    buckets = price_buckets() if "price" in names else []
+    for i, (_, lo, hi) in enumerate(buckets):
+        condition = Q(price__gte=lo) if hi is None else Q(price__gte=lo, price__lt=hi)
+        aggregates[f"price_{i}"] = Count("id", filter=condition)
+    if "in_stock" in names and with_stock:
+        aggregates["in_stock"] = Count("id", filter=Q(quantity__gt=0))
+
+    rows = list(
+        queryset.order_by()
+        .values("category_id", "category__name")
+        .annotate(**aggregates)
+        .order_by("category__name", "category_id")
+    )
+
+    facets = {}
+    total = sum(row["n"] for row in rows)
+    if "category" in names:
+        facets["category"] = [
+            {"id": row["category_id"], "name": row["category__name"], "count": row["n"]}
+            for row in rows
+        ]
+    if "price" in names:
+        facets["price"] = [
+            {
+                "label": label,
+                # strings, like product prices
+                "min": str(lo),
+                "max": None if hi is None else str(hi),
+                "count": sum(row[f"price_{i}"] for row in rows),
+            }
+            for i, (label, lo, hi) in enumerate(buckets)
+        ]
+    if "in_stock" in names:
+        if with_stock:
+            in_stock = sum(row["in_stock"] for row in rows)
+            facets["in_stock"] = {"in_stock": in_stock, "out_of_stock": total - in_stock}
+        else:
+            facets["in_stock"] = None
+    return facets
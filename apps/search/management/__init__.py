@@ -0,0 +1,2 @@
+# management/__init__.py
+# Just marks this as a Django app package.
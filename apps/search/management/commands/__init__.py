@@ -0,0 +1,2 @@
+# management/commands/__init__.py
+# Package marker so Django can import commands.
@@ -0,0 +1,99 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:03
+
+import apps.search.models
+import django.contrib.postgres.search
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The index tables are created per vendor; the models above them are
+# unmanaged (see apps/search/models.py).
+SQLITE_FORWARD = [
+    "CREATE VIRTUAL TABLE search_product_fts USING fts5("
+    "title, description, category, tokenize = 'unicode61 remove_diacritics 2')",
+    # rank column = bm25 weighted title > description > category
+    "INSERT INTO search_product_fts (search_product_fts, rank) "
+    "VALUES ('rank', 'bm25(10.0, 5.0, 1.0)')",
+]
+SQLITE_REVERSE = ["DROP TABLE IF EXISTS search_product_fts"]
+
+POSTGRES_FORWARD = [
+    "CREATE TABLE search_product_document ("
+    "product_id bigint PRIMARY KEY REFERENCES products_product (id) ON DELETE CASCADE "
+    "DEFERRABLE INITIALLY DEFERRED, "
+    "document tsvector NOT NULL)",
+    "CREATE INDEX search_product_document_gin ON search_product_document USING gin (document)",
+]
+POSTGRES_REVERSE = ["DROP TABLE IF EXISTS search_product_document"]
+
+
+def run(statements_by_vendor):
+    def apply(apps, schema_editor):
+        for sql in statements_by_vendor.get(schema_editor.connection.vendor, []):
+            schema_editor.execute(sql)
+
+    return apply
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = [
+        ("products", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.RunPython(
+            run({"sqlite": SQLITE_FORWARD, "postgresql": POSTGRES_FORWARD}),
+            run({"sqlite": SQLITE_REVERSE, "postgresql": POSTGRES_REVERSE}),
+        ),
+        migrations.CreateModel(
+            name="ProductFTSDocument",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        db_column="rowid",
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="fts_document",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                ("title", models.TextField()),
+                ("description", models.TextField()),
+                ("category", models.TextField()),
+                (
+                    "match",
+                    apps.search.models.FTS5MatchField(db_column="search_product_fts"),
+                ),
+                ("rank", models.FloatField()),
+            ],
+            options={
+                "db_table": "search_product_fts",
+                "managed": False,
+            },
+        ),
+        migrations.CreateModel(
+            name="ProductSearchDocument",
+            fields=[
+                (
+                    "product",
+                    models.OneToOneField(
+                        db_constraint=False,
+                        on_delete=django.db.models.deletion.DO_NOTHING,
+                        primary_key=True,
+                        related_name="search_document",
+                        serialize=False,
+                        to="products.product",
+                    ),
+                ),
+                ("document", django.contrib.postgres.search.SearchVectorField()),
+            ],
+            options={
+                "db_table": "search_product_document",
+                "managed": False,
+            },
+        ),
+    ]
@@ -0,0 +1,64 @@
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+from django.db.models import Lookup
+
+from apps.products.models import Product
+
+
+class FTS5MatchField(models.TextField):
+    """
+    The hidden FTS5 column that carries the table's name. `field__match=expr`
+    renders `"table"."table" MATCH expr`, i.e. a match over all columns.
+    """
+
+
+@FTS5MatchField.register_lookup
+class FTS5Match(Lookup):
+    lookup_name = "match"
+
+    def as_sql(self, compiler, connection):
+        lhs, lhs_params = self.process_lhs(compiler, connection)
+        rhs, rhs_params = self.process_rhs(compiler, connection)
+        return f"{lhs} MATCH {rhs}", lhs_params + rhs_params
+
+
+class ProductFTSDocument(models.Model):
+    """
+    Read-only view of the SQLite FTS5 index (created in migration 0001).
+    `rank` is bm25 with the column weights configured on the table.
+    """
+
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        db_column="rowid",
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name="fts_document",
+    )
+    title = models.TextField()
+    description = models.TextField()
+    category = models.TextField()
+    match = FTS5MatchField(db_column="search_product_fts")
+    rank = models.FloatField()
+
+    class Meta:
+        managed = False
+        db_table = "search_product_fts"
+
+
+class ProductSearchDocument(models.Model):
+    """Read-only view of the Postgres tsvector index (created in migration 0001)."""
+
+    product = models.OneToOneField(
+        Product,
+        primary_key=True,
+        db_constraint=False,
+        on_delete=models.DO_NOTHING,
+        related_name="search_document",
+    )
+    document = SearchVectorField()
+
+    class Meta:
+        managed = False
+        db_table = "search_product_document"
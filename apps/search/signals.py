@@ -0,0 +1,89 @@
+from django.db import transaction
+from django.db.models.signals import post_init, post_save, post_delete
+from django.dispatch import receiver
+
+from apps.products.models import Category, Product
+from apps.stores.models import Inventory
+from apps.stores.signals import inventory_changed
+from .backends import get_search_backend
+from .cache import search_cache
+from .suggest import suggestion_index
+
+
+@receiver(post_save, sender=Product, dispatch_uid="search_index_product")
+def index_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    get_search_backend().index_products([instance])
+
+
+@receiver(post_delete, sender=Product, dispatch_uid="search_unindex_product")
+def unindex_product(sender, instance, **kwargs):
+    get_search_backend().remove_products([instance.id])
+
+
+@receiver(post_save, sender=Category, dispatch_uid="search_index_category")
+def reindex_category(sender, instance, created=False, raw=False, **kwargs):
+    # a renamed category changes the document of every product in it
+    if raw or created:
+        return
+    get_search_backend().index_category(instance.id)
+
+
+@receiver(post_save, sender=Product, dispatch_uid="suggest_index_product")
+def suggest_upsert_product(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    pid, title = instance.id, instance.title
+    transaction.on_commit(lambda: suggestion_index.upsert(pid, title))
+
+
+@receiver(post_delete, sender=Product, dispatch_uid="suggest_remove_product")
+def suggest_remove_product(sender, instance, **kwargs):
+    pid = instance.id
+    transaction.on_commit(lambda: suggestion_index.remove(pid))
+
+
+# -- search result cache generations (see apps/search/cache.py) --------------
+
+
+def bump_generations(*scopes):
+    # bump now so this transaction never reads its own stale entries, and again
+    # after commit so a concurrent reader can't cache pre-commit rows under
+    # the new generation
+    search_cache.bump(*scopes)
+    transaction.on_commit(lambda: search_cache.bump(*scopes))
+
+
+@receiver(post_init, sender=Product, dispatch_uid="search_cache_track_category")
+def remember_category(sender, instance, **kwargs):
+    # the category the product was loaded with, to invalidate it on a move
+    instance._loaded_category_id = instance.__dict__.get("category_id")
+
+
+@receiver(post_save, sender=Product, dispatch_uid="search_cache_product_saved")
+@receiver(post_delete, sender=Product, dispatch_uid="search_cache_product_deleted")
+def invalidate_product(sender, instance, **kwargs):
+    scopes = {"catalog", f"category:{instance.category_id}"}
+    if instance._loaded_category_id is not None:
+        scopes.add(f"category:{instance._loaded_category_id}")
+    instance._loaded_category_id = instance.category_id
+    bump_generations(*sorted(scopes))
+
+
+@receiver(post_save, sender=Category, dispatch_uid="search_cache_category_saved")
+@receiver(post_delete, sender=Category, dispatch_uid="search_cache_category_deleted")
+def invalidate_category(sender, instance, **kwargs):
+    bump_generations("catalog", f"category:{instance.id}")
+
+
+@receiver(post_save, sender=Inventory, dispatch_uid="search_cache_inventory_saved")
+@receiver(post_delete, sender=Inventory, dispatch_uid="search_cache_inventory_deleted")
+def invalidate_inventory(sender, instance, **kwargs):
+    bump_generations(f"store:{instance.store_id}")
+
+
+@receiver(inventory_changed, dispatch_uid="search_cache_inventory_changed")
+def invalidate_store(sender, store_id, **kwargs):
+    # already sent after commit
+    search_cache.bump(f"store:{store_id}")
@@ -0,0 +1,332 @@
+import heapq
+import threading
+import time
+from array import array
+from bisect import bisect_left, bisect_right
+
+from django.conf import settings
+
+from apps.products.models import Product
+from project.renderers import FastJSONRenderer, RawJSON
+
+SEP = "\x00"  # separates titles in SuggestionIndex.text
+# sorts after any character a title can contain; closes a prefix range
+HIGH = "\U0010ffff"
+MAX_ENCODED = 10_000  # memoized suggest_json() answers per index
+# answers precomputed per prefix / short infix: a page (10) plus room for overlay-hidden titles
+TOP_K = 16
+# prefixes matching more titles than this get a precomputed answer; smaller ranges are sorted on demand
+HEAVY_PREFIX = 64
+
+
+class SuggestionIndex:
+    """
+    In-memory autocomplete index over Product.title.
+
+    - titles/ids are sorted by title, so a title's position is its
+      alphabetical rank and "top N alphabetically" is "N smallest positions"
+    - prefix_keys: lowercased titles, sorted, with prefix_pos mapping each key
+      back to its title position; bisect gives every title starting with q.
+      Prefixes matching more than HEAVY_PREFIX titles have their TOP_K first
+      positions precomputed (prefix_top), so no lookup sorts a large range
+    - trigrams: per 3-character string, the positions of the titles
+      containing it, ascending (= alphabetical). Longer infix queries walk the
+      rarest trigram's list and check each title, stopping once the page is
+      full; a query with an unknown trigram is answered without a scan
+    - short_infix: for every 1- and 2-character string, the TOP_K first
+      titles containing it but not starting with it (merged from trigrams)
+    - text: all lowercased titles joined in alphabetical order, used to check
+      trigram candidates and as the fallback scan when overlay-hidden titles
+      push a precomputed answer below the page size
+
+    This reproduces ProductSuggestView's database path exactly: titles
+    starting with q first, then the other titles containing q, each
+    alphabetical, top 10.
+
+    Changes after the build are kept in a small overlay (`upsert`/`remove`)
+    instead of re-sorting; the holder rebuilds once the overlay grows.
+    """
+
+    def __init__(self, rows):
+        rows = sorted(rows, key=lambda row: (row[1], row[0]))
+        self.ids = array("q", (pid for pid, _ in rows))
+        self.titles = [title for _, title in rows]
+        self.built_at = time.monotonic()
+
+        lowered = [title.lower().replace(SEP, " ") for title in self.titles]
+        order = sorted(range(len(lowered)), key=lowered.__getitem__)
+        self.prefix_keys = [lowered[i] for i in order]
+        self.prefix_pos = array("l", order)
+
+        self.text = SEP.join(lowered)
+        self.offsets = array("l")
+        offset = 0
+        for text in lowered:
+            self.offsets.append(offset)
+            offset += len(text) + 1
+        self.offsets.append(offset)  # end sentinel: title pos spans offsets[pos]:offsets[pos + 1] - 1
+
+        self.prefix_top = {}
+        if len(lowered) > HEAVY_PREFIX:
+            self._build_prefix_top("", 0, len(lowered))
+        self._build_ngrams(lowered)
+
+        self._lock = threading.Lock()
+        self._upserts = {}  # product id -> title, added or changed since build
+        self._hidden = set()  # product ids whose built entry is stale
+        self._version = 0  # bumped by every overlay change
+        self._encoded = {}  # (version, q, limit) -> RawJSON
+
+    def __len__(self):
+        return len(self.titles)
+
+    def _build_prefix_top(self, prefix, lo, hi):
+        """TOP_K first positions of prefix_keys[lo:hi] (all starting with `prefix`), recorded for heavy prefixes."""
+        keys, positions, depth = self.prefix_keys, self.prefix_pos, len(prefix)
+        i = bisect_right(keys, prefix, lo, hi)  # titles equal to the prefix
+        pool = list(positions[lo:i])
+        while i < hi:
+            child = keys[i][:depth + 1]
+            j = bisect_left(keys, child + HIGH, i, hi)
+            if j - i > HEAVY_PREFIX:
+                pool.extend(self._build_prefix_top(child, i, j))
+            else:
+                pool.extend(positions[i:j])
+            i = j
+        top = array("l", heapq.nsmallest(TOP_K, pool))
+        self.prefix_top[prefix] = top
+        return top
+
+    def _build_ngrams(self, lowered):
+        # trigram postings; the two SEPs make every 1- and 2-character substring the start of a trigram
+        trigrams = self.trigrams = {}  # 3 characters -> array of positions
+        for pos, text in enumerate(lowered):
+            text += SEP + SEP
+            for gram in {text[i:i + 3] for i in range(len(text) - 2)}:
+                try:
+                    trigrams[gram].append(pos)
+                except KeyError:
+                    trigrams[gram] = array("i", (pos,))
+
+        by_start = {}
+        for gram in trigrams:
+            by_start.setdefault(gram[0], []).append(trigrams[gram])
+            if gram[1] != SEP:
+                by_start.setdefault(gram[:2], []).append(trigrams[gram])
+        self.short_infix = {}  # 1-2 characters -> array of TOP_K positions
+        for gram, postings in by_start.items():
+            top = array("l")
+            for pos in heapq.merge(*postings):
+                if (not top or top[-1] != pos) and not lowered[pos].startswith(gram):
+                    top.append(pos)
+                    if len(top) == TOP_K:
+                        break
+            if top:
+                self.short_infix[gram] = top
+
+    @classmethod
+    def from_database(cls, chunk_size=20_000):
+        return cls(Product.objects.values_list("id", "title").iterator(chunk_size=chunk_size))
+
+    @property
+    def overlay_size(self):
+        return len(self._upserts) + len(self._hidden)
+
+    def upsert(self, product_id, title):
+        with self._lock:
+            self._hidden.add(product_id)
+            self._upserts[product_id] = title
+            self._changed()
+
+    def remove(self, product_id):
+        with self._lock:
+            self._hidden.add(product_id)
+            self._upserts.pop(product_id, None)
+            self._changed()
+
+    def _changed(self):
+        self._version += 1
+        self._encoded = {}
+
+    def _visible(self, positions, limit):
+        hidden = self._hidden
+        if hidden:
+            ids = self.ids
+            positions = [pos for pos in positions if ids[pos] not in hidden]
+        return list(positions[:limit])
+
+    def _prefix_positions(self, q, limit):
+        """The `limit` alphabetically first visible titles starting with q."""
+        top = self.prefix_top.get(q)
+        if top is not None:
+            result = self._visible(top, limit)
+            if len(result) == limit:
+                return result
+        lo = bisect_left(self.prefix_keys, q)
+        hi = bisect_left(self.prefix_keys, q + HIGH)
+        pool = heapq.nsmallest(limit + len(self._hidden), self.prefix_pos[lo:hi])
+        return self._visible(pool, limit)
+
+    def _infix_positions(self, q, limit):
+        """The `limit` alphabetically first visible titles containing q but not starting with it."""
+        if not q:
+            return []
+        if len(q) < 3:
+            top = self.short_infix.get(q)
+            if top is None:
+                return []
+            result = self._visible(top, limit)
+            if len(result) == limit or len(top) < TOP_K:
+                return result
+            return self._scan_infix(q, limit)
+
+        lists = []
+        for i in range(len(q) - 2):
+            found = self.trigrams.get(q[i:i + 3])
+            if found is None:
+                return []
+            lists.append(found)
+        text, offsets, ids, hidden = self.text, self.offsets, self.ids, self._hidden
+        result = []
+        for pos in min(lists, key=len):
+            start, end = offsets[pos], offsets[pos + 1] - 1
+            if (
+                text.find(q, start + 1, end) >= 0
+                and not text.startswith(q, start, end)
+                and not (hidden and ids[pos] in hidden)
+            ):
+                result.append(pos)
+                if len(result) == limit:
+                    break
+        return result
+
+    def _scan_infix(self, q, limit):
+        """_infix_positions by scanning the whole text; only needed when overlay changes hide precomputed answers."""
+        text, offsets, ids, hidden = self.text, self.offsets, self.ids, self._hidden
+        result = []
+        start = 0
+        while len(result) < limit:
+            found = text.find(q, start)
+            if found < 0:
+                break
+            pos = bisect_right(offsets, found) - 1
+            if found != offsets[pos] and not (hidden and ids[pos] in hidden):
+                result.append(pos)
+            # continue with the next title
+            start = offsets[pos + 1]
+        return result
+
+    def suggest(self, q, limit=10):
+        q = q.lower()
+        if SEP in q:
+            return []
+
+        prefix = self._prefix_positions(q, limit)
+        infix = self._infix_positions(q, limit - len(prefix)) if len(prefix) < limit else []
+
+        candidates = [(0, self.titles[pos]) for pos in prefix]
+        candidates += [(1, self.titles[pos]) for pos in infix]
+        # overlay entries: few, checked directly
+        for title in list(self._upserts.values()):
+            lowered = title.lower()
+            if lowered.startswith(q):
+                candidates.append((0, title))
+            elif q in lowered:
+                candidates.append((1, title))
+        candidates.sort()
+        return [title for _, title in candidates[:limit]]
+
+    def suggest_json(self, q, limit=10):
+        """suggest() as pre-encoded JSON, memoized until the overlay changes."""
+        key = (self._version, q.lower(), limit)
+        encoded = self._encoded.get(key)
+        if encoded is None:
+            encoded = RawJSON(FastJSONRenderer().render(self.suggest(q, limit)))
+            if len(self._encoded) >= MAX_ENCODED:
+                self._encoded = {}
+            self._encoded[key] = encoded
+        return encoded
+
+
+class SuggestionIndexHolder:
+    """
+    Process-wide SuggestionIndex: built lazily on first use, patched from
+    Product signals, and rebuilt in the background when the overlay exceeds
+    SUGGEST_INDEX_MAX_OVERLAY entries or the index is older than
+    SUGGEST_INDEX_MAX_AGE seconds (other processes' writes only show up then).
+    """
+
+    def __init__(self):
+        self._index = None
+        self._lock = threading.Lock()
+        self._rebuilding = False
+        self._journal = None  # changes seen while a rebuild is running
+
+    def get(self):
+        index = self._index
+        if index is None:
+            with self._lock:
+                if self._index is None:
+                    self._index = SuggestionIndex.from_database()
+                index = self._index
+        elif self._is_stale(index):
+            self._rebuild_in_background()
+        return index
+
+    def _is_stale(self, index):
+        return (
+            index.overlay_size > settings.SUGGEST_INDEX_MAX_OVERLAY
+            or time.monotonic() - index.built_at > settings.SUGGEST_INDEX_MAX_AGE
+        )
+
+    def _rebuild_in_background(self):
+        with self._lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._rebuild, name="suggest-index", daemon=True).start()
+
+    def _rebuild(self):
+        from django.db import connection
+
+        try:
+            self.rebuild()
+        finally:
+            self._rebuilding = False
+            connection.close()
+
+    def rebuild(self):
+        with self._lock:
+            self._journal = []
+        try:
+            index = SuggestionIndex.from_database()
+        finally:
+            with self._lock:
+                journal, self._journal = self._journal, None
+        # replay writes that may have missed the snapshot
+        for method, args in journal:
+            getattr(index, method)(*args)
+        with self._lock:
+            self._index = index
+        return index
+
+    def reset(self):
+        with self._lock:
+            self._index = None
+
+    def _apply(self, method, *args):
+        with self._lock:
+            if self._journal is not None:
+                self._journal.append((method, args))
+            index = self._index
+        if index is not None:
+            getattr(index, method)(*args)
+
+    def upsert(self, product_id, title):
+        self._apply("upsert", product_id, title)
+
+    def remove(self, product_id):
+        self._apply("remove", product_id)
+
+
+suggestion_index = SuggestionIndexHolder()
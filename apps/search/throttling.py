@@ -1,54 +1,153 @@
+import threading
 import time
-import redis
-from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
-from django.conf import settings
+import uuid
+from collections import OrderedDict
+
+from django.core.exceptions import ImproperlyConfigured
+from rest_framework.settings import api_settings
 from rest_framework.throttling import BaseThrottle
 
-# Redis client (lazy connect)
-r = redis.Redis.from_url(settings.REDIS_URL)
+from project.redis_client import REDIS_ERRORS, redis_client
+
+# Sliding-window log in one round trip. Timestamps come from the Redis clock
+# so every web process agrees on the window. Only allowed requests are
+# recorded, each under a unique member, so requests within the same
+# millisecond all count. Returns {allowed, count, wait_ms}.
+SLIDING_WINDOW_LUA = """
+local key = KEYS[1]
+local limit = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local t = redis.call('TIME')
+local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+
+redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+local count = redis.call('ZCARD', key)
+if count < limit then
+    redis.call('ZADD', key, now, ARGV[3])
+    redis.call('PEXPIRE', key, window)
+    return {1, count + 1, 0}
+end
+local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+return {0, count, tonumber(oldest[2]) + window - now}
+"""
+
+sliding_window = redis_client.register_script(SLIDING_WINDOW_LUA)
+
+
+class TokenBucket:
+    """`capacity` tokens, refilled continuously at `capacity / window` per second."""
+
+    __slots__ = ("capacity", "rate", "tokens", "updated")
+
+    def __init__(self, capacity, window):
+        self.capacity = capacity
+        self.rate = capacity / window
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+
+    def take(self):
+        """Returns (allowed, seconds until the next token)."""
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+        if self.tokens >= 1:
+            self.tokens -= 1
+            return True, 0.0
+        return False, (1 - self.tokens) / self.rate
+
+
+class LocalBuckets:
+    """Per-process token buckets, bounded LRU by key."""
+
+    def __init__(self, max_entries=10_000):
+        self.max_entries = max_entries
+        self._buckets = OrderedDict()
+        self._lock = threading.Lock()
+
+    def take(self, key, limit, window):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None or (bucket.capacity, bucket.rate) != (limit, limit / window):
+                bucket = self._buckets[key] = TokenBucket(limit, window)
+            self._buckets.move_to_end(key)
+            while len(self._buckets) > self.max_entries:
+                self._buckets.popitem(last=False)
+            return bucket.take()
 
+    def clear(self):
+        with self._lock:
+            self._buckets.clear()
 
-class SuggestRateThrottle(BaseThrottle):
+
+local_buckets = LocalBuckets()
+
+
+class SlidingWindowRateThrottle(BaseThrottle):
     """
-    Throttle: max 20 requests per minute per IP.
+    Exact sliding-window limit per client IP, enforced in Redis by one Lua
+    script call per request.
+
+    The limit comes from REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"][scope]
+    ("20/min" style, like DRF's own throttles). A view can use its own scope
+    (and so its own counters and rate) with `throttle_scope`, or override the
+    rate with `throttle_rate`.
 
-    IMPORTANT:
-    - If Redis is down / not reachable, we DO NOT break the request.
-      We just skip throttling and allow the request (graceful fallback).
+    If Redis is unreachable the request goes through a per-process token
+    bucket with the same rate instead, so the limit still holds per process.
     """
-    rate = 20  # requests per minute
+
+    scope = None
+    cache_format = "throttle:{scope}:{ident}"
 
     def get_ident(self, request):
         # identify client by IP (simplest)
         return request.META.get("REMOTE_ADDR", "anonymous")
 
+    def get_scope(self, view):
+        return getattr(view, "throttle_scope", None) or self.scope
+
+    def get_rate(self, view, scope):
+        rate = getattr(view, "throttle_rate", None)
+        if rate is None:
+            try:
+                rate = api_settings.DEFAULT_THROTTLE_RATES[scope]
+            except KeyError:
+                raise ImproperlyConfigured(f"No throttle rate set for scope {scope!r}")
+        return rate
+
+    @staticmethod
+    def parse_rate(rate):
+        """"20/min" -> (20, 60); the period may be s/sec, m/min, h/hour, d/day."""
+        if rate is None:
+            return None, None
+        num, period = rate.split("/")
+        return int(num), {"s": 1, "m": 60, "h": 3600, "d": 86400}[period[0]]
+
     def allow_request(self, request, view):
-        ident = self.get_ident(request)
-        key = f"suggest:{ident}"
-        now = int(time.time())
+        scope = self.get_scope(view)
+        limit, window = self.parse_rate(self.get_rate(view, scope))
+        if limit is None:
+            return True
+        key = self.cache_format.format(scope=scope, ident=self.get_ident(request))
 
         try:
-            with r.pipeline() as pipe:
-                # 1) Remove timestamps older than 60 seconds
-                pipe.zremrangebyscore(key, 0, now - 60)
-                # 2) Add current timestamp
-                pipe.zadd(key, {str(now): now})
-                # 3) Count entries in last 60s
-                pipe.zcard(key)
-                # 4) Keep key alive
-                pipe.expire(key, 60)
-                results = pipe.execute()
-
-            # results = [None, None, count, True/False]
-            count = results[2]
-
-            return count <= self.rate
-
-        except (RedisConnectionError, RedisTimeoutError, OSError):
-            # Redis is not running / not reachable:
-            # -> fail OPEN (no throttling) instead of 500
-            return True
+            allowed, _, wait_ms = sliding_window(
+                keys=[key], args=[limit, window * 1000, uuid.uuid4().hex]
+            )
+            self._wait = wait_ms / 1000
+            self.backend = "redis"
+        except REDIS_ERRORS:
+            allowed, self._wait = local_buckets.take(key, limit, window)
+            self.backend = "local"
+        return bool(allowed)
 
     def wait(self):
-        # how long client should wait when throttled (DRF uses this)
-        return 60
+        # seconds until the oldest request leaves the window (Retry-After)
+        wait = getattr(self, "_wait", 0)
+        return wait if wait > 0 else None
+
+
+class SuggestRateThrottle(SlidingWindowRateThrottle):
+    """Autocomplete: REST_FRAMEWORK["DEFAULT_THROTTLE_RATES"]["suggest"] per IP."""
+
+    scope = "suggest"
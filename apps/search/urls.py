@@ -1,7 +1,8 @@
 from django.urls import path
-from .views import ProductSearchView, ProductSuggestView
+from .views import ProductSearchView, ProductSuggestView, SearchCacheStatsView
 
 urlpatterns = [
     path("products/", ProductSearchView.as_view(), name="product-search"),
     path("suggest/", ProductSuggestView.as_view(), name="product-suggest"),
+    path("cache/stats/", SearchCacheStatsView.as_view(), name="search-cache-stats"),
 ]
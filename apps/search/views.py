@@ -1,13 +1,26 @@
+import json
+
+from django.conf import settings
 from django.db import models
-from django.db.models import Q, Case, When, IntegerField, OuterRef, Subquery
+from django.db.models import Case, When, IntegerField, F, FilteredRelation, Q
+from django.db.models.functions import Coalesce
+from django.http import HttpResponse
 from rest_framework.generics import ListAPIView
 from rest_framework.pagination import PageNumberPagination
 from rest_framework import serializers, status
+from rest_framework.exceptions import ValidationError
 from rest_framework.views import APIView
 from rest_framework.response import Response
 
+from project.fastserializers import CompiledListMixin
+from project.pagination import KeysetPagination, KeysetPaginationMixin
+from project.renderers import RawJSON
+from project.replicas import serving_from_replica
 from apps.products.models import Product
-from apps.stores.models import Inventory
+from .backends import get_search_backend
+from .cache import search_cache
+from .facets import compute_facets, parse_facets
+from .suggest import suggestion_index
 from .throttling import SuggestRateThrottle
 
 
@@ -20,33 +33,159 @@ class ProductSearchSerializer(serializers.ModelSerializer):
         fields = ["id", "title", "description", "price", "category_name", "quantity"]
 
 
+class MultiStoreProductSearchSerializer(ProductSearchSerializer):
+    """`quantity` is the total over the requested stores, `quantities` per store."""
+
+    quantities = serializers.SerializerMethodField()
+
+    class Meta(ProductSearchSerializer.Meta):
+        fields = ProductSearchSerializer.Meta.fields + ["quantities"]
+
+    def get_quantities(self, obj):
+        return {str(sid): getattr(obj, f"quantity_{sid}") for sid in self.context["store_ids"]}
+
+
+class AvailableProductSearchSerializer(ProductSearchSerializer):
+    """In-stock search of one store: the category name comes from the availability read model."""
+
+    category_name = serializers.CharField(source="store_category_name")
+
+
+MAX_STORES = 10
+
+
+def parse_store_ids(value):
+    """?store_id=1 or ?store_id=1,2,3 -> [1, 2, 3] (deduplicated, in order)."""
+    try:
+        store_ids = list(dict.fromkeys(int(part) for part in value.split(",") if part.strip()))
+    except ValueError:
+        raise ValidationError({"store_id": "Expected a store id or a comma-separated list of ids."})
+    if len(store_ids) > MAX_STORES:
+        raise ValidationError({"store_id": f"At most {MAX_STORES} stores per request."})
+    return store_ids
+
+
+def annotate_store_stock(qs, store_ids, in_stock=False):
+    """
+    Annotate `quantity` (and `quantity_<id>` per store when several are given)
+    by joining Inventory on (store_id, product_id), which is exactly the
+    unique_together index, instead of a correlated subquery per product row.
+
+    With in_stock the WHERE quantity > 0 rejects NULLs, so the planner turns the
+    single-store LEFT JOIN into an inner join and can drive the query from the
+    store's stocked rows in inventory_in_stock_idx. For several stores a
+    product is in stock when any of them has it.
+
+    With settings.AVAILABILITY_READ_MODEL the stock is joined from the
+    availability read model instead (same key, indexed on (store, quantity)),
+    and an in-stock search of one store also takes `store_category_name` from
+    it, so the Category join is only needed for text matching and facets.
+    """
+    read_model = settings.AVAILABILITY_READ_MODEL
+    relation = "availability" if read_model else "inventories"
+    if len(store_ids) == 1:
+        qs = qs.annotate(
+            store_stock=FilteredRelation(relation, condition=Q(**{f"{relation}__store_id": store_ids[0]})),
+            quantity=F("store_stock__quantity"),
+        )
+        if in_stock:
+            # on the annotation, so the join is reused (a path lookup would add a second one)
+            qs = qs.filter(quantity__gt=0)
+            if read_model:
+                qs = qs.annotate(store_category_name=F("store_stock__category_name"))
+        return qs
+
+    in_any_store = Q()
+    for sid in store_ids:
+        alias = f"stock_{sid}"
+        qs = qs.annotate(
+            **{
+                alias: FilteredRelation(relation, condition=Q(**{f"{relation}__store_id": sid})),
+                f"quantity_{sid}": F(f"{alias}__quantity"),
+            }
+        )
+        in_any_store |= Q(**{f"quantity_{sid}__gt": 0})
+    qs = qs.annotate(
+        quantity=sum(Coalesce(F(f"quantity_{sid}"), 0) for sid in store_ids)
+    )
+    if in_stock:
+        qs = qs.filter(in_any_store)
+    return qs
+
+
 class ProductSearchPagination(PageNumberPagination):
     page_size = 20
     page_size_query_param = "page_size"
     max_page_size = 100
 
 
-class ProductSearchView(ListAPIView):
+class ProductSearchKeysetPagination(KeysetPagination):
+    max_page_size = 100
+
+    def get_ordering(self, request, queryset, view):
+        return view.get_ordering()
+
+
+# (field, descending) pairs per ?sort=, always ending with the unique id
+SORT_ORDERINGS = {
+    "price": (("price", False), ("id", False)),
+    "newest": (("created_at", True), ("id", True)),
+    "relevance": (("relevance", True), ("title", False), ("id", False)),
+    "title": (("title", False), ("id", False)),
+}
+
+
+class ProductSearchView(CompiledListMixin, KeysetPaginationMixin, ListAPIView):
     serializer_class = ProductSearchSerializer
+    query_budget = 3  # count, page, facets
+    read_replica = True  # see project/replicas.py
     pagination_class = ProductSearchPagination
+    keyset_pagination_class = ProductSearchKeysetPagination
+
+    def get_store_ids(self):
+        if not hasattr(self, "_store_ids"):
+            store_id = self.request.query_params.get("store_id")
+            self._store_ids = parse_store_ids(store_id) if store_id else []
+        return self._store_ids
+
+    def get_serializer_class(self):
+        store_ids = self.get_store_ids()
+        if len(store_ids) > 1:
+            return MultiStoreProductSearchSerializer
+        if store_ids and settings.AVAILABILITY_READ_MODEL and self.request.query_params.get("in_stock") == "true":
+            return AvailableProductSearchSerializer
+        return super().get_serializer_class()
+
+    def get_serializer_context(self):
+        return {**super().get_serializer_context(), "store_ids": self.get_store_ids()}
+
+    def get_ordering(self):
+        sort = self.request.query_params.get("sort")  # price|newest|relevance
+        if sort == "relevance" and not self.request.query_params.get("q"):
+            sort = "title"
+        return SORT_ORDERINGS.get(sort, SORT_ORDERINGS["title"])
 
     def get_queryset(self):
+        return self.filter_products().order_by(
+            *[("-" if desc else "") + field for field, desc in self.get_ordering()]
+        )
+
+    def filter_products(self):
+        """Matching products with relevance and quantity annotations, unordered."""
         qs = Product.objects.select_related("category")
         request = self.request
         q = request.query_params.get("q")
         category_id = request.query_params.get("category")
         price_min = request.query_params.get("price_min")
         price_max = request.query_params.get("price_max")
-        store_id = request.query_params.get("store_id")
+        store_ids = self.get_store_ids()
         in_stock = request.query_params.get("in_stock")
-        sort = request.query_params.get("sort")  # price|newest|relevance
 
+        # text match + relevance annotation (see apps/search/backends.py)
         if q:
-            qs = qs.filter(
-                Q(title__icontains=q)
-                | Q(description__icontains=q)
-                | Q(category__name__icontains=q)
-            )
+            qs = get_search_backend().search(qs, q)
+        else:
+            qs = qs.annotate(relevance=models.Value(0, IntegerField()))
 
         if category_id:
             qs = qs.filter(category_id=category_id)
@@ -56,46 +195,68 @@ class ProductSearchView(ListAPIView):
         if price_max:
             qs = qs.filter(price__lte=price_max)
 
-        # annotate qty for a given store if provided
-        if store_id:
-            inv_sub = Inventory.objects.filter(
-                store_id=store_id, product_id=OuterRef("pk")
-            ).values("quantity")[:1]
-            qs = qs.annotate(quantity=Subquery(inv_sub))
-            if in_stock == "true":
-                qs = qs.filter(quantity__gt=0)
+        # annotate qty for the given store(s) if provided
+        if store_ids:
+            qs = annotate_store_stock(qs, store_ids, in_stock=in_stock == "true")
         else:
             qs = qs.annotate(quantity=models.Value(None, IntegerField()))
 
-        # simple relevance scoring
-        if q:
-            qs = qs.annotate(
-                relevance=Case(
-                    When(title__icontains=q, then=3),
-                    When(description__icontains=q, then=2),
-                    When(category__name__icontains=q, then=1),
-                    default=0,
-                    output_field=IntegerField(),
-                )
-            )
-        else:
-            qs = qs.annotate(relevance=models.Value(0, IntegerField()))
-
-        if sort == "price":
-            qs = qs.order_by("price")
-        elif sort == "newest":
-            qs = qs.order_by("-created_at")
-        elif sort == "relevance" and q:
-            qs = qs.order_by("-relevance", "title")
-        else:
-            qs = qs.order_by("title")
-
         return qs
 
+    def get_facets(self, request):
+        """
+        ?facets=category,price,in_stock over the filtered products. Cached on
+        its own (filters only), so paging and re-sorting reuse it.
+        """
+        names = parse_facets(request.query_params["facets"])
+        if not names:
+            return {}
+        key = None
+        if settings.SEARCH_CACHE_ENABLED:
+            key = search_cache.facets_key_for(request.query_params, names)
+            cached = search_cache.get(key)
+            if cached is not None:
+                return RawJSON(cached)  # spliced into the response as-is
+        facets = compute_facets(self.filter_products(), names, with_stock=bool(self.get_store_ids()))
+        if key is not None and not serving_from_replica():
+            search_cache.set(key, json.dumps(facets).encode())
+        return facets
+
     def list(self, request, *args, **kwargs):
+        # rendered JSON is cached per query + catalog/category/store generation
+        if not settings.SEARCH_CACHE_ENABLED or request.accepted_renderer.format != "json":
+            return self.search(request, *args, **kwargs)
+
+        key = search_cache.key_for(request.query_params, request.get_host())
+        body = search_cache.get(key)
+        if body is not None:
+            response = HttpResponse(body, content_type="application/json")
+            response["X-Search-Cache"] = "hit"
+            return response
+
+        response = self.search(request, *args, **kwargs)
+        response["X-Search-Cache"] = "miss"
+        # a lagging replica's result would outlive the generation bump of a write it missed
+        if response.status_code == 200 and not serving_from_replica():
+            response.add_post_render_callback(lambda r: search_cache.set(key, r.content))
+        return response
+
+    def search(self, request, *args, **kwargs):
+        facets = self.get_facets(request) if request.query_params.get("facets") else None
+
         # Get the standard paginated response from DRF
         response = super().list(request, *args, **kwargs)
 
+        if isinstance(self.paginator, KeysetPagination):
+            # cursor mode: {"page_size", "next", "results"[, "estimated_count"][, "facets"]}
+            response.data = {
+                "page_size": self.paginator.get_page_size(request),
+                **response.data,
+            }
+            if facets is not None:
+                response.data["facets"] = facets
+            return response
+
         # DRF default: {"count": X, "next": ..., "previous": ..., "results": [...]}
         paginated = response.data
 
@@ -106,11 +267,22 @@ class ProductSearchView(ListAPIView):
             "page_size": self.paginator.page.paginator.per_page,
             "results": paginated.get("results", []),
         }
+        if facets is not None:
+            response.data["facets"] = facets
         return response
 
 
+class SearchCacheStatsView(APIView):
+    """Hit/miss counters of the product search result cache."""
+
+    def get(self, request):
+        return Response(search_cache.snapshot())
+
+
 class ProductSuggestView(APIView):
     throttle_classes = [SuggestRateThrottle]
+    query_budget = 1
+    read_replica = True
 
     def get(self, request):
         q = request.query_params.get("q", "").strip()
@@ -120,6 +292,9 @@ class ProductSuggestView(APIView):
                 status=status.HTTP_400_BAD_REQUEST,
             )
 
+        if settings.SUGGEST_BACKEND == "index":
+            return Response({"suggestions": suggestion_index.get().suggest_json(q)})
+
         qs = (
             Product.objects.filter(title__icontains=q)
             .annotate(
@@ -0,0 +1,92 @@
+"""
+Sync of the StoreProductAvailability read model.
+
+Every write is one set-based statement over the affected rows:
+
+    INSERT INTO availability (...)
+    SELECT inventory.id, ..., product.title, product.price, category.name, inventory.quantity
+    FROM inventory JOIN product JOIN category
+    WHERE <scope>
+    ON CONFLICT (inventory_id) DO UPDATE SET title = excluded.title, ...
+
+so a stock change, a product edit and a category rename all go through the
+same copy of the join. Deleted inventory rows (and products and stores)
+take their availability rows with them through the CASCADE foreign keys.
+
+Writes only happen while settings.AVAILABILITY_READ_MODEL is on; after
+turning it on, fill the table with `manage.py rebuild_availability`.
+"""
+from django.conf import settings
+from django.db import connection, transaction
+
+from apps.products.models import Category, Product
+from project.sql import in_lists
+from .models import Inventory, Store, StoreProductAvailability
+
+COLUMNS = ("inventory_id", "store_id", "product_id", "title", "price", "category_id", "category_name", "quantity")
+UPDATED_COLUMNS = COLUMNS[3:]
+
+
+def is_enabled():
+    return settings.AVAILABILITY_READ_MODEL
+
+
+def copy_sql(where, upsert=True):
+    """INSERT ... SELECT of the availability rows matching `where` (over i, p, c)."""
+    sql = (
+        f"INSERT INTO {StoreProductAvailability._meta.db_table} ({', '.join(COLUMNS)}) "
+        "SELECT i.id, i.store_id, i.product_id, p.title, p.price, p.category_id, c.name, i.quantity "
+        f"FROM {Inventory._meta.db_table} i "
+        f"JOIN {Product._meta.db_table} p ON p.id = i.product_id "
+        f"JOIN {Category._meta.db_table} c ON c.id = p.category_id "
+        # SQLite needs a WHERE before ON CONFLICT in INSERT ... SELECT
+        f"WHERE {where}"
+    )
+    if upsert:
+        sql += " ON CONFLICT (inventory_id) DO UPDATE SET " + ", ".join(
+            f"{column} = excluded.{column}" for column in UPDATED_COLUMNS
+        )
+    return sql
+
+
+def sync_availability(store_id=None, product_ids=None, category_id=None):
+    """
+    Re-copy the availability rows of a store, of some products (in every store
+    unless `store_id` is given) or of a category. No-op while the read model
+    is off. Runs in the caller's transaction, so readers never see the read
+    model and the inventory disagree.
+    """
+    if not is_enabled():
+        return
+    conditions, params = [], []
+    if store_id is not None:
+        conditions.append("i.store_id = %s")
+        params.append(store_id)
+    if category_id is not None:
+        conditions.append("p.category_id = %s")
+        params.append(category_id)
+    with connection.cursor() as cursor:
+        if product_ids is None:
+            cursor.execute(copy_sql(" AND ".join(conditions) or "1 = 1"), params)
+            return
+        for placeholders, batch in in_lists(product_ids):
+            where = " AND ".join(conditions + [f"i.product_id IN ({placeholders})"])
+            cursor.execute(copy_sql(where), params + batch)
+
+
+def rebuild_availability(store_ids=None):
+    """
+    Replace the read model of the given stores (default: all), one store per
+    transaction: delete its rows, then copy them back in one INSERT ... SELECT.
+    Returns the number of rows written.
+    """
+    if store_ids is None:
+        store_ids = list(Store.objects.order_by("id").values_list("id", flat=True))
+    total = 0
+    for store_id in store_ids:
+        with transaction.atomic():
+            StoreProductAvailability.objects.filter(store_id=store_id).delete()
+            with connection.cursor() as cursor:
+                cursor.execute(copy_sql("i.store_id = %s", upsert=False), [store_id])
+                total += cursor.rowcount
+    return total
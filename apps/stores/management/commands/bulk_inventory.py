@@ -0,0 +1,66 @@
+import json
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.stores.models import Store
+from apps.stores.services import (
+    MODES,
+    MODE_SET,
+    InventoryFeedError,
+    apply_inventory_updates,
+    iter_csv_updates,
+    iter_json_updates,
+    iter_ndjson_updates,
+)
+
+FORMATS = {".csv": "csv", ".ndjson": "ndjson", ".jsonl": "ndjson", ".json": "json"}
+
+
+class Command(BaseCommand):
+    help = "Apply a stock feed (CSV, NDJSON or JSON) to a store's inventory in chunked transactions"
+
+    def add_arguments(self, parser):
+        parser.add_argument("store_id", type=int)
+        parser.add_argument("path", help="feed file, or - for stdin")
+        parser.add_argument("--mode", choices=MODES, default=MODE_SET)
+        parser.add_argument("--format", choices=sorted(set(FORMATS.values())), help="default: from the extension")
+        parser.add_argument("--chunk-size", type=int, default=5000, help="rows per transaction")
+
+    def handle(self, *args, **options):
+        if not Store.objects.filter(id=options["store_id"]).exists():
+            raise CommandError(f"Store {options['store_id']} does not exist")
+        path = options["path"]
+        fmt = options["format"] or next(
+            (fmt for ext, fmt in FORMATS.items() if path.endswith(ext)), None
+        )
+        if fmt is None:
+            raise CommandError("Cannot tell the feed format from the file name; pass --format")
+
+        stream = sys.stdin if path == "-" else open(path, newline="", encoding="utf-8")
+        try:
+            if fmt == "csv":
+                rows = iter_csv_updates(stream)
+            elif fmt == "ndjson":
+                rows = iter_ndjson_updates(stream)
+            else:
+                data = json.load(stream)
+                rows = iter_json_updates(data.get("updates") if isinstance(data, dict) else data)
+            result = apply_inventory_updates(
+                options["store_id"], rows, options["mode"], options["chunk_size"]
+            )
+        except (InventoryFeedError, json.JSONDecodeError) as exc:
+            raise CommandError(str(exc))
+        finally:
+            if stream is not sys.stdin:
+                stream.close()
+
+        for error in result["errors"]:
+            self.stderr.write(f"line {error['line']}: product {error['product_id']}: {error['error']}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Updated {result['applied']} products from {result['rows']} rows ({result['mode']}, "
+                f"{result['rejected']} rejected) in {result['chunks']} chunks, "
+                f"{result['seconds']:.3f}s ({result['rows_per_second'] or 0} rows/s)"
+            )
+        )
@@ -0,0 +1,26 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.stores.availability import is_enabled, rebuild_availability
+from apps.stores.models import Store
+
+
+class Command(BaseCommand):
+    help = "Rebuild the per-store availability read model from Inventory, Product and Category"
+
+    def add_arguments(self, parser):
+        parser.add_argument("--store", type=int, action="append", help="only this store (repeatable)")
+
+    def handle(self, *args, **options):
+        store_ids = options["store"]
+        if store_ids:
+            missing = set(store_ids) - set(Store.objects.filter(id__in=store_ids).values_list("id", flat=True))
+            if missing:
+                raise CommandError(f"Unknown stores: {', '.join(map(str, sorted(missing)))}")
+        start = time.perf_counter()
+        total = rebuild_availability(store_ids)
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f"Copied {total} availability rows in {elapsed:.1f}s"))
+        if not is_enabled():
+            self.stdout.write("AVAILABILITY_READ_MODEL is off: the table is not read or kept in sync until it is on.")
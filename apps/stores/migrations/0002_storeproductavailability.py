@@ -0,0 +1,63 @@
+# Generated by Django 5.0.6 on 2026-10-18 10:42
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0001_initial"),
+        ("stores", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="StoreProductAvailability",
+            fields=[
+                (
+                    "inventory",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="availability",
+                        serialize=False,
+                        to="stores.inventory",
+                    ),
+                ),
+                ("title", models.CharField(max_length=255)),
+                ("price", models.DecimalField(decimal_places=2, max_digits=10)),
+                ("category_id", models.BigIntegerField()),
+                ("category_name", models.CharField(max_length=255)),
+                ("quantity", models.PositiveIntegerField()),
+                (
+                    "product",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="availability",
+                        to="products.product",
+                    ),
+                ),
+                (
+                    "store",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="+",
+                        to="stores.store",
+                    ),
+                ),
+            ],
+            options={
+                "indexes": [
+                    models.Index(
+                        fields=["store", "title", "inventory"],
+                        name="stores_avail_title_idx",
+                    ),
+                    models.Index(
+                        fields=["store", "quantity"], name="stores_avail_quantity_idx"
+                    ),
+                ],
+                "unique_together": {("store", "product")},
+            },
+        ),
+    ]
@@ -0,0 +1,22 @@
+# Generated by Django 5.0.6 on 2026-10-18 11:30
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("products", "0002_product_sort_indexes"),
+        ("stores", "0002_storeproductavailability"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="inventory",
+            index=models.Index(
+                condition=models.Q(("quantity__gt", 0)),
+                fields=["store", "product", "quantity"],
+                name="inventory_in_stock_idx",
+            ),
+        ),
+    ]
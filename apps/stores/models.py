@@ -17,6 +17,46 @@ class Inventory(models.Model):
 
     class Meta:
         unique_together = ("store", "product")
+        indexes = [
+            # in-stock search of one store: WHERE store_id = .. AND quantity > 0,
+            # answered from the index alone and only over the stocked rows
+            models.Index(
+                fields=["store", "product", "quantity"],
+                condition=models.Q(quantity__gt=0),
+                name="inventory_in_stock_idx",
+            ),
+        ]
 
     def __str__(self):
         return f"{self.store} - {self.product} ({self.quantity})"
+
+
+class StoreProductAvailability(models.Model):
+    """
+    Read model: one row per Inventory row with the product's title, price and
+    category copied in, so store listings and in-stock filters read a single
+    table. Written by apps/stores/availability.py, never directly.
+    """
+
+    inventory = models.OneToOneField(
+        Inventory, primary_key=True, on_delete=models.CASCADE, related_name="availability"
+    )
+    store = models.ForeignKey(Store, on_delete=models.CASCADE, related_name="+")
+    product = models.ForeignKey(Product, on_delete=models.CASCADE, related_name="availability")
+    title = models.CharField(max_length=255)
+    price = models.DecimalField(max_digits=10, decimal_places=2)
+    category_id = models.BigIntegerField()
+    category_name = models.CharField(max_length=255)
+    quantity = models.PositiveIntegerField()
+
+    class Meta:
+        unique_together = ("store", "product")
+        indexes = [
+            # store listing order: WHERE store_id = .. ORDER BY title, inventory_id
+            models.Index(fields=["store", "title", "inventory"], name="stores_avail_title_idx"),
+            # in-stock filter: WHERE store_id = .. AND quantity > 0
+            models.Index(fields=["store", "quantity"], name="stores_avail_quantity_idx"),
+        ]
+
+    def __str__(self):
+        return f"{self.store_id} - {self.title} ({self.quantity})"
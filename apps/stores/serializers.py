@@ -1,5 +1,5 @@
 from rest_framework import serializers
-from .models import Store, Inventory
+from .models import Store, Inventory, StoreProductAvailability
 
 
 class StoreSerializer(serializers.ModelSerializer):
@@ -16,3 +16,14 @@ class InventoryListSerializer(serializers.ModelSerializer):
     class Meta:
         model = Inventory
         fields = ["id", "product_title", "price", "category_name", "quantity"]
+
+
+class AvailabilityListSerializer(serializers.ModelSerializer):
+    """Same output as InventoryListSerializer, from the availability read model."""
+
+    id = serializers.IntegerField(source="inventory_id")
+    product_title = serializers.CharField(source="title")
+
+    class Meta:
+        model = StoreProductAvailability
+        fields = ["id", "product_title", "price", "category_name", "quantity"]
@@ -0,0 +1,189 @@
+import csv
+import json
+import time
+
+from django.db import connection, transaction
+from django.db.backends.base.operations import BaseDatabaseOperations
+
+from apps.products.models import Product
+from project.sql import in_lists
+from .availability import sync_availability
+from .models import Inventory
+from .signals import inventory_changed
+
+MODE_SET = "set"  # quantity is the new absolute stock level
+MODE_DELTA = "delta"  # quantity is added to the current stock (negative: sold)
+MODES = (MODE_SET, MODE_DELTA)
+
+MAX_REPORTED_ERRORS = 100
+# portable column ranges (SQLite stores 64 bits, Postgres integer/bigint columns don't)
+MAX_QUANTITY = BaseDatabaseOperations.integer_field_ranges["PositiveIntegerField"][1]
+MAX_PRODUCT_ID = BaseDatabaseOperations.integer_field_ranges[Product._meta.pk.get_internal_type()][1]
+
+
+class InventoryFeedError(ValueError):
+    """The feed as a whole can't be read (bad header, bad JSON, unknown mode)."""
+
+
+def iter_json_updates(items):
+    """(line, product_id, quantity) for a list of {"product_id", "quantity"} objects."""
+    if not isinstance(items, list):
+        raise InventoryFeedError("Expected a list of {product_id, quantity} objects.")
+    for line, item in enumerate(items, start=1):
+        if isinstance(item, dict):
+            yield line, item.get("product_id"), item.get("quantity")
+        else:
+            yield line, None, None
+
+
+def iter_ndjson_updates(lines):
+    """(line, product_id, quantity) per non-blank line of {"product_id", "quantity"} JSON."""
+    for line, text in enumerate(lines, start=1):
+        if not text.strip():
+            continue
+        try:
+            item = json.loads(text)
+        except ValueError:
+            item = None
+        if isinstance(item, dict):
+            yield line, item.get("product_id"), item.get("quantity")
+        else:
+            yield line, None, None
+
+
+def iter_csv_updates(lines):
+    """(line, product_id, quantity) per CSV row; the header must name both columns."""
+    reader = csv.DictReader(lines)
+    if not reader.fieldnames or not {"product_id", "quantity"} <= set(reader.fieldnames):
+        raise InventoryFeedError("CSV header must include product_id and quantity.")
+    for row in reader:
+        yield reader.line_num, row["product_id"], row["quantity"]
+
+
+def chunked(rows, size):
+    chunk = []
+    for row in rows:
+        chunk.append(row)
+        if len(chunk) >= size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def clean_chunk(rows, mode, reject):
+    """
+    {product_id: quantity} of the valid rows; last one wins (set) or they add
+    up (delta). Values outside the columns' range are rejected; a delta sum
+    is capped at +-MAX_QUANTITY, which doesn't change the clamped result.
+    """
+    updates = {}
+    for line, product_id, quantity in rows:
+        try:
+            product_id, quantity = int(product_id), int(quantity)
+        except (TypeError, ValueError):
+            reject(line, product_id, "product_id and quantity must be integers")
+            continue
+        if not 0 < product_id <= MAX_PRODUCT_ID:
+            reject(line, product_id, "unknown product")
+            continue
+        if abs(quantity) > MAX_QUANTITY:
+            reject(line, product_id, f"quantity must be at most {MAX_QUANTITY}")
+            continue
+        if mode == MODE_SET:
+            if quantity < 0:
+                reject(line, product_id, "quantity must be zero or more")
+                continue
+            updates[product_id] = quantity
+        else:
+            total = updates.get(product_id, 0) + quantity
+            updates[product_id] = max(-MAX_QUANTITY, min(MAX_QUANTITY, total))
+    known = set(Product.objects.filter(id__in=list(updates)).values_list("id", flat=True))
+    for product_id in set(updates) - known:
+        reject(None, product_id, "unknown product")
+        del updates[product_id]
+    return updates
+
+
+def apply_set(store_id, updates):
+    """Upsert absolute quantities: one INSERT ... ON CONFLICT (store, product) DO UPDATE."""
+    Inventory.objects.bulk_create(
+        [Inventory(store_id=store_id, product_id=pid, quantity=qty) for pid, qty in updates.items()],
+        update_conflicts=True,
+        unique_fields=["store", "product"],
+        update_fields=["quantity"],
+    )
+
+
+def apply_delta(store_id, updates):
+    """
+    Add deltas set-based: insert missing rows at 0, then per IN_LIST_SIZE
+    products (project/sql.py) one
+
+        UPDATE inventory SET quantity = LEAST(GREATEST(CAST(quantity AS BIGINT)
+            + CASE product_id WHEN .. THEN .. END, 0), MAX_QUANTITY)
+            WHERE store_id = .. AND product_id IN (..)
+
+    Stock stays between zero and MAX_QUANTITY; the sum is taken in 64 bits so
+    it can't overflow on the way. The statement is written by hand: building
+    the same CASE from When() objects costs more than running it.
+    """
+    Inventory.objects.bulk_create(
+        [Inventory(store_id=store_id, product_id=pid, quantity=0) for pid in updates],
+        ignore_conflicts=True,
+    )
+    greatest, least = ("GREATEST", "LEAST") if connection.vendor == "postgresql" else ("MAX", "MIN")
+    with connection.cursor() as cursor:
+        for placeholders, batch in in_lists(updates.items()):
+            cursor.execute(
+                f"UPDATE {Inventory._meta.db_table} SET quantity = "
+                f"{least}({greatest}(CAST(quantity AS BIGINT) + CASE product_id "
+                + " ".join(["WHEN %s THEN %s"] * len(batch))
+                + f" ELSE 0 END, 0), %s) WHERE store_id = %s AND product_id IN ({placeholders})",
+                [value for item in batch for value in item] + [MAX_QUANTITY, store_id] + [pid for pid, _ in batch],
+            )
+
+
+def apply_inventory_updates(store_id, rows, mode=MODE_SET, chunk_size=5000):
+    """
+    Apply (line, product_id, quantity) rows to a store's inventory, `chunk_size`
+    rows per transaction, so a large feed never holds locks for long and a
+    failure only loses the current chunk. Invalid rows and unknown products
+    are skipped and reported. Every chunk also refreshes the availability read
+    model, and once committed sends inventory_changed, which invalidates the
+    cached search results of the store.
+    """
+    if mode not in MODES:
+        raise InventoryFeedError(f"mode must be one of {', '.join(MODES)}.")
+    apply = apply_set if mode == MODE_SET else apply_delta
+    errors = []
+    result = {"mode": mode, "rows": 0, "applied": 0, "rejected": 0, "chunks": 0}
+
+    def reject(line, product_id, message):
+        result["rejected"] += 1
+        if len(errors) < MAX_REPORTED_ERRORS:
+            errors.append({"line": line, "product_id": product_id, "error": message})
+
+    started = time.perf_counter()
+    for chunk in chunked(rows, chunk_size):
+        result["rows"] += len(chunk)
+        with transaction.atomic():
+            updates = clean_chunk(chunk, mode, reject)
+            if not updates:
+                continue
+            apply(store_id, updates)
+            product_ids = sorted(updates)
+            sync_availability(store_id=store_id, product_ids=product_ids)
+            transaction.on_commit(
+                lambda ids=product_ids: inventory_changed.send(
+                    sender=Inventory, store_id=store_id, product_ids=ids
+                )
+            )
+        result["applied"] += len(updates)
+        result["chunks"] += 1
+
+    elapsed = time.perf_counter() - started
+    result["seconds"] = round(elapsed, 3)
+    result["rows_per_second"] = round(result["rows"] / elapsed) if elapsed else None
+    result["errors"] = errors
+    return result
@@ -0,0 +1,38 @@
+from django.db.models.signals import post_save
+from django.dispatch import Signal, receiver
+
+from apps.products.models import Category, Product
+from .availability import sync_availability
+from .models import Inventory
+
+# Sent after stock changed through bulk/queryset updates that bypass
+# Inventory.save() (e.g. order placement). Arguments: store_id, product_ids.
+inventory_changed = Signal()
+
+
+# -- availability read model (see apps/stores/availability.py) ---------------
+# Deletes cascade to the read model. Writes that bypass save() (order
+# placement, bulk feeds) call sync_availability() themselves, in their
+# transaction.
+
+
+@receiver(post_save, sender=Inventory, dispatch_uid="availability_inventory_saved")
+def sync_inventory(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    sync_availability(store_id=instance.store_id, product_ids=[instance.product_id])
+
+
+@receiver(post_save, sender=Product, dispatch_uid="availability_product_saved")
+def sync_product(sender, instance, created=False, raw=False, **kwargs):
+    # a new product isn't stocked anywhere yet
+    if raw or created:
+        return
+    sync_availability(product_ids=[instance.id])
+
+
+@receiver(post_save, sender=Category, dispatch_uid="availability_category_saved")
+def sync_category(sender, instance, created=False, raw=False, **kwargs):
+    if raw or created:
+        return
+    sync_availability(category_id=instance.id)
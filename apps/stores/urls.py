@@ -1,6 +1,12 @@
 from django.urls import path
-from .views import StoreInventoryListView
+from .views import StoreInventoryBulkView, StoreInventoryExportView, StoreInventoryListView
 
 urlpatterns = [
     path("<int:store_id>/inventory/", StoreInventoryListView.as_view(), name="store-inventory"),
+    path("<int:store_id>/inventory/bulk/", StoreInventoryBulkView.as_view(), name="store-inventory-bulk"),
+    path(
+        "<int:store_id>/inventory/export.<str:fmt>",
+        StoreInventoryExportView.as_view(),
+        name="store-inventory-export",
+    ),
 ]
@@ -1,15 +1,121 @@
+import codecs
+
+from django.conf import settings
+from django.shortcuts import get_object_or_404
+from rest_framework.exceptions import ValidationError
 from rest_framework.generics import ListAPIView
-from .models import Inventory
-from .serializers import InventoryListSerializer
+from rest_framework.parsers import JSONParser
+from rest_framework.response import Response
+from rest_framework.views import APIView
+from project.exports import StreamingExportView
+from project.fastserializers import CompiledListMixin
+from project.pagination import KeysetPagination, KeysetPaginationMixin
+from .models import Inventory, Store, StoreProductAvailability
+from .serializers import AvailabilityListSerializer, InventoryListSerializer
+from .services import (
+    MODE_SET,
+    InventoryFeedError,
+    apply_inventory_updates,
+    iter_csv_updates,
+    iter_json_updates,
+    iter_ndjson_updates,
+)
+
+
+class StoreInventoryKeysetPagination(KeysetPagination):
+    ordering = (("product__title", False), ("id", False))
+
+
+class StoreAvailabilityKeysetPagination(KeysetPagination):
+    ordering = (("title", False), ("inventory_id", False))
 
 
-class StoreInventoryListView(ListAPIView):
+class StoreInventoryListView(CompiledListMixin, KeysetPaginationMixin, ListAPIView):
+    """
+    Inventory of a store by product title. With settings.AVAILABILITY_READ_MODEL
+    the rows come from the availability read model: one index range scan on
+    (store, title, inventory), no joins and no sort.
+    """
+
     serializer_class = InventoryListSerializer
+    query_budget = 2  # count, page
+    read_replica = True  # see project/replicas.py
+
+    @property
+    def keyset_pagination_class(self):
+        if settings.AVAILABILITY_READ_MODEL:
+            return StoreAvailabilityKeysetPagination
+        return StoreInventoryKeysetPagination
+
+    def get_serializer_class(self):
+        if settings.AVAILABILITY_READ_MODEL:
+            return AvailabilityListSerializer
+        return super().get_serializer_class()
 
     def get_queryset(self):
         store_id = self.kwargs["store_id"]
+        if settings.AVAILABILITY_READ_MODEL:
+            return StoreProductAvailability.objects.filter(store_id=store_id).order_by("title", "inventory_id")
         return (
             Inventory.objects.filter(store_id=store_id)
             .select_related("product__category")
-            .order_by("product__title")
+            .order_by("product__title", "id")
         )
+
+
+class StoreInventoryExportView(StreamingExportView):
+    """Full inventory of a store as NDJSON or CSV, in product id order."""
+
+    columns = (
+        ("id", "id"),
+        ("product_id", "product_id"),
+        ("product_title", "product__title"),
+        ("price", "product__price"),
+        ("category_name", "product__category__name"),
+        ("quantity", "quantity"),
+    )
+
+    def get_filename(self):
+        return f"store-{self.kwargs['store_id']}-inventory"
+
+    def get_queryset(self):
+        # (store_id, product_id) is the unique index: no sort needed
+        return Inventory.objects.filter(store_id=self.kwargs["store_id"]).order_by("product_id")
+
+
+class StoreInventoryBulkView(APIView):
+    """
+    Stock feed of a store, as absolute quantities (mode=set) or deltas
+    (mode=delta). Bodies:
+
+    - application/json: {"mode": "set", "updates": [{"product_id": 1, "quantity": 5}, ...]}
+    - text/csv with a product_id,quantity header, or application/x-ndjson
+      with one update object per line; ?mode= selects the mode. These are
+      read from the request stream, so the feed is never held in memory.
+    """
+
+    parser_classes = [JSONParser]
+    chunk_size = 5000  # rows per transaction
+
+    def post(self, request, store_id):
+        get_object_or_404(Store, id=store_id)
+        mode = request.query_params.get("mode", MODE_SET)
+        try:
+            if request.content_type.startswith("text/csv"):
+                rows = iter_csv_updates(self.lines(request))
+            elif request.content_type.startswith("application/x-ndjson"):
+                rows = iter_ndjson_updates(self.lines(request))
+            else:
+                if not isinstance(request.data, dict):
+                    raise InventoryFeedError("Expected a JSON object with an updates list.")
+                mode = request.data.get("mode", mode)
+                rows = iter_json_updates(request.data.get("updates"))
+            result = apply_inventory_updates(store_id, rows, mode, self.chunk_size)
+        except InventoryFeedError as exc:
+            raise ValidationError({"detail": str(exc)})
+        return Response(result)
+
+    @staticmethod
+    def lines(request):
+        # undecodable bytes become U+FFFD: that row is rejected, the feed goes on
+        return codecs.iterdecode(request.stream or [], "utf-8", errors="replace")
@@ -0,0 +1 @@
+# Package marker so benchmarks can be run with `python -m benchmarks.<name>`.
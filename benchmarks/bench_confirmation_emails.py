@@ -0,0 +1,119 @@
+"""
+Per-order vs batched confirmation email benchmark (locmem email backend).
+
+Runs send_order_confirmation_email once per order and
+send_order_confirmations_batch over the same orders, and reports time,
+queries and mail connections opened for each.
+
+    python -m benchmarks.bench_confirmation_emails --orders 2000
+"""
+import argparse
+
+from benchmarks.utils import setup_django, benchmark_database, timer, report
+
+setup_django()
+
+from django.core import mail  # noqa: E402
+from django.core.mail.backends.locmem import EmailBackend  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, override_settings  # noqa: E402
+
+from apps.orders.models import Order, OrderItem  # noqa: E402
+from apps.orders.tasks import (  # noqa: E402
+    send_order_confirmation_email,
+    send_order_confirmations_batch,
+)
+from apps.products.models import Category, Product  # noqa: E402
+from apps.stores.models import Store  # noqa: E402
+
+
+class CountingBackend(EmailBackend):
+    """locmem backend that counts connections the way the SMTP backend opens them."""
+
+    opened = 0
+
+    def open(self):
+        if getattr(self, "_is_open", False):
+            return False
+        self._is_open = True
+        CountingBackend.opened += 1
+        return True
+
+    def close(self):
+        self._is_open = False
+
+    def send_messages(self, messages):
+        # like SMTP: without an explicit open() every call connects on its own
+        new_conn = self.open()
+        try:
+            return super().send_messages(messages)
+        finally:
+            if new_conn:
+                self.close()
+
+
+def seed(n, items_per_order):
+    store = Store.objects.create(name="bench")
+    cat = Category.objects.create(name="bench")
+    products = Product.objects.bulk_create(
+        [Product(title=f"Product {i}", price=1, category=cat) for i in range(items_per_order)]
+    )
+    orders = Order.objects.bulk_create(
+        [Order(store=store, status=Order.STATUS_CONFIRMED) for _ in range(n)], batch_size=1000
+    )
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(order=o, product=p, quantity_requested=1)
+            for o in orders
+            for p in products
+        ],
+        batch_size=1000,
+    )
+    return [o.id for o in orders]
+
+
+def measure(name, fn, order_ids):
+    mail.outbox = []
+    CountingBackend.opened = 0
+    with CaptureQueriesContext(connection) as ctx, timer() as t:
+        fn(order_ids)
+    return {
+        "mode": name,
+        "orders": len(order_ids),
+        "seconds": round(t["seconds"], 3),
+        "emails_per_second": round(len(order_ids) / t["seconds"], 1),
+        "queries": len(ctx.captured_queries),
+        "connections_opened": CountingBackend.opened,
+        "emails": len(mail.outbox),
+    }
+
+
+def per_order(order_ids):
+    for order_id in order_ids:
+        send_order_confirmation_email(order_id)
+
+
+def batched(order_ids, size=100):
+    for i in range(0, len(order_ids), size):
+        send_order_confirmations_batch(order_ids[i:i + size])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=1000)
+    parser.add_argument("--items-per-order", type=int, default=3)
+    args = parser.parse_args()
+
+    backend = f"{__name__}.CountingBackend"
+    with benchmark_database(), override_settings(EMAIL_BACKEND=backend, DEBUG=True):
+        order_ids = seed(args.orders, args.items_per_order)
+        report(
+            [
+                measure("per_order", per_order, order_ids),
+                measure("batched", batched, order_ids),
+            ]
+        )
+
+
+if __name__ == "__main__":
+    main()
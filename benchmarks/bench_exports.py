@@ -0,0 +1,135 @@
+"""
+Streaming export benchmark: throughput and memory of the NDJSON/CSV exports.
+
+Seeds one store's order lines (or inventory) with set-based SQL, streams the
+whole export through the view and samples the process RSS and Python heap
+(tracemalloc) as rows go by. Flat memory means nothing is buffered.
+
+    python -m benchmarks.bench_exports --rows 10000000 --export orders --format csv
+"""
+import argparse
+import os
+import resource
+import tracemalloc
+
+from benchmarks.utils import setup_django, benchmark_database, timer, report
+
+setup_django()
+
+from django.db import connection  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from apps.orders.models import Order, OrderItem  # noqa: E402
+from apps.products.models import Category, Product  # noqa: E402
+from apps.stores.models import Store, Inventory  # noqa: E402
+
+ITEMS_PER_ORDER = 4
+SEQ = "WITH RECURSIVE seq(n) AS (SELECT 1 UNION ALL SELECT n + 1 FROM seq WHERE n < %s) "
+
+
+def seed_products(cursor, n, category_id):
+    cursor.execute(
+        f"INSERT INTO {Product._meta.db_table} (title, description, price, category_id, created_at) "
+        + SEQ
+        + "SELECT 'Product ' || n, NULL, 9.99, %s, %s FROM seq",
+        [n, category_id, timezone.now()],
+    )
+
+
+def seed(kind, rows):
+    store = Store.objects.create(name="bench")
+    cat = Category.objects.create(name="bench")
+    with connection.cursor() as cursor:
+        if kind == "inventory":
+            seed_products(cursor, rows, cat.id)
+            cursor.execute(
+                f"INSERT INTO {Inventory._meta.db_table} (store_id, product_id, quantity) "
+                f"SELECT %s, id, id %% 50 FROM {Product._meta.db_table}",
+                [store.id],
+            )
+        else:
+            seed_products(cursor, ITEMS_PER_ORDER, cat.id)
+            n_orders = -(-rows // ITEMS_PER_ORDER)
+            cursor.execute(
+                f"INSERT INTO {Order._meta.db_table} (store_id, status, created_at) "
+                + SEQ
+                + "SELECT %s, %s, %s FROM seq",
+                [n_orders, store.id, Order.STATUS_CONFIRMED, timezone.now()],
+            )
+            cursor.execute(
+                f"INSERT INTO {OrderItem._meta.db_table} (order_id, product_id, quantity_requested) "
+                f"SELECT o.id, p.id, 1 FROM {Order._meta.db_table} o "
+                f"CROSS JOIN {Product._meta.db_table} p",
+            )
+    return store
+
+
+def rss_mb():
+    """Current resident set size (Linux), else the peak reported by getrusage."""
+    try:
+        with open("/proc/self/statm") as f:
+            pages = int(f.read().split()[1])
+        return round(pages * os.sysconf("SC_PAGE_SIZE") / 2**20, 1)
+    except (OSError, ValueError):
+        return round(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    parser.add_argument("--export", choices=["orders", "inventory"], default="orders")
+    parser.add_argument("--format", choices=["ndjson", "csv"], default="ndjson")
+    parser.add_argument("--samples", type=int, default=10, help="memory samples over the stream")
+    parser.add_argument("--tracemalloc", action="store_true", help="also sample the Python heap (slower)")
+    args = parser.parse_args()
+
+    with benchmark_database():
+        with timer() as seeding:
+            store = seed(args.export, args.rows)
+        name = "store-orders-export" if args.export == "orders" else "store-inventory-export"
+        url = reverse(name, args=[store.id, args.format])
+
+        if args.tracemalloc:
+            tracemalloc.start()
+        baseline_rss = rss_mb()
+        samples = []
+        lines = 0
+        total_bytes = 0
+        every = max(1, args.rows // args.samples)
+        next_sample = every
+        with timer() as streaming:
+            response = APIClient().get(url)
+            for chunk in response.streaming_content:
+                lines += chunk.count(b"\n")
+                total_bytes += len(chunk)
+                if lines >= next_sample:
+                    sample = {"rows": lines, "rss_mb": rss_mb()}
+                    if args.tracemalloc:
+                        current, peak = tracemalloc.get_traced_memory()
+                        sample["heap_mb"] = round(current / 2**20, 2)
+                        sample["heap_peak_mb"] = round(peak / 2**20, 2)
+                    samples.append(sample)
+                    next_sample += every
+
+        rss = [s["rss_mb"] for s in samples] or [baseline_rss]
+        report(
+            {
+                "export": args.export,
+                "format": args.format,
+                "rows": args.rows,
+                "lines": lines,
+                "megabytes": round(total_bytes / 2**20, 1),
+                "seed_seconds": round(seeding["seconds"], 2),
+                "stream_seconds": round(streaming["seconds"], 2),
+                "rows_per_second": round(args.rows / streaming["seconds"]),
+                "baseline_rss_mb": baseline_rss,
+                "rss_growth_mb": round(max(rss) - min(rss), 1),
+                "samples": samples,
+            }
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,279 @@
+"""
+Load benchmark: every hot endpoint driven concurrently, checked against a baseline.
+
+Seeds a dataset of the given size, then runs one scenario per endpoint
+(product search, suggest, store inventory, store orders and order creation,
+the latter on a few shared "hot" SKUs so orders contend for the same rows)
+with --concurrency client threads through Django's WSGI handler. Each
+scenario reports p50/p95/p99 latency, requests per second and queries per
+request (from the Server-Timing header of PerformanceMiddleware) as JSON.
+
+    python -m benchmarks.bench_load --products 20000 --concurrency 8 --requests 400
+    python -m benchmarks.bench_load --save-baseline benchmarks/baselines/load_sqlite.json
+    python -m benchmarks.bench_load --baseline benchmarks/baselines/load_sqlite.json
+
+With --baseline the run exits with status 1 when a scenario uses more
+queries per request than the baseline, or its p95 latency / throughput is
+worse by more than --tolerance. Baselines are only comparable on the same
+machine, database and dataset size. Runs against Postgres when POSTGRES_DB
+(and friends) are exported; SQLite serializes writers, so order creation
+there measures lock waits more than anything else.
+"""
+import argparse
+import json
+import logging
+import os
+import random
+import re
+import sys
+import threading
+import time
+import uuid
+
+# the throttle and the query budgets would otherwise shape the results
+os.environ.setdefault("SUGGEST_RATE_LIMIT", "1000000/min")
+os.environ.setdefault("PERF_QUERY_BUDGETS", "off")
+os.environ["PERF_INSTRUMENTATION"] = "true"
+os.environ["PERF_SERVER_TIMING"] = "true"
+
+from benchmarks.utils import setup_django, benchmark_database, timer, percentiles, report  # noqa: E402
+
+setup_django()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection, connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from apps.orders.models import Order, OrderItem  # noqa: E402
+from apps.products.models import Category, Product  # noqa: E402
+from apps.stores.models import Store, Inventory  # noqa: E402
+
+WORDS = ["phone", "case", "cable", "charger", "laptop", "stand", "speaker", "camera", "watch", "lamp"]
+BRANDS = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Stark"]
+QUERIES_RE = re.compile(r'desc="(\d+) queries')
+MAX_ATTEMPTS = 20
+
+
+def seed(products, stores, orders, hot_skus, rng):
+    cats = Category.objects.bulk_create([Category(name=f"Category {i}") for i in range(20)])
+    store_objs = Store.objects.bulk_create([Store(name=f"Store {i}") for i in range(stores)])
+    product_objs = Product.objects.bulk_create(
+        [
+            Product(
+                title=f"{rng.choice(BRANDS)} {rng.choice(WORDS)} {rng.choice(WORDS)} {i}",
+                description=f"Description of product {i}",
+                price=rng.randint(100, 500_000) / 100,
+                category=rng.choice(cats),
+            )
+            for i in range(products)
+        ],
+        batch_size=5000,
+    )
+    Inventory.objects.bulk_create(
+        [
+            Inventory(store=store, product=product, quantity=rng.randint(0, 50))
+            for store in store_objs
+            for product in rng.sample(product_objs, min(len(product_objs), max(1, products // 2)))
+        ],
+        batch_size=5000,
+        ignore_conflicts=True,
+    )
+    order_objs = Order.objects.bulk_create(
+        [Order(store=rng.choice(store_objs), status=Order.STATUS_CONFIRMED) for _ in range(orders)],
+        batch_size=5000,
+    )
+    OrderItem.objects.bulk_create(
+        [
+            OrderItem(order=order, product=rng.choice(product_objs), quantity_requested=rng.randint(1, 3))
+            for order in order_objs
+            for _ in range(rng.randint(1, 4))
+        ],
+        batch_size=5000,
+    )
+    # hot SKUs: stocked well beyond what the run can sell, in the first store
+    hot = product_objs[:hot_skus]
+    Inventory.objects.filter(store=store_objs[0], product__in=hot).delete()
+    Inventory.objects.bulk_create([Inventory(store=store_objs[0], product=p, quantity=10**9) for p in hot])
+    call_command("rebuild_search_index", stdout=open(os.devnull, "w"))
+    call_command("rebuild_availability", stdout=open(os.devnull, "w"))
+    return store_objs, product_objs, hot
+
+
+def scenarios(stores, products, hot, rng):
+    """name -> function(rng) returning (method, url, kwargs) for one request."""
+    store_ids = [s.id for s in stores]
+    titles = [p.title for p in rng.sample(products, min(len(products), 500))]
+
+    def search(rng):
+        params = {"q": rng.choice(WORDS), "store_id": rng.choice(store_ids), "sort": rng.choice(["price", "newest"])}
+        return "get", reverse("product-search"), {"data": params}
+
+    def suggest(rng):
+        return "get", reverse("product-suggest"), {"data": {"q": rng.choice(titles)[: rng.randint(3, 8)]}}
+
+    def inventory(rng):
+        return "get", reverse("store-inventory", args=[rng.choice(store_ids)]), {"data": {"page_size": 50}}
+
+    def store_orders(rng):
+        return "get", reverse("store-orders", args=[rng.choice(store_ids)]), {"data": {"page_size": 50}}
+
+    def order_create(rng):
+        basket = rng.sample(hot, rng.randint(1, min(3, len(hot))))
+        body = {
+            "store_id": stores[0].id,
+            "items": [{"product_id": p.id, "quantity_requested": 1} for p in basket],
+        }
+        # retried on 5xx (e.g. SQLite's "database is locked") under the same key
+        return "post", reverse("order-create"), {
+            "data": json.dumps(body),
+            "content_type": "application/json",
+            "headers": {"Idempotency-Key": uuid.uuid4().hex},
+        }
+
+    return {
+        "search": search,
+        "suggest": suggest,
+        "store_inventory": inventory,
+        "store_orders": store_orders,
+        "order_create": order_create,
+    }
+
+
+def run_scenario(make_request, concurrency, requests, seed_value):
+    latencies = []
+    queries = []
+    statuses = {}
+    retries = []
+    lock = threading.Lock()
+    per_thread = max(1, requests // concurrency)
+
+    def worker(index):
+        rng = random.Random(seed_value * 1000 + index)
+        client = Client(raise_request_exception=False)
+        local_latencies, local_queries, local_statuses, local_retries = [], [], {}, 0
+        try:
+            for _ in range(per_thread):
+                method, url, kwargs = make_request(rng)
+                with timer() as t:
+                    for attempt in range(MAX_ATTEMPTS):
+                        response = getattr(client, method)(url, **kwargs)
+                        if response.status_code < 500 or attempt == MAX_ATTEMPTS - 1:
+                            break
+                        local_retries += 1
+                        time.sleep(0.001 * (attempt + 1))
+                local_latencies.append(t["seconds"])
+                match = QUERIES_RE.search(response.get("Server-Timing", ""))
+                if match:
+                    local_queries.append(int(match.group(1)))
+                local_statuses[response.status_code] = local_statuses.get(response.status_code, 0) + 1
+        finally:
+            connections.close_all()
+        with lock:
+            latencies.extend(local_latencies)
+            queries.extend(local_queries)
+            retries.append(local_retries)
+            for code, n in local_statuses.items():
+                statuses[code] = statuses.get(code, 0) + n
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(concurrency)]
+    with timer() as total:
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+
+    return {
+        "requests": len(latencies),
+        "errors": sum(n for code, n in statuses.items() if code >= 400),
+        "statuses": {str(code): n for code, n in sorted(statuses.items())},
+        "retries": sum(retries),
+        "requests_per_second": round(len(latencies) / total["seconds"], 1),
+        **percentiles(latencies),
+        "queries_per_request": max(queries) if queries else None,
+        "mean_queries_per_request": round(sum(queries) / len(queries), 2) if queries else None,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Human-readable regressions of `results` against `baseline`."""
+    problems = []
+    if baseline["config"] != results["config"]:
+        return [f"baseline was recorded with {baseline['config']}, this run used {results['config']}"]
+    for name, base in baseline["scenarios"].items():
+        current = results["scenarios"].get(name)
+        if current is None:
+            continue
+        base_queries = base["queries_per_request"]
+        if base_queries is not None and (current["queries_per_request"] or 0) > base_queries:
+            problems.append(
+                f"{name}: {current['queries_per_request']} queries per request, baseline {base['queries_per_request']}"
+            )
+        if current["p95_ms"] > base["p95_ms"] * (1 + tolerance):
+            problems.append(f"{name}: p95 {current['p95_ms']} ms, baseline {base['p95_ms']} ms")
+        if current["requests_per_second"] < base["requests_per_second"] / (1 + tolerance):
+            problems.append(
+                f"{name}: {current['requests_per_second']} req/s, baseline {base['requests_per_second']} req/s"
+            )
+        if current["errors"] > base["errors"]:
+            problems.append(f"{name}: {current['errors']} errors, baseline {base['errors']}")
+    return problems
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=5000)
+    parser.add_argument("--stores", type=int, default=10)
+    parser.add_argument("--orders", type=int, default=5000)
+    parser.add_argument("--hot-skus", type=int, default=5, help="products every order_create request competes for")
+    parser.add_argument("--concurrency", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=400, help="per scenario")
+    parser.add_argument("--scenario", action="append", help="run only these (repeatable)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--baseline", help="JSON file to compare against; exit 1 on regressions")
+    parser.add_argument("--save-baseline", help="write this run's results to a JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.5, help="allowed latency/throughput slack (0.5 = 50%%)")
+    args = parser.parse_args()
+
+    # retried 5xx responses are counted, not logged
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    rng = random.Random(args.seed)
+    with benchmark_database():
+        with timer() as seeding:
+            stores, products, hot = seed(args.products, args.stores, args.orders, args.hot_skus, rng)
+        makers = scenarios(stores, products, hot, rng)
+        selected = args.scenario or list(makers)
+
+        results = {
+            "config": {
+                "database": connection.vendor,
+                "products": args.products,
+                "stores": args.stores,
+                "orders": args.orders,
+                "hot_skus": args.hot_skus,
+                "concurrency": args.concurrency,
+                "requests": args.requests,
+            },
+            "seed_seconds": round(seeding["seconds"], 2),
+            "scenarios": {},
+        }
+        for i, name in enumerate(selected):
+            run_scenario(makers[name], 1, min(20, args.requests), args.seed + 100 + i)  # warm up
+            results["scenarios"][name] = run_scenario(makers[name], args.concurrency, args.requests, args.seed + i)
+
+    if args.baseline:
+        with open(args.baseline) as f:
+            results["regressions"] = compare(results, json.load(f), args.tolerance)
+    report(results)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            json.dump({"config": results["config"], "scenarios": results["scenarios"]}, f, indent=2)
+            f.write("\n")
+    if results.get("regressions"):
+        for problem in results["regressions"]:
+            print(f"REGRESSION {problem}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
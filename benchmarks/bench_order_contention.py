@@ -0,0 +1,116 @@
+"""
+Concurrency benchmark for the order placement engines.
+
+N threads place single-line orders against ONE Inventory row and the run
+reports throughput, latency and whether stock was oversold, for both the
+"locking" and the "conditional" engine.
+
+    python -m benchmarks.bench_order_contention --threads 16 --orders 400
+
+Run against Postgres by exporting POSTGRES_DB (and friends); SQLite
+serializes all writers so it only checks correctness, not scalability.
+"""
+import argparse
+import threading
+import time
+
+from benchmarks.utils import setup_django, benchmark_database, timer, percentiles, report
+
+setup_django()
+
+from django.db import connection, transaction  # noqa: E402
+from django.db.utils import OperationalError  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+
+from apps.orders.models import Order  # noqa: E402
+from apps.orders.services import place_order, ENGINES  # noqa: E402
+from apps.products.models import Category, Product  # noqa: E402
+from apps.stores.models import Store, Inventory  # noqa: E402
+
+MAX_ATTEMPTS = 20
+
+
+def run_engine(engine, threads, orders, stock, qty):
+    store = Store.objects.create(name=f"bench-{engine}")
+    cat, _ = Category.objects.get_or_create(name="bench")
+    product = Product.objects.create(title=f"hot-{engine}", price=1, category=cat)
+    Inventory.objects.create(store=store, product=product, quantity=stock)
+    items = [{"product_id": product.id, "quantity_requested": qty}]
+
+    latencies = []
+    errors = []
+    retries = []
+    lock = threading.Lock()
+    per_thread = orders // threads
+
+    def worker():
+        local = []
+        try:
+            for _ in range(per_thread):
+                with timer() as t:
+                    for attempt in range(MAX_ATTEMPTS):
+                        try:
+                            with transaction.atomic():
+                                place_order(store, items)
+                            break
+                        except OperationalError as exc:
+                            # SQLite reports writer collisions as "database is
+                            # locked"; retry like a client would.
+                            with lock:
+                                retries.append(attempt)
+                            if attempt == MAX_ATTEMPTS - 1:
+                                with lock:
+                                    errors.append(str(exc))
+                            time.sleep(0.001 * (attempt + 1))
+                local.append(t["seconds"])
+        finally:
+            connection.close()
+        with lock:
+            latencies.extend(local)
+
+    with override_settings(ORDER_PLACEMENT_ENGINE=engine):
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        with timer() as total:
+            for w in workers:
+                w.start()
+            for w in workers:
+                w.join()
+
+    confirmed = Order.objects.filter(store=store, status=Order.STATUS_CONFIRMED).count()
+    remaining = Inventory.objects.get(store=store, product=product).quantity
+    return {
+        "engine": engine,
+        "threads": threads,
+        "orders": per_thread * threads,
+        "seconds": round(total["seconds"], 3),
+        "orders_per_second": round(per_thread * threads / total["seconds"], 1),
+        "confirmed": confirmed,
+        "retries": len(retries),
+        "errors": len(errors),
+        "remaining_stock": remaining,
+        # stock is consistent iff every confirmed unit was taken exactly once
+        "oversold": remaining != stock - confirmed * qty or remaining < 0,
+        **percentiles(latencies),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--orders", type=int, default=200)
+    parser.add_argument("--stock", type=int, default=150)
+    parser.add_argument("--qty", type=int, default=1)
+    parser.add_argument("--engine", choices=sorted(ENGINES), action="append")
+    args = parser.parse_args()
+
+    with benchmark_database():
+        report(
+            [
+                run_engine(engine, args.threads, args.orders, args.stock, args.qty)
+                for engine in (args.engine or sorted(ENGINES))
+            ]
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+"""
+Throughput benchmark for the order outbox dispatcher.
+
+Seeds N pending outbox rows and measures how fast dispatch_pending() drains
+them for several batch sizes. Tasks are published to Celery's in-memory
+transport so the numbers exclude network latency to a real broker.
+
+    python -m benchmarks.bench_outbox_dispatch --messages 20000
+"""
+import argparse
+import os
+
+from benchmarks.utils import setup_django, benchmark_database, timer, report
+
+# publish to Celery's in-process transport instead of Redis
+os.environ["CELERY_BROKER_URL"] = "memory://"
+os.environ["CELERY_RESULT_BACKEND"] = "cache+memory://"
+setup_django()
+
+from apps.orders.models import Order, OutboxMessage  # noqa: E402
+from apps.orders.outbox import dispatch_pending  # noqa: E402
+from apps.stores.models import Store  # noqa: E402
+
+
+def seed(store, n):
+    orders = Order.objects.bulk_create(
+        [Order(store=store, status=Order.STATUS_CONFIRMED) for _ in range(n)],
+        batch_size=1000,
+    )
+    OutboxMessage.objects.bulk_create(
+        [
+            OutboxMessage(
+                topic=OutboxMessage.TOPIC_ORDER_CONFIRMATION,
+                payload={"order_id": o.id},
+            )
+            for o in orders
+        ],
+        batch_size=1000,
+    )
+
+
+def run(messages, batch_size):
+    OutboxMessage.objects.all().delete()
+    seed(Store.objects.get_or_create(name="bench")[0], messages)
+
+    batches = 0
+    with timer() as t:
+        while dispatch_pending(batch_size):
+            batches += 1
+
+    assert not OutboxMessage.objects.filter(status=OutboxMessage.STATUS_PENDING).exists()
+    return {
+        "messages": messages,
+        "batch_size": batch_size,
+        "batches": batches,
+        "seconds": round(t["seconds"], 3),
+        "messages_per_second": round(messages / t["seconds"], 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--messages", type=int, default=5000)
+    parser.add_argument("--batch-size", type=int, action="append")
+    args = parser.parse_args()
+
+    with benchmark_database():
+        report([run(args.messages, bs) for bs in (args.batch_size or [50, 200, 1000])])
+
+
+if __name__ == "__main__":
+    main()
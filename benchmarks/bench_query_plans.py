@@ -0,0 +1,142 @@
+"""
+Query plans of every hot endpoint at benchmark scale.
+
+Seeds a dataset with seed_data (Zipf-skewed, so plans see realistic value
+distributions), runs ANALYZE so the planner has statistics, then requests
+each endpoint under project.explain.capture_plans() and reports, per
+request, the plan of every SELECT and the tables read in full.
+
+    python -m benchmarks.bench_query_plans --products 200000 --stores 10 --orders 200000
+    python -m benchmarks.bench_query_plans --show-plans
+
+Exits with status 1 when a query reads a table other than the small
+lookup tables (categories, stores) sequentially.
+"""
+import argparse
+import io
+import sys
+
+from benchmarks.utils import setup_django, benchmark_database, timer, report
+
+setup_django()
+
+from django.core.management import call_command  # noqa: E402
+from django.db import connection  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from apps.orders.models import Order  # noqa: E402
+from apps.products.models import Category, Product  # noqa: E402
+from apps.stores.models import Inventory, Store  # noqa: E402
+from project.explain import capture_plans  # noqa: E402
+
+# a handful of rows, where a sequential scan is the right plan
+SMALL_TABLES = {Category._meta.db_table, Store._meta.db_table}
+
+
+def endpoint_requests(store_id, category_id, product_id):
+    """(name, method, url, kwargs) for each query shape worth planning."""
+    search = reverse("product-search")
+    inventory = reverse("store-inventory", args=[store_id])
+    orders = reverse("store-orders", args=[store_id])
+    return [
+        ("search title", "get", search, {}),
+        ("search price", "get", search, {"sort": "price"}),
+        ("search newest", "get", search, {"sort": "newest"}),
+        ("search price range", "get", search, {"price_min": 100, "price_max": 200, "sort": "price"}),
+        ("search category", "get", search, {"category": category_id}),
+        ("search facets", "get", search, {"store_id": store_id, "facets": "category,price,in_stock"}),
+        ("search text", "get", search, {"q": "the", "sort": "relevance"}),
+        ("search store", "get", search, {"store_id": store_id}),
+        ("search store in stock", "get", search, {"store_id": store_id, "in_stock": "true", "sort": "price"}),
+        ("search cursor newest", "get", search, {"sort": "newest", "paginate": "cursor"}),
+        ("store inventory", "get", inventory, {}),
+        ("store inventory cursor", "get", inventory, {"paginate": "cursor"}),
+        ("store orders", "get", orders, {}),
+        ("store orders cursor", "get", orders, {"paginate": "cursor"}),
+        (
+            "order create",
+            "post",
+            reverse("order-create"),
+            {"store_id": store_id, "items": [{"product_id": product_id, "quantity_requested": 1}]},
+        ),
+    ]
+
+
+def plan_endpoints(client, requests):
+    """name -> list of QueryPlan for each (name, method, url, kwargs)."""
+    results = {}
+    for name, method, url, data in requests:
+        with capture_plans() as plans:
+            if method == "get":
+                response = client.get(url, data)
+            else:
+                response = client.post(url, data, format="json")
+        assert response.status_code < 400, (name, response.status_code)
+        results[name] = plans
+    return results
+
+
+def unexpected_scans(plans):
+    return sorted({table for plan in plans for table in plan.seq_scans if table not in SMALL_TABLES})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=50_000)
+    parser.add_argument("--stores", type=int, default=5)
+    parser.add_argument("--orders", type=int, default=50_000)
+    parser.add_argument("--workers", type=int, default=1)
+    parser.add_argument("--read-model", action="store_true", help="with AVAILABILITY_READ_MODEL on")
+    parser.add_argument("--show-plans", action="store_true")
+    args = parser.parse_args()
+
+    with benchmark_database(), override_settings(AVAILABILITY_READ_MODEL=args.read_model):
+        with timer() as seeding:
+            call_command(
+                "seed_data",
+                products=args.products,
+                stores=args.stores,
+                orders=args.orders,
+                distribution="zipf",
+                seed=1,
+                workers=args.workers,
+                stdout=io.StringIO(),
+            )
+            with connection.cursor() as cursor:
+                cursor.execute("ANALYZE")
+
+        inventory = Inventory.objects.filter(quantity__gt=0).order_by("store_id", "product_id").first()
+        requests = endpoint_requests(
+            inventory.store_id, Product.objects.values_list("category_id", flat=True).first(), inventory.product_id
+        )
+        results = plan_endpoints(APIClient(), requests)
+
+        summary = {
+            "config": {
+                "database": connection.vendor,
+                "products": Product.objects.count(),
+                "orders": Order.objects.count(),
+                "read_model": args.read_model,
+            },
+            "seed_seconds": round(seeding["seconds"], 2),
+            "endpoints": {},
+        }
+        failed = False
+        for name, plans in results.items():
+            scans = unexpected_scans(plans)
+            failed |= bool(scans)
+            entry = {"queries": len(plans), "seq_scans": scans}
+            if args.show_plans:
+                entry["plans"] = [{"sql": plan.sql, "plan": plan.lines} for plan in plans]
+            summary["endpoints"][name] = entry
+
+    report(summary)
+    if failed:
+        print("Sequential scans on large tables; see seq_scans above.", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+JSON renderer benchmark: DRF's JSONRenderer vs FastJSONRenderer.
+
+Renders product search pages shaped like ProductSearchView's (20 and 100
+results, with a facets block) through DRF's renderer and through
+FastJSONRenderer on the orjson (if installed) and stdlib backends, plus
+the same page with its facets spliced in as a pre-encoded RawJSON.
+
+    python -m benchmarks.bench_renderers --repeat 2000
+"""
+import argparse
+import json
+import random
+
+from benchmarks.utils import setup_django, timer, percentiles, report
+
+setup_django()
+
+from django.test.utils import override_settings  # noqa: E402
+from rest_framework.renderers import JSONRenderer  # noqa: E402
+
+from project import renderers  # noqa: E402
+from project.renderers import FastJSONRenderer, RawJSON  # noqa: E402
+
+
+def search_page(size, rng):
+    results = [
+        {
+            "id": i,
+            "title": f"Product {i:06d} “Édition” {rng.choice(['Pro', 'Mini', 'Max'])}",
+            "description": f"Description of product {i}" if i % 3 else None,
+            "price": f"{rng.randint(100, 500_000) / 100:.2f}",
+            "category": rng.randint(1, 20),
+            "category_name": f"Category {rng.randint(1, 20)}",
+            "created_at": f"2024-05-{rng.randint(1, 28):02d}T12:30:15.123456Z",
+            "quantity": rng.randint(0, 50),
+        }
+        for i in range(size)
+    ]
+    facets = {
+        "category": [{"id": c, "name": f"Category {c}", "count": rng.randint(1, 999)} for c in range(1, 21)],
+        "price": {
+            "min": "1.00",
+            "max": "4999.99",
+            "buckets": [{"to": b, "count": rng.randint(1, 999)} for b in (50, 100, 250, 500, 1000)],
+        },
+    }
+    return {"next": "?cursor=abc", "previous": None, "results": results, "facets": facets}
+
+
+def measure(name, fn, repeat):
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        with timer() as t:
+            fn()
+        samples.append(t["seconds"])
+    return {"case": name, **percentiles(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeat", type=int, default=1000)
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    drf = JSONRenderer()
+    fast = FastJSONRenderer()
+    backends = ["stdlib"] + (["orjson"] if renderers.orjson is not None else [])
+    results = []
+    for size in (20, 100):
+        page = search_page(size, rng)
+        spliced = {**page, "facets": RawJSON(json.dumps(page["facets"], separators=(",", ":")))}
+        results.append(measure(f"page{size}_drf", lambda: drf.render(page), args.repeat))
+        for backend in backends:
+            with override_settings(JSON_RENDERER_BACKEND=backend):
+                assert fast.render(page) == drf.render(page)
+                results.append(measure(f"page{size}_fast_{backend}", lambda: fast.render(page), args.repeat))
+                results.append(
+                    measure(f"page{size}_fast_{backend}_raw_facets", lambda: fast.render(spliced), args.repeat)
+                )
+
+    report({"orjson": renderers.orjson is not None, "repeat": args.repeat, "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Replica routing benchmark: catalog reads under order-creation load, primary vs replica.
+
+Runs on two SQLite files: the throwaway primary and a replica that a
+background thread refreshes with `refresh_sqlite_replicas`' backup copy
+every --replication-interval seconds (a stand-in for streaming replication).
+Reader threads hit product search and store inventory while writer threads
+place orders; the run is done once with routing off and once with it on,
+reporting reader latency and the share of reads served by the replica.
+
+    python -m benchmarks.bench_replicas --products 20000 --seconds 10
+
+It also checks read-your-writes: right after placing an order, the same
+client's inventory listing must come from the primary.
+"""
+import argparse
+import io
+import logging
+import os
+import random
+import tempfile
+import threading
+import time
+
+_replica_dir = tempfile.TemporaryDirectory()
+os.environ["DATABASE_REPLICAS"] = os.path.join(_replica_dir.name, "replica.sqlite3")
+os.environ.setdefault("PERF_QUERY_BUDGETS", "off")
+os.environ.setdefault("SUGGEST_RATE_LIMIT", "1000000/min")
+
+from benchmarks.utils import setup_django, benchmark_database, percentiles, report  # noqa: E402
+
+setup_django()
+
+from django.conf import settings  # noqa: E402
+from django.core.management import call_command  # noqa: E402
+from django.db import connections  # noqa: E402
+from django.test import Client  # noqa: E402
+from django.test.utils import override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+
+from apps.orders.management.commands.refresh_sqlite_replicas import copy_database  # noqa: E402
+from apps.stores.models import Inventory  # noqa: E402
+from project.replicas import replica_set  # noqa: E402
+
+WORDS = ["the", "and", "for", "with", "from"]
+
+
+def replicate(stop, interval):
+    while not stop.wait(interval):
+        for alias in settings.DATABASE_REPLICAS:
+            copy_database(connections["default"], connections[alias])
+    connections.close_all()
+
+
+def run(seconds, readers, writers, store_ids, hot):
+    latencies, served, errors = [], {"replica": 0, "primary": 0}, []
+    lock = threading.Lock()
+    stop = time.monotonic() + seconds
+
+    def reader(index):
+        rng = random.Random(index)
+        client = Client(raise_request_exception=False)
+        local, replica_reads, failed = [], 0, 0
+        while time.monotonic() < stop:
+            if rng.random() < 0.5:
+                url, params = reverse("product-search"), {"q": rng.choice(WORDS), "store_id": rng.choice(store_ids)}
+            else:
+                url, params = reverse("store-inventory", args=[rng.choice(store_ids)]), {}
+            started = time.perf_counter()
+            response = client.get(url, params)
+            local.append(time.perf_counter() - started)
+            replica_reads += response.get("X-Database") == "replica"
+            failed += response.status_code >= 400
+        connections.close_all()
+        with lock:
+            latencies.extend(local)
+            errors.append(failed)
+            served["replica"] += replica_reads
+            served["primary"] += len(local) - replica_reads
+
+    def writer(index):
+        rng = random.Random(1000 + index)
+        client = Client(raise_request_exception=False)
+        while time.monotonic() < stop:
+            store_id, product_id = rng.choice(hot)
+            body = {"store_id": store_id, "items": [{"product_id": product_id, "quantity_requested": 1}]}
+            client.post(reverse("order-create"), body, content_type="application/json")
+        connections.close_all()
+
+    threads = [threading.Thread(target=reader, args=(i,)) for i in range(readers)]
+    threads += [threading.Thread(target=writer, args=(i,)) for i in range(writers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    return {
+        "reads": len(latencies),
+        "reads_per_second": round(len(latencies) / seconds, 1),
+        "errors": sum(errors),
+        **percentiles(latencies),
+        "served": served,
+    }
+
+
+def read_your_writes(store_id, product_id):
+    """The same client's listing right after an order: must be served by the primary."""
+    client = Client()
+    body = {"store_id": store_id, "items": [{"product_id": product_id, "quantity_requested": 1}]}
+    assert client.post(reverse("order-create"), body, content_type="application/json").status_code == 201
+    after_write = client.get(reverse("store-inventory", args=[store_id]))
+    other_client = Client().get(reverse("store-inventory", args=[store_id]))
+    return {
+        "same_client": after_write.get("X-Database", "primary"),
+        "other_client": other_client.get("X-Database", "primary"),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--stores", type=int, default=5)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--writers", type=int, default=2)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--replication-interval", type=float, default=0.5)
+    args = parser.parse_args()
+
+    logging.getLogger("django.request").setLevel(logging.CRITICAL)
+    with benchmark_database():
+        call_command("seed_data", products=args.products, stores=args.stores, seed=1, stdout=io.StringIO())
+        hot = list(
+            Inventory.objects.filter(quantity__gt=0).order_by("-quantity").values_list("store_id", "product_id")[:50]
+        )
+        store_ids = sorted({store_id for store_id, _ in hot})
+        copy_database(connections["default"], connections["replica1"])
+
+        stop = threading.Event()
+        replicator = threading.Thread(target=replicate, args=(stop, args.replication_interval))
+        replicator.start()
+        try:
+            results = {"config": {**vars(args), "database": connections["default"].vendor}}
+            with override_settings(DATABASE_REPLICAS=[]):
+                results["primary_only"] = run(args.seconds, args.readers, args.writers, store_ids, hot)
+            replica_set.reset()
+            results["with_replica"] = run(args.seconds, args.readers, args.writers, store_ids, hot)
+            results["read_your_writes"] = read_your_writes(*hot[0])
+        finally:
+            stop.set()
+            replicator.join()
+    report(results)
+
+
+if __name__ == "__main__":
+    main()
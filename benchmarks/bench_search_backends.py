@@ -0,0 +1,92 @@
+"""
+ProductSearchView latency per search backend (icontains vs full-text).
+
+Seeds N products from a small vocabulary, builds the full-text index and
+times the same text queries through the API with each backend.
+
+    python -m benchmarks.bench_search_backends --products 1000000
+"""
+import argparse
+import random
+
+from benchmarks.utils import setup_django, benchmark_database, timer, percentiles, report
+
+setup_django()
+
+from django.test.utils import override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from apps.products.models import Category, Product  # noqa: E402
+from apps.search.backends import AUTO_BACKENDS, get_search_backend  # noqa: E402
+from django.db import connection  # noqa: E402
+
+CHUNK = 10_000
+WORDS = (
+    "phone charger cable laptop stand wireless mouse keyboard monitor lamp desk chair "
+    "novel cookbook atlas rice flour coffee tea shirt jeans jacket sneaker pillow blanket "
+    "kettle blender speaker headphones camera tripod battery adapter"
+).split()
+QUERIES = ["phone", "wireless charger", "coff", "blanket pillow", "xyznotfound"]
+
+
+def seed(n):
+    rng = random.Random(7)
+    cats = Category.objects.bulk_create([Category(name=w.title()) for w in WORDS[:10]])
+    for offset in range(0, n, CHUNK):
+        Product.objects.bulk_create(
+            [
+                Product(
+                    title=" ".join(rng.sample(WORDS, 3)).title(),
+                    description=" ".join(rng.choices(WORDS, k=12)),
+                    price=rng.randint(100, 100_000) / 100,
+                    category=rng.choice(cats),
+                )
+                for _ in range(offset, min(n, offset + CHUNK))
+            ]
+        )
+
+
+def measure(client, backend, sort, repeat):
+    url = reverse("product-search")
+    rows = []
+    with override_settings(SEARCH_BACKEND=backend):
+        for q in QUERIES:
+            samples = []
+            for _ in range(repeat):
+                with timer() as t:
+                    resp = client.get(url, {"q": q, "sort": sort})
+                samples.append(t["seconds"])
+            rows.append(
+                {"backend": backend, "sort": sort, "q": q, "count": resp.data["count"], **percentiles(samples)}
+            )
+    return rows
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        seed(args.products)
+        full_text = AUTO_BACKENDS[connection.vendor]
+        with override_settings(SEARCH_BACKEND=full_text), timer() as indexing:
+            get_search_backend().rebuild()
+        client = APIClient()
+        results = []
+        for backend in ("icontains", full_text):
+            for sort in ("title", "relevance"):
+                results.extend(measure(client, backend, sort, args.repeat))
+        report(
+            {
+                "products": args.products,
+                "index_build_seconds": round(indexing["seconds"], 2),
+                "results": results,
+            }
+        )
+
+
+if __name__ == "__main__":
+    main()
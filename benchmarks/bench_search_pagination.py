@@ -0,0 +1,90 @@
+"""
+Deep-page latency of ProductSearchView and StoreInventoryListView,
+page-number (COUNT + OFFSET) vs cursor pagination.
+
+    python -m benchmarks.bench_search_pagination --products 200000
+"""
+import argparse
+import random
+
+from benchmarks.utils import setup_django, benchmark_database, timer, percentiles, report
+
+setup_django()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from apps.products.models import Category, Product  # noqa: E402
+from apps.stores.models import Store, Inventory  # noqa: E402
+
+CHUNK = 10_000
+
+
+def seed(n):
+    rng = random.Random(42)
+    cats = Category.objects.bulk_create([Category(name=f"Category {i}") for i in range(20)])
+    store = Store.objects.create(name="bench")
+    for offset in range(0, n, CHUNK):
+        products = Product.objects.bulk_create(
+            [
+                Product(
+                    title=f"Product {rng.randrange(n):08d}",
+                    price=rng.randint(100, 500_000) / 100,
+                    category=rng.choice(cats),
+                )
+                for _ in range(offset, min(n, offset + CHUNK))
+            ]
+        )
+        Inventory.objects.bulk_create(
+            [Inventory(store=store, product=p, quantity=rng.randint(0, 50)) for p in products]
+        )
+    return store
+
+
+def walk_to_depth(client, url, params, pages):
+    """Follow `next` links `pages` times and return the params of the last page."""
+    resp = client.get(url, {**params, "paginate": "cursor"})
+    for _ in range(pages - 1):
+        resp = client.get(resp.data["next"])
+    return resp.data["next"]
+
+
+def measure(name, client, url, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx, timer() as t:
+            resp = client.get(url, params)
+        assert resp.status_code == 200, resp.status_code
+        samples.append(t["seconds"])
+    return {"case": name, "queries": len(ctx.captured_queries), **percentiles(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=50_000)
+    parser.add_argument("--depth-pages", type=int, default=200)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        store = seed(args.products)
+        client = APIClient()
+        results = []
+        endpoints = [
+            ("search_price", reverse("product-search"), {"sort": "price", "page_size": 20}),
+            ("inventory", reverse("store-inventory", args=[store.id]), {"page_size": 20}),
+        ]
+        for name, url, params in endpoints:
+            deep = args.depth_pages
+            results.append(measure(f"{name}_page_1", client, url, {**params, "page": 1}, args.repeat))
+            results.append(measure(f"{name}_page_{deep}", client, url, {**params, "page": deep}, args.repeat))
+            next_url = walk_to_depth(client, url, params, deep - 1)
+            results.append(measure(f"{name}_cursor_1", client, url, {**params, "paginate": "cursor"}, args.repeat))
+            results.append(measure(f"{name}_cursor_{deep}", client, next_url, {}, args.repeat))
+        report({"products": args.products, "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,121 @@
+"""
+Compiled vs DRF serializers on the hot list endpoints (100-row pages).
+
+For product search, store inventory and store orders it times the full
+endpoint with FAST_SERIALIZERS on and off, and the serialization step alone
+(DRF serializer on model instances vs compiled row function on tuples).
+
+    python -m benchmarks.bench_serializers --products 20000 --repeat 50
+"""
+import argparse
+import random
+
+from benchmarks.utils import setup_django, benchmark_database, timer, percentiles, report
+
+setup_django()
+
+from django.test.utils import override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from apps.orders.models import Order, OrderItem  # noqa: E402
+from apps.orders.serializers import StoreOrderSerializer  # noqa: E402
+from apps.orders.views import StoreOrderListView  # noqa: E402
+from apps.products.models import Category, Product  # noqa: E402
+from apps.search.views import ProductSearchSerializer, annotate_store_stock  # noqa: E402
+from apps.stores.models import Store, Inventory  # noqa: E402
+from apps.stores.serializers import InventoryListSerializer  # noqa: E402
+from project.fastserializers import get_compiled_serializer  # noqa: E402
+
+PAGE = 100
+
+
+def seed(n):
+    rng = random.Random(42)
+    cats = Category.objects.bulk_create([Category(name=f"Category {i}") for i in range(20)])
+    store = Store.objects.create(name="bench")
+    products = Product.objects.bulk_create(
+        [
+            Product(
+                title=f"Product {i:06d}",
+                description=f"Description of product {i}",
+                price=rng.randint(100, 500_000) / 100,
+                category=rng.choice(cats),
+            )
+            for i in range(n)
+        ],
+        batch_size=5000,
+    )
+    Inventory.objects.bulk_create(
+        [Inventory(store=store, product=p, quantity=rng.randint(0, 50)) for p in products], batch_size=5000
+    )
+    orders = Order.objects.bulk_create(
+        [Order(store=store, status=Order.STATUS_CONFIRMED) for _ in range(PAGE * 2)]
+    )
+    OrderItem.objects.bulk_create(
+        [OrderItem(order=o, product=rng.choice(products), quantity_requested=1) for o in orders for _ in range(3)]
+    )
+    return store
+
+
+def measure(name, fn, repeat):
+    fn()  # warm up
+    samples = []
+    for _ in range(repeat):
+        with timer() as t:
+            fn()
+        samples.append(t["seconds"])
+    return {"case": name, **percentiles(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=20_000)
+    parser.add_argument("--repeat", type=int, default=30)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        store = seed(args.products)
+        client = APIClient()
+        results = []
+
+        endpoints = [
+            ("search", reverse("product-search"), {"store_id": store.id, "page_size": PAGE, "sort": "price"}),
+            ("inventory", reverse("store-inventory", args=[store.id]), {"page_size": PAGE}),
+            ("store_orders", reverse("store-orders", args=[store.id]), {"page_size": PAGE}),
+        ]
+        for name, url, params in endpoints:
+            for fast in (False, True):
+                with override_settings(FAST_SERIALIZERS=fast):
+                    label = "compiled" if fast else "drf"
+                    results.append(measure(f"{name}_endpoint_{label}", lambda: client.get(url, params), args.repeat))
+
+        # serialization alone, rows already fetched
+        store_orders = StoreOrderListView(kwargs={"store_id": store.id}).get_queryset()
+        querysets = [
+            (
+                "search",
+                ProductSearchSerializer,
+                annotate_store_stock(Product.objects.select_related("category"), [store.id]).order_by("price", "id"),
+            ),
+            (
+                "inventory",
+                InventoryListSerializer,
+                Inventory.objects.filter(store=store).select_related("product__category").order_by("id"),
+            ),
+            ("store_orders", StoreOrderSerializer, store_orders),
+        ]
+        for name, serializer_class, queryset in querysets:
+            instances = list(queryset[:PAGE])
+            compiled = get_compiled_serializer(serializer_class)
+            rows = list(compiled.project(queryset)[:PAGE])
+            results.append(
+                measure(f"{name}_serialize_drf", lambda: serializer_class(instances, many=True).data, args.repeat)
+            )
+            results.append(measure(f"{name}_serialize_compiled", lambda: compiled.serialize(rows), args.repeat))
+
+        report({"products": args.products, "page_size": PAGE, "results": results})
+
+
+if __name__ == "__main__":
+    main()
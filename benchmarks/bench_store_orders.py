@@ -0,0 +1,106 @@
+"""
+StoreOrderListView benchmark: first page vs deep page, offset vs keyset.
+
+Seeds one store with N orders (two items each) and times page-number
+pagination on the first and last pages against keyset pagination at the
+same depth.
+
+    python -m benchmarks.bench_store_orders --orders 1000000
+"""
+import argparse
+import datetime
+
+from benchmarks.utils import setup_django, benchmark_database, timer, percentiles, report
+
+setup_django()
+
+from django.db import connection  # noqa: E402
+from django.test.utils import CaptureQueriesContext, override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from django.utils import timezone  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from apps.orders.models import Order, OrderItem  # noqa: E402
+from apps.orders.views import StoreOrderKeysetPagination  # noqa: E402
+from apps.products.models import Category, Product  # noqa: E402
+from apps.stores.models import Store  # noqa: E402
+
+CHUNK = 10_000
+
+
+def seed(n):
+    store = Store.objects.create(name="bench")
+    cat = Category.objects.create(name="bench")
+    products = Product.objects.bulk_create(
+        [Product(title=f"Product {i}", price=1, category=cat) for i in range(2)]
+    )
+    start = timezone.now() - datetime.timedelta(seconds=n)
+    for offset in range(0, n, CHUNK):
+        orders = Order.objects.bulk_create(
+            [
+                Order(
+                    store=store,
+                    status=Order.STATUS_CONFIRMED,
+                    created_at=start + datetime.timedelta(seconds=i),
+                )
+                for i in range(offset, min(n, offset + CHUNK))
+            ]
+        )
+        OrderItem.objects.bulk_create(
+            [OrderItem(order=o, product=p, quantity_requested=1) for o in orders for p in products]
+        )
+    return store
+
+
+def deep_cursor(store, depth, page_size):
+    """Cursor token positioned `depth` rows into the listing."""
+    row = (
+        Order.objects.filter(store=store)
+        .order_by("-created_at", "-id")
+        .values("created_at", "id")[depth - 1]
+    )
+    paginator = StoreOrderKeysetPagination()
+    paginator.ordering_in_use = paginator.ordering
+    return paginator.encode_position([row["created_at"], row["id"]])
+
+
+def measure(name, client, url, params, repeat):
+    samples = []
+    for _ in range(repeat):
+        with CaptureQueriesContext(connection) as ctx, timer() as t:
+            resp = client.get(url, params)
+        assert resp.status_code == 200, resp.status_code
+        samples.append(t["seconds"])
+    return {"case": name, "queries": len(ctx.captured_queries), **percentiles(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--orders", type=int, default=100_000)
+    parser.add_argument("--page-size", type=int, default=20)
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with benchmark_database(), override_settings(DEBUG=False):
+        with timer() as seeding:
+            store = seed(args.orders)
+        client = APIClient()
+        url = reverse("store-orders", args=[store.id])
+        size = args.page_size
+        last_page = (args.orders + size - 1) // size
+        depth = (last_page - 1) * size
+        results = [
+            measure("page_first", client, url, {"page": 1}, args.repeat),
+            measure("page_last", client, url, {"page": last_page}, args.repeat),
+            measure("cursor_first", client, url, {"paginate": "cursor", "page_size": size}, args.repeat),
+        ]
+        if depth:
+            cursor = deep_cursor(store, depth, size)
+            results.append(
+                measure("cursor_last", client, url, {"cursor": cursor, "page_size": size}, args.repeat)
+            )
+        report({"orders": args.orders, "seed_seconds": round(seeding["seconds"], 1), "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,112 @@
+"""
+Store-aware product search: correlated Subquery vs join-based stock annotation.
+
+    python -m benchmarks.bench_store_stock --products 100000 --stores 5
+"""
+import argparse
+import random
+
+from benchmarks.utils import setup_django, benchmark_database, timer, percentiles, report
+
+setup_django()
+
+from django.db.models import OuterRef, Subquery  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from apps.products.models import Category, Product  # noqa: E402
+from apps.search.views import annotate_store_stock  # noqa: E402
+from apps.stores.models import Store, Inventory  # noqa: E402
+
+CHUNK = 10_000
+
+
+def seed(n, n_stores, coverage):
+    rng = random.Random(42)
+    cats = Category.objects.bulk_create([Category(name=f"Category {i}") for i in range(20)])
+    stores = Store.objects.bulk_create([Store(name=f"Store {i}") for i in range(n_stores)])
+    for offset in range(0, n, CHUNK):
+        products = Product.objects.bulk_create(
+            [
+                Product(
+                    title=f"Product {rng.randrange(n):08d}",
+                    price=rng.randint(100, 500_000) / 100,
+                    category=rng.choice(cats),
+                )
+                for _ in range(offset, min(n, offset + CHUNK))
+            ]
+        )
+        Inventory.objects.bulk_create(
+            [
+                Inventory(store=store, product=p, quantity=rng.randint(0, 20))
+                for p in products
+                for store in stores
+                if rng.random() < coverage
+            ]
+        )
+    return [store.id for store in stores]
+
+
+def subquery_stock(qs, store_id, in_stock):
+    """The previous per-row correlated subquery, for comparison."""
+    inv_sub = Inventory.objects.filter(store_id=store_id, product_id=OuterRef("pk")).values("quantity")[:1]
+    qs = qs.annotate(quantity=Subquery(inv_sub))
+    return qs.filter(quantity__gt=0) if in_stock else qs
+
+
+def measure(name, fn, repeat):
+    samples = []
+    for _ in range(repeat):
+        with timer() as t:
+            fn()
+        samples.append(t["seconds"])
+    return {"case": name, **percentiles(samples)}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=50_000)
+    parser.add_argument("--stores", type=int, default=5)
+    parser.add_argument("--coverage", type=float, default=0.3, help="share of products stocked per store")
+    parser.add_argument("--repeat", type=int, default=10)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        store_ids = seed(args.products, args.stores, args.coverage)
+        base = Product.objects.select_related("category").order_by("price", "id")
+        store = store_ids[0]
+
+        def first_page(qs):
+            return lambda: list(qs[:20])
+
+        def count(qs):
+            return lambda: qs.count()
+
+        results = []
+        for in_stock in (False, True):
+            suffix = "_in_stock" if in_stock else ""
+            old = subquery_stock(base, store, in_stock)
+            new = annotate_store_stock(base, [store], in_stock)
+            results.append(measure(f"subquery_page{suffix}", first_page(old), args.repeat))
+            results.append(measure(f"join_page{suffix}", first_page(new), args.repeat))
+            results.append(measure(f"subquery_count{suffix}", count(old), args.repeat))
+            results.append(measure(f"join_count{suffix}", count(new), args.repeat))
+
+        # N stores: N subquery requests vs one joined query
+        def per_store_requests():
+            for sid in store_ids:
+                list(subquery_stock(base, sid, True)[:20])
+
+        multi = annotate_store_stock(base, store_ids, in_stock=True)
+        results.append(measure(f"subquery_x{len(store_ids)}_stores", per_store_requests, args.repeat))
+        results.append(measure(f"join_{len(store_ids)}_stores", first_page(multi), args.repeat))
+
+        client = APIClient()
+        url = reverse("product-search")
+        params = {"store_id": ",".join(map(str, store_ids)), "in_stock": "true", "sort": "price"}
+        results.append(measure("endpoint_multi_store", lambda: client.get(url, params), args.repeat))
+        report({"products": args.products, "stores": args.stores, "results": results})
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+"""
+Autocomplete benchmark: in-memory SuggestionIndex vs the database path.
+
+Seeds N products, builds the index (time + memory) and times
+SuggestionIndex.suggest() against ProductSuggestView's database query for
+common, rare and missing prefixes. Results of both paths are compared.
+
+    python -m benchmarks.bench_suggest --products 1000000
+
+Exits with status 1 when the index's p95 for a common prefix or for a miss
+is above --max-index-us microseconds.
+"""
+import argparse
+import random
+import sys
+import tracemalloc
+
+from benchmarks.utils import setup_django, benchmark_database, timer, percentiles, report
+
+setup_django()
+
+from django.test.utils import override_settings  # noqa: E402
+from django.urls import reverse  # noqa: E402
+from rest_framework.test import APIClient  # noqa: E402
+
+from apps.products.models import Category, Product  # noqa: E402
+from apps.search.suggest import SuggestionIndex  # noqa: E402
+
+CHUNK = 10_000
+BRANDS = "Apple Samsung Sony Acme Globex Initech Umbrella Hooli Stark Wayne".split()
+NOUNS = (
+    "Phone Charger Cable Laptop Stand Mouse Keyboard Monitor Lamp Chair Kettle "
+    "Blender Speaker Headphones Camera Tripod Battery Adapter Blanket Pillow"
+).split()
+QUERIES = ["sam", "phone", "cha", "stark lamp", "qqq"]
+# must stay microsecond-scale at any catalog size
+GUARDED = {"sam": "common prefix", "qqq": "miss"}
+
+
+def seed(n):
+    rng = random.Random(3)
+    cat = Category.objects.create(name="bench")
+    for offset in range(0, n, CHUNK):
+        Product.objects.bulk_create(
+            [
+                Product(
+                    title=f"{rng.choice(BRANDS)} {rng.choice(NOUNS)} {rng.randint(1, 9999)}",
+                    price=1,
+                    category=cat,
+                )
+                for _ in range(offset, min(n, offset + CHUNK))
+            ]
+        )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--products", type=int, default=100_000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--max-index-us", type=float, default=50)
+    args = parser.parse_args()
+
+    with benchmark_database():
+        seed(args.products)
+
+        tracemalloc.start()
+        with timer() as build:
+            index = SuggestionIndex.from_database()
+        memory = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+
+        client = APIClient()
+        url = reverse("product-suggest")
+        results = []
+        for q in QUERIES:
+            db_samples, index_samples = [], []
+            with override_settings(SUGGEST_BACKEND="database"):
+                for _ in range(args.repeat):
+                    with timer() as t:
+                        expected = client.get(url, {"q": q}, REMOTE_ADDR=f"10.0.{_}.1").data["suggestions"]
+                    db_samples.append(t["seconds"])
+            for _ in range(args.repeat):
+                with timer() as t:
+                    got = index.suggest(q)
+                index_samples.append(t["seconds"])
+            results.append(
+                {
+                    "q": q,
+                    "same_result": got == expected,
+                    "database": percentiles(db_samples),
+                    "index": percentiles(index_samples),
+                }
+            )
+        slow = {
+            f"{GUARDED[r['q']]} {r['q']!r}": r["index"]["p95_ms"] * 1000
+            for r in results
+            if r["q"] in GUARDED and r["index"]["p95_ms"] * 1000 > args.max_index_us
+        }
+
+        report(
+            {
+                "products": args.products,
+                "index_build_seconds": round(build["seconds"], 2),
+                "index_peak_memory_mb": round(memory / 2**20, 1),
+                "results": results,
+            }
+        )
+    if slow:
+        print(f"Index p95 above {args.max_index_us} us: {slow}", file=sys.stderr)
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+import contextlib
+import json
+import os
+import statistics
+import tempfile
+import time
+
+import django
+
+
+def setup_django():
+    os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
+    # measure the queries, not the search result cache
+    os.environ.setdefault("SEARCH_CACHE_ENABLED", "false")
+    django.setup()
+
+
+@contextlib.contextmanager
+def benchmark_database():
+    """
+    Create a throwaway test database for the duration of a benchmark.
+
+    SQLite test databases are in-memory by default, which cannot be shared by
+    worker threads, so they are moved to a temporary file instead. Postgres
+    (POSTGRES_DB set) uses Django's usual test_<name> database.
+    """
+    from django.conf import settings
+    from django.db import connection
+
+    db = settings.DATABASES["default"]
+    tmpdir = None
+    if db["ENGINE"].endswith("sqlite3"):
+        tmpdir = tempfile.TemporaryDirectory()
+        db.setdefault("TEST", {})["NAME"] = os.path.join(tmpdir.name, "bench.sqlite3")
+        db.setdefault("OPTIONS", {}).setdefault("timeout", 30)
+
+    old_name = connection.creation.create_test_db(verbosity=0, serialize=False)
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        if tmpdir is not None:
+            tmpdir.cleanup()
+
+
+@contextlib.contextmanager
+def timer():
+    """Yields a dict whose "seconds" key is filled in when the block exits."""
+    result = {}
+    start = time.perf_counter()
+    try:
+        yield result
+    finally:
+        result["seconds"] = time.perf_counter() - start
+
+
+def percentiles(samples):
+    """p50/p95/p99 of a list of latencies (seconds), reported in milliseconds."""
+    if not samples:
+        return {"p50_ms": None, "p95_ms": None, "p99_ms": None}
+    ordered = sorted(samples)
+
+    def pick(p):
+        idx = min(len(ordered) - 1, int(round(p / 100 * (len(ordered) - 1))))
+        return round(ordered[idx] * 1000, 3)
+
+    return {
+        "p50_ms": pick(50),
+        "p95_ms": pick(95),
+        "p99_ms": pick(99),
+        "mean_ms": round(statistics.fmean(ordered) * 1000, 3),
+    }
+
+
+def report(results):
+    print(json.dumps(results, indent=2, default=str))
@@ -0,0 +1,92 @@
+"""
+Query plans of the SELECTs a block of code runs.
+
+    with capture_plans() as plans:
+        client.get(reverse("product-search"), {"sort": "price"})
+    for plan in plans:
+        print(plan.sql, plan.text, plan.seq_scans)
+
+Statements are recorded with their parameters through an execute wrapper,
+and explained after the block, so the code under test runs unchanged.
+`seq_scans` lists the tables read in full: SQLite's bare "SCAN <table>"
+(a "SCAN ... USING INDEX" walks an index in order and is fine), Postgres'
+"Seq Scan" nodes.
+
+Used by tests/test_query_plans.py and benchmarks/bench_query_plans.py.
+"""
+import json
+import re
+from contextlib import contextmanager
+
+from django.db import connections
+
+# "SCAN products_product" / "SCAN store_stock" but not "SCAN t USING INDEX i",
+# "SCAN t VIRTUAL TABLE INDEX ..." (FTS5) or "SCAN CONSTANT ROW"
+SQLITE_FULL_SCAN_RE = re.compile(r"^SCAN (?!CONSTANT ROW)(\S+)$")
+# derived tables (COUNT(*) over a subquery, CTEs): scanning those is no table read
+SQLITE_DERIVED_RE = re.compile(r"^(?:CO-ROUTINE|MATERIALIZE) (\S+)")
+
+
+class QueryPlan:
+    def __init__(self, sql, params, lines, seq_scans):
+        self.sql = sql
+        self.params = params
+        self.lines = lines  # the plan, one node per line
+        self.seq_scans = seq_scans  # tables (or join aliases) read in full
+
+    @property
+    def text(self):
+        return "\n".join(self.lines)
+
+    def __repr__(self):
+        return f"<QueryPlan seq_scans={self.seq_scans} sql={self.sql[:80]!r}>"
+
+
+def explain(sql, params=None, using="default"):
+    connection = connections[using]
+    with connection.cursor() as cursor:
+        if connection.vendor == "postgresql":
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            lines, seq_scans = [], []
+            _walk_postgres(plan[0]["Plan"], 0, lines, seq_scans)
+            return QueryPlan(sql, params, lines, seq_scans)
+        if connection.vendor == "sqlite":
+            cursor.execute("EXPLAIN QUERY PLAN " + sql, params)
+            lines = [row[3] for row in cursor.fetchall()]
+            derived = {m.group(1) for m in map(SQLITE_DERIVED_RE.match, lines) if m}
+            seq_scans = [
+                m.group(1) for m in map(SQLITE_FULL_SCAN_RE.match, lines) if m and m.group(1) not in derived
+            ]
+            return QueryPlan(sql, params, lines, seq_scans)
+    raise NotImplementedError(f"EXPLAIN is not supported on {connection.vendor}")
+
+
+def _walk_postgres(node, depth, lines, seq_scans):
+    relation = node.get("Relation Name")
+    label = node["Node Type"] + (f" on {relation}" if relation else "")
+    if node.get("Index Name"):
+        label += f" using {node['Index Name']}"
+    lines.append("  " * depth + label)
+    if node["Node Type"] == "Seq Scan":
+        seq_scans.append(relation)
+    for child in node.get("Plans", []):
+        _walk_postgres(child, depth + 1, lines, seq_scans)
+
+
+@contextmanager
+def capture_plans(using="default"):
+    """Yields a list that is filled with a QueryPlan per SELECT run in the block."""
+    statements = []
+
+    def record(execute, sql, params, many, context):
+        if not many and sql.lstrip().upper().startswith("SELECT"):
+            statements.append((sql, params))
+        return execute(sql, params, many, context)
+
+    plans = []
+    with connections[using].execute_wrapper(record):
+        yield plans
+    plans.extend(explain(sql, params, using) for sql, params in statements)
@@ -0,0 +1,93 @@
+import csv
+import io
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.exceptions import NotFound
+from rest_framework.views import APIView
+
+from project.pagination import encode_value
+
+
+def _csv_value(value):
+    try:
+        return encode_value(value)
+    except TypeError:
+        return value  # str, int, None: csv writes these as is
+
+
+def iter_ndjson(rows, columns, batch_size):
+    """One JSON object per line, `batch_size` lines per yielded chunk."""
+    dumps = json.JSONEncoder(default=encode_value, separators=(",", ":")).encode
+    lines = []
+    for row in rows:
+        lines.append(dumps(dict(zip(columns, row))))
+        if len(lines) >= batch_size:
+            lines.append("")
+            yield "\n".join(lines).encode()
+            lines = []
+    if lines:
+        lines.append("")
+        yield "\n".join(lines).encode()
+
+
+def iter_csv(rows, columns, batch_size):
+    """Header line, then one CSV line per row, `batch_size` rows per yielded chunk."""
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(columns)
+    pending = 0
+    for row in rows:
+        writer.writerow([_csv_value(value) for value in row])
+        pending += 1
+        if pending >= batch_size:
+            yield buffer.getvalue().encode()
+            buffer.seek(0)
+            buffer.truncate()
+            pending = 0
+    yield buffer.getvalue().encode()
+
+
+EXPORT_FORMATS = {
+    "ndjson": (iter_ndjson, "application/x-ndjson"),
+    "csv": (iter_csv, "text/csv; charset=utf-8"),
+}
+
+
+class StreamingExportView(APIView):
+    """
+    Streams every row of `get_queryset()` as NDJSON or CSV (the `fmt` URL
+    kwarg). Rows are read with values_list().iterator(), so memory stays
+    flat however many rows there are (a server-side cursor on Postgres,
+    chunked fetches elsewhere), and nothing is counted up front.
+
+    `columns` is a sequence of (output name, values_list field) pairs.
+    """
+
+    columns = ()
+    chunk_size = 2000  # rows per database fetch
+    batch_size = 500  # rows per chunk written to the client
+    filename = "export"
+
+    def get_queryset(self):
+        raise NotImplementedError
+
+    def get_filename(self):
+        return self.filename
+
+    def get(self, request, fmt, **kwargs):
+        try:
+            iter_format, content_type = EXPORT_FORMATS[fmt]
+        except KeyError:
+            raise NotFound(f"Unknown export format {fmt!r}; use one of {', '.join(EXPORT_FORMATS)}.")
+        rows = (
+            self.get_queryset()
+            .values_list(*[field for _, field in self.columns])
+            .iterator(chunk_size=self.chunk_size)
+        )
+        response = StreamingHttpResponse(
+            iter_format(rows, [name for name, _ in self.columns], self.batch_size),
+            content_type=content_type,
+        )
+        response["Content-Disposition"] = f'attachment; filename="{self.get_filename()}.{fmt}"'
+        return response
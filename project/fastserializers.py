@@ -0,0 +1,155 @@
+from django.conf import settings
+from django.db.models.fields.reverse_related import ManyToOneRel
+from rest_framework import serializers
+from rest_framework.response import Response
+
+from project.perf import span
+
+
+class NotCompilable(Exception):
+    """The serializer uses a field the compiled path can't reproduce exactly."""
+
+
+# fields whose DRF representation of a database value is the value itself
+IDENTITY_FIELDS = (serializers.IntegerField, serializers.CharField, serializers.PrimaryKeyRelatedField)
+
+
+class CompiledSerializer:
+    """
+    Read-only fast path for a ModelSerializer used on list endpoints.
+
+    The serializer's fields are inspected once and turned into
+    - a values_list() projection (dotted sources become joins:
+      "category.name" -> "category__name"), and
+    - a generated row -> dict function that indexes the row tuple directly,
+      only calling the DRF field's to_representation() where it actually
+      transforms the value (decimals, datetimes, ...).
+
+    Nested `many=True` serializers over a reverse foreign key (order.items)
+    are loaded with one extra values_list() query per page.
+
+    The output is identical to the DRF serializer's; anything that can't be
+    reproduced exactly (SerializerMethodField, nested single objects, ...)
+    raises NotCompilable so the caller keeps using DRF.
+    """
+
+    def __init__(self, serializer_class):
+        self.serializer_class = serializer_class
+        self.model = serializer_class.Meta.model
+        self.columns = []  # values_list lookups, in field order
+        self.nested = []  # (output name, relation, CompiledSerializer)
+        specs = []
+        for name, field in serializer_class().fields.items():
+            if field.write_only:
+                continue
+            if isinstance(field, serializers.ListSerializer):
+                child = CompiledSerializer(type(field.child))
+                if child.nested:
+                    raise NotCompilable(f"{serializer_class.__name__}.{name}")
+                self.nested.append((name, self.reverse_relation(field), child))
+                specs.append((name, None, None))
+                continue
+            if field.source == "*" or isinstance(
+                field, (serializers.SerializerMethodField, serializers.BaseSerializer)
+            ):
+                raise NotCompilable(f"{serializer_class.__name__}.{name}")
+            specs.append((name, len(self.columns), self.converter(field)))
+            self.columns.append(field.source.replace(".", "__"))
+        if self.nested and "id" not in self.columns:
+            self.columns.append("id")
+        self.pk_index = self.columns.index("id") if self.nested else None
+        self.row_to_dict = self.compile(specs)
+
+    def reverse_relation(self, field):
+        rel = self.model._meta.get_field(field.source)
+        if not isinstance(rel, ManyToOneRel):
+            raise NotCompilable(f"{self.serializer_class.__name__}.{field.field_name}")
+        return rel
+
+    @staticmethod
+    def converter(field):
+        if isinstance(field, IDENTITY_FIELDS):
+            return None
+        if isinstance(field, serializers.ChoiceField) and all(isinstance(k, str) for k in field.choices):
+            return None
+        return field.to_representation
+
+    @staticmethod
+    def compile(specs):
+        namespace = {}
+        items = []
+        for name, index, convert in specs:
+            if index is None:
+                expr = "None"  # nested, filled in by serialize()
+            elif convert is None:
+                expr = f"row[{index}]"
+            else:
+                namespace[f"convert_{index}"] = convert
+                expr = f"(None if row[{index}] is None else convert_{index}(row[{index}]))"
+            items.append(f"{name!r}: {expr}")
+        source = "def row_to_dict(row):\n    return {" + ", ".join(items) + "}\n"
+        exec(source, namespace)
+        return namespace["row_to_dict"]
+
+    def project(self, queryset):
+        """
+        values_list() over the serializer's columns, plus any ordering fields
+        (keyset pagination reads them from the rows), as named tuples.
+        """
+        lookups = list(self.columns)
+        for field in queryset.query.order_by:
+            if isinstance(field, str) and field.lstrip("-") not in lookups:
+                lookups.append(field.lstrip("-"))
+        return queryset.select_related(None).prefetch_related(None).values_list(*lookups, named=True)
+
+    def serialize(self, rows):
+        rows = list(rows)
+        data = [self.row_to_dict(row) for row in rows]
+        for name, rel, child in self.nested:
+            fk = rel.field.attname
+            children = {}
+            parent_ids = [row[self.pk_index] for row in rows]
+            queryset = rel.related_model.objects.filter(**{f"{fk}__in": parent_ids}).order_by(fk, "pk")
+            for child_row in queryset.values_list(fk, *child.columns):
+                children.setdefault(child_row[0], []).append(child.row_to_dict(child_row[1:]))
+            for row, item in zip(rows, data):
+                item[name] = children.get(row[self.pk_index], [])
+        return data
+
+
+_compiled = {}
+
+
+def get_compiled_serializer(serializer_class):
+    """Cached CompiledSerializer for `serializer_class`, or None if it can't be compiled."""
+    if serializer_class not in _compiled:
+        try:
+            _compiled[serializer_class] = CompiledSerializer(serializer_class)
+        except NotCompilable:
+            _compiled[serializer_class] = None
+    return _compiled[serializer_class]
+
+
+class CompiledListMixin:
+    """
+    For generic list views: serialize pages through the compiled serializer
+    of get_serializer_class() when settings.FAST_SERIALIZERS is on and the
+    serializer compiles, and through DRF otherwise (timed as "serialize"
+    either way).
+    """
+
+    def list(self, request, *args, **kwargs):
+        compiled = get_compiled_serializer(self.get_serializer_class()) if settings.FAST_SERIALIZERS else None
+        queryset = self.filter_queryset(self.get_queryset())
+        if compiled is not None:
+            queryset = compiled.project(queryset)
+        page = self.paginate_queryset(queryset)
+        rows = page if page is not None else queryset
+        with span("serialize"):
+            if compiled is not None:
+                data = compiled.serialize(rows)
+            else:
+                data = self.get_serializer(rows, many=True).data
+        if page is not None:
+            return self.get_paginated_response(data)
+        return Response(data)
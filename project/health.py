@@ -0,0 +1,36 @@
+from django.db import connection
+from rest_framework.response import Response
+from rest_framework.views import APIView
+
+from project.redis_client import check_health
+
+
+class HealthView(APIView):
+    """
+    Liveness of the database and Redis. Redis being down only degrades the
+    service (throttling, caches and idempotency fall back to local state),
+    so the status code is 503 only when the database is unreachable.
+    """
+
+    authentication_classes = []
+    permission_classes = []
+    query_budget = 1
+
+    def get(self, request):
+        try:
+            with connection.cursor() as cursor:
+                cursor.execute("SELECT 1")
+            database = "ok"
+        except Exception:
+            database = "unavailable"
+        redis_health = check_health()
+        if database != "ok":
+            status = "down"
+        elif redis_health["status"] != "ok":
+            status = "degraded"
+        else:
+            status = "ok"
+        return Response(
+            {"status": status, "database": database, "redis": redis_health},
+            status=503 if database != "ok" else 200,
+        )
@@ -0,0 +1,143 @@
+import threading
+
+from django.http import HttpResponse
+from django.views import View
+
+
+class Histogram:
+    """Minimal thread-safe cumulative histogram (Prometheus-style buckets)."""
+
+    def __init__(self, buckets):
+        self.buckets = tuple(buckets)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._count = 0
+        self._sum = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value):
+        with self._lock:
+            self._count += 1
+            self._sum += value
+            for i, upper in enumerate(self.buckets):
+                if value <= upper:
+                    self._counts[i] += 1
+                    return
+            self._counts[-1] += 1
+
+    def snapshot(self):
+        with self._lock:
+            cumulative = 0
+            buckets = {}
+            for upper, n in zip(self.buckets + ("+Inf",), self._counts):
+                cumulative += n
+                buckets[str(upper)] = cumulative
+            return {"buckets": buckets, "count": self._count, "sum": self._sum}
+
+    def reset(self):
+        with self._lock:
+            self._counts = [0] * (len(self.buckets) + 1)
+            self._count = 0
+            self._sum = 0.0
+
+
+SECONDS_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+# name -> (help, RequestProfile attribute, buckets); one histogram per view + method
+HISTOGRAMS = {
+    "http_request_duration_seconds": ("Wall time of the request.", "duration", SECONDS_BUCKETS),
+    "http_request_db_seconds": ("Time spent executing SQL.", "db_seconds", SECONDS_BUCKETS),
+    "http_request_queries": ("SQL queries per request (transaction control excluded).", "queries", QUERY_BUCKETS),
+}
+COUNTERS = {
+    "http_requests_total": "Requests by view, method and status code.",
+    "http_duplicate_queries_total": "Queries repeating an earlier statement of the same request.",
+    "http_serialize_seconds_total": "Time spent serializing response data, excluding SQL.",
+    "http_render_seconds_total": "Time spent rendering responses.",
+    "http_response_size_bytes_total": "Bytes of non-streaming response bodies.",
+    "http_query_budget_exceeded_total": "Requests that ran over their view's query budget.",
+}
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return "{" + ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items()) + "}"
+
+
+class RequestMetrics:
+    """
+    In-process aggregates of every instrumented request (project/perf.py),
+    per view name and HTTP method, rendered in the Prometheus text format.
+    Each process (gunicorn worker) keeps its own numbers; scrape them all.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._histograms = {}  # (view, method) -> {name: Histogram}
+        self._counters = {}  # (name, labels) -> value
+
+    def _add(self, name, labels, amount):
+        with self._lock:
+            self._counters[name, labels] = self._counters.get((name, labels), 0) + amount
+
+    def observe(self, view, method, status, profile, over_budget=False):
+        key = (view, method)
+        histograms = self._histograms.get(key)
+        if histograms is None:
+            with self._lock:
+                histograms = self._histograms.setdefault(
+                    key, {name: Histogram(buckets) for name, (_, _, buckets) in HISTOGRAMS.items()}
+                )
+        for name, (_, attribute, _) in HISTOGRAMS.items():
+            histograms[name].observe(getattr(profile, attribute))
+
+        labels = _labels(view=view, method=method)
+        self._add("http_requests_total", _labels(view=view, method=method, status=status), 1)
+        self._add("http_duplicate_queries_total", labels, profile.duplicate_queries)
+        self._add("http_serialize_seconds_total", labels, profile.spans.get("serialize", 0.0))
+        self._add("http_render_seconds_total", labels, profile.spans.get("render", 0.0))
+        if profile.response_bytes is not None:
+            self._add("http_response_size_bytes_total", labels, profile.response_bytes)
+        if over_budget:
+            self._add("http_query_budget_exceeded_total", labels, 1)
+
+    def render(self):
+        lines = []
+        with self._lock:
+            histograms = dict(self._histograms)
+            counters = dict(self._counters)
+
+        for name, (help_text, _, _) in HISTOGRAMS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+            for (view, method), per_view in sorted(histograms.items()):
+                snapshot = per_view[name].snapshot()
+                for upper, count in snapshot["buckets"].items():
+                    lines.append(f"{name}_bucket{_labels(view=view, method=method, le=upper)} {count}")
+                labels = _labels(view=view, method=method)
+                lines.append(f"{name}_sum{labels} {snapshot['sum']}")
+                lines.append(f"{name}_count{labels} {snapshot['count']}")
+
+        for name, help_text in COUNTERS.items():
+            lines += [f"# HELP {name} {help_text}", f"# TYPE {name} counter"]
+            for (counter, labels), value in sorted(counters.items()):
+                if counter == name:
+                    lines.append(f"{name}{labels} {value}")
+        return "\n".join(lines) + "\n"
+
+    def reset(self):
+        with self._lock:
+            self._histograms = {}
+            self._counters = {}
+
+
+request_metrics = RequestMetrics()
+
+
+class MetricsView(View):
+    """GET /metrics/: this process's request metrics for a Prometheus scrape."""
+
+    def get(self, request):
+        return HttpResponse(request_metrics.render(), content_type="text/plain; version=0.0.4; charset=utf-8")
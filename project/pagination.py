@@ -0,0 +1,222 @@
+import base64
+import binascii
+import datetime
+import decimal
+import json
+
+from django.core.exceptions import ValidationError
+from django.db import connections
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+
+def encode_value(value):
+    """JSON `default=` for cursors and exports; raises TypeError for anything else."""
+    # full precision: DjangoJSONEncoder would drop datetime microseconds
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, decimal.Decimal):
+        return str(value)
+    raise TypeError(f"Cannot encode {type(value).__name__}")
+
+
+class KeysetPagination(BasePagination):
+    """
+    Keyset ("seek") pagination over an explicit ordering.
+
+    `ordering` is a sequence of (field, descending) pairs whose last entry is
+    unique (normally the primary key). The cursor carries the values of the
+    last row of the page, and the next page is fetched with
+
+        WHERE (a, b, id) > (:a, :b, :id)   -- expanded to OR/AND for mixed directions
+
+    so every page costs the same, however deep it is, and no COUNT(*) is run.
+    Only forward navigation is supported. ?estimate_count=true adds an
+    "estimated_count" from the planner (see estimate_count()).
+    """
+
+    page_size = 20
+    page_size_query_param = "page_size"
+    max_page_size = 100
+    cursor_query_param = "cursor"
+    estimate_count_query_param = "estimate_count"
+    ordering = (("id", False),)
+    invalid_cursor_message = "Invalid cursor"
+
+    def get_ordering(self, request, queryset, view):
+        return self.ordering
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params[self.page_size_query_param])
+            if size > 0:
+                return min(size, self.max_page_size)
+        except (KeyError, ValueError):
+            pass
+        return self.page_size
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.ordering_in_use = tuple(
+            (field, bool(desc)) for field, desc in self.get_ordering(request, queryset, view)
+        )
+        page_size = self.get_page_size(request)
+
+        self.estimated_count = None
+        if request.query_params.get(self.estimate_count_query_param) == "true":
+            self.estimated_count = estimate_count(queryset)
+
+        queryset = queryset.order_by(
+            *[("-" if desc else "") + field for field, desc in self.ordering_in_use]
+        )
+        position = self.decode_cursor(request)
+        if position is not None:
+            position = self.clean_position(queryset, position)
+            queryset = queryset.filter(self.keyset_filter(position))
+
+        rows = list(queryset[: page_size + 1])
+        self.has_next = len(rows) > page_size
+        rows = rows[:page_size]
+        self.next_position = (
+            [self.get_row_value(rows[-1], field) for field, _ in self.ordering_in_use]
+            if self.has_next
+            else None
+        )
+        return rows
+
+    def keyset_filter(self, position):
+        """(f1 > v1) OR (f1 = v1 AND f2 > v2) OR ... with > / < per direction."""
+        condition = Q()
+        equal_prefix = Q()
+        for (field, desc), value in zip(self.ordering_in_use, position):
+            lookup = "lt" if desc else "gt"
+            condition |= equal_prefix & Q(**{f"{field}__{lookup}": value})
+            equal_prefix &= Q(**{field: value})
+        return condition
+
+    def clean_position(self, queryset, position):
+        """Cursor values converted by their ordering fields; a tampered value is an invalid cursor."""
+        try:
+            return [
+                ordering_field(queryset, field).to_python(value)
+                for (field, _), value in zip(self.ordering_in_use, position)
+            ]
+        except (ValidationError, ValueError, TypeError):
+            raise NotFound(self.invalid_cursor_message)
+
+    @staticmethod
+    def get_row_value(row, field):
+        if isinstance(row, tuple):
+            # values_list(named=True) row: lookups are flat attribute names
+            return getattr(row, field)
+        value = row
+        for part in field.split("__"):
+            value = value[part] if isinstance(value, dict) else getattr(value, part)
+        return value
+
+    def encode_position(self, position):
+        payload = json.dumps(
+            {"o": [f"{'-' if d else ''}{f}" for f, d in self.ordering_in_use], "v": position},
+            default=encode_value,
+            separators=(",", ":"),
+        )
+        return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+    def decode_cursor(self, request):
+        token = request.query_params.get(self.cursor_query_param)
+        if not token:
+            return None
+        try:
+            padded = token + "=" * (-len(token) % 4)
+            payload = json.loads(base64.urlsafe_b64decode(padded.encode()))
+            expected = [f"{'-' if d else ''}{f}" for f, d in self.ordering_in_use]
+            if payload["o"] != expected or len(payload["v"]) != len(expected):
+                raise ValueError("cursor does not match the current ordering")
+            return payload["v"]
+        except (TypeError, ValueError, KeyError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, self.encode_position(self.next_position))
+
+    def get_paginated_response(self, data):
+        return Response(self.get_envelope(data))
+
+    def get_envelope(self, data):
+        envelope = {"next": self.get_next_link(), "results": data}
+        if self.estimated_count is not None:
+            envelope["estimated_count"] = self.estimated_count
+        return envelope
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+
+def ordering_field(queryset, name):
+    """The model field (or annotation output field) behind an ordering name like "product__title"."""
+    if name in queryset.query.annotations:
+        return queryset.query.annotations[name].output_field
+    model = queryset.model
+    *relations, name = name.split("__")
+    for relation in relations:
+        model = model._meta.get_field(relation).related_model
+    return model._meta.get_field(name)
+
+
+def estimate_count(queryset, cap=10_000):
+    """
+    Cheap row count for `queryset`.
+
+    On Postgres this is the planner's row estimate (EXPLAIN, no scan). Other
+    backends count at most `cap` rows, so the result saturates at `cap`.
+    """
+    connection = connections[queryset.db]
+    queryset = queryset.order_by()
+    if connection.vendor == "postgresql":
+        sql, params = queryset.query.sql_with_params()
+        with connection.cursor() as cursor:
+            cursor.execute("EXPLAIN (FORMAT JSON) " + sql, params)
+            plan = cursor.fetchone()[0]
+        if isinstance(plan, str):
+            plan = json.loads(plan)
+        return int(plan[0]["Plan"]["Plan Rows"])
+    return queryset.values("pk")[:cap].count()
+
+
+def is_keyset_request(request):
+    """Cursor mode is opted into with ?paginate=cursor and continued with ?cursor=..."""
+    params = request.query_params
+    return bool(params.get("cursor")) or params.get("paginate") == "cursor"
+
+
+class KeysetPaginationMixin:
+    """
+    For generic list views: use `keyset_pagination_class` instead of
+    `pagination_class` when the request asks for cursor pagination.
+    """
+
+    keyset_pagination_class = None
+
+    @property
+    def paginator(self):
+        if not hasattr(self, "_paginator"):
+            if self.keyset_pagination_class is not None and is_keyset_request(self.request):
+                self._paginator = self.keyset_pagination_class()
+            elif self.pagination_class is None:
+                self._paginator = None
+            else:
+                self._paginator = self.pagination_class()
+        return self._paginator
@@ -0,0 +1,190 @@
+import logging
+import time
+from collections import Counter
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+
+from project.metrics import request_metrics
+
+logger = logging.getLogger(__name__)
+
+# statements counted in DB time but not as queries (they depend on the
+# backend and on whether the test runner wraps everything in a transaction)
+TRANSACTION_STATEMENTS = ("SAVEPOINT", "RELEASE", "ROLLBACK", "BEGIN", "COMMIT")
+
+_current = ContextVar("request_profile", default=None)
+
+
+class QueryBudgetExceeded(AssertionError):
+    """A view ran more queries than its `query_budget` allows."""
+
+
+class RequestProfile:
+    """What one request spent its time on; filled in by PerformanceMiddleware."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.duration = 0.0
+        self.db_seconds = 0.0
+        self.queries = 0
+        self.statements = Counter()  # SQL (with placeholders) -> executions
+        self.spans = {}  # "serialize", "render", ... -> seconds, SQL excluded
+        self.response_bytes = None  # None for streaming responses
+        self.budget = None  # set_query_budget() override of the view's query_budget
+
+    def record_query(self, sql, seconds):
+        self.db_seconds += seconds
+        if sql.lstrip().upper().startswith(TRANSACTION_STATEMENTS):
+            return
+        self.queries += 1
+        self.statements[sql] += 1
+
+    def add_span(self, name, seconds):
+        self.spans[name] = self.spans.get(name, 0.0) + seconds
+
+    @property
+    def duplicate_queries(self):
+        """Executions repeating an earlier statement: the N+1 signature."""
+        return sum(n - 1 for n in self.statements.values() if n > 1)
+
+    def finish(self, response):
+        self.duration = time.perf_counter() - self.started
+        if not response.streaming:
+            self.response_bytes = len(response.content)
+
+    def server_timing(self):
+        desc = f"{self.queries} queries"
+        if self.duplicate_queries:
+            desc += f", {self.duplicate_queries} duplicate"
+        metrics = [f'db;dur={self.db_seconds * 1000:.2f};desc="{desc}"']
+        metrics += [f"{name};dur={seconds * 1000:.2f}" for name, seconds in self.spans.items()]
+        metrics.append(f"total;dur={self.duration * 1000:.2f}")
+        return ", ".join(metrics)
+
+
+def record_query(execute, sql, params, many, context):
+    """connection.execute_wrapper() hook: time every statement into the current profile."""
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        profile = _current.get()
+        if profile is not None:
+            profile.record_query(sql, time.perf_counter() - started)
+
+
+@contextmanager
+def span(name):
+    """
+    Time a block into the current request's profile under `name`, minus the
+    SQL it runs (that is already in "db"). A no-op outside a profiled request.
+    """
+    profile = _current.get()
+    if profile is None:
+        yield
+        return
+    started = time.perf_counter()
+    db_before = profile.db_seconds
+    try:
+        yield
+    finally:
+        profile.add_span(name, time.perf_counter() - started - (profile.db_seconds - db_before))
+
+
+def view_name(request):
+    match = request.resolver_match
+    return match.view_name if match is not None else "unmatched"
+
+
+def set_query_budget(budget):
+    """
+    Replace the view's `query_budget` for the current request, for views whose
+    query count legitimately grows with the input. A no-op outside a profiled
+    request.
+    """
+    profile = _current.get()
+    if profile is not None:
+        profile.budget = budget
+
+
+def query_budget(request):
+    """`query_budget` declared on the resolved view class, if any."""
+    match = request.resolver_match
+    view_class = getattr(match.func, "view_class", None) if match is not None else None
+    return getattr(view_class, "query_budget", None)
+
+
+class PerformanceMiddleware:
+    """
+    Profiles every request: wall time, SQL time and query count (through a
+    connection.execute_wrapper() on each database alias), duplicate
+    statements, serialization and rendering time, and response size.
+
+    The numbers go into a Server-Timing header and the in-process metrics
+    behind GET /metrics/. Views declare `query_budget = n` (or call
+    set_query_budget() when the count depends on the request); a request running
+    more queries is logged (PERF_QUERY_BUDGETS="warn") or fails with
+    QueryBudgetExceeded ("raise", what the test suite uses).
+
+    Only this thread's queries are seen: rows read while a streaming
+    response is consumed, or by the batched order intake worker, are not.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not settings.PERF_INSTRUMENTATION:
+            return self.get_response(request)
+
+        profile = RequestProfile()
+        token = _current.set(profile)
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(record_query))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        profile.finish(response)
+
+        view = view_name(request)
+        if settings.PERF_SERVER_TIMING:
+            response["Server-Timing"] = profile.server_timing()
+        self.check_duplicates(view, profile)
+        budget = profile.budget if profile.budget is not None else query_budget(request)
+        over_budget = budget is not None and profile.queries > budget
+        request_metrics.observe(view, request.method, response.status_code, profile, over_budget)
+        if over_budget:
+            self.budget_exceeded(view, request, profile, budget)
+        return response
+
+    def process_template_response(self, request, response):
+        # called right before (DRF) responses are rendered
+        profile = _current.get()
+        if profile is not None:
+            started = time.perf_counter()
+            response.add_post_render_callback(
+                lambda rendered: profile.add_span("render", time.perf_counter() - started)
+            )
+        return response
+
+    @staticmethod
+    def check_duplicates(view, profile):
+        if not profile.statements:
+            return
+        sql, count = profile.statements.most_common(1)[0]
+        if count >= settings.PERF_DUPLICATE_QUERY_THRESHOLD:
+            logger.warning("Possible N+1 in %s: %d executions of %s", view, count, sql[:200])
+
+    @staticmethod
+    def budget_exceeded(view, request, profile, budget):
+        message = f"{request.method} {view} ran {profile.queries} queries, budget is {budget}"
+        if settings.PERF_QUERY_BUDGETS == "raise":
+            details = "\n".join(f"{n}x {sql}" for sql, n in profile.statements.most_common())
+            raise QueryBudgetExceeded(f"{message}:\n{details}")
+        if settings.PERF_QUERY_BUDGETS == "warn":
+            logger.warning(message)
@@ -0,0 +1,172 @@
+import threading
+import time
+
+import redis
+from redis.client import Pipeline
+from redis.exceptions import ConnectionError as RedisConnectionError, TimeoutError as RedisTimeoutError
+from django.conf import settings
+
+
+class CircuitOpen(RedisConnectionError):
+    """Raised instead of calling Redis while the circuit breaker is open."""
+
+
+# what callers catch to fall back to their local path; includes CircuitOpen
+REDIS_ERRORS = (RedisConnectionError, RedisTimeoutError, OSError)
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive connection/timeout errors;
+    while open every call fails immediately with CircuitOpen. After `cooldown`
+    seconds one call is let through as a probe: success closes the breaker,
+    failure re-opens it for another cooldown.
+    """
+
+    def __init__(self, failure_threshold, cooldown):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self._lock = threading.Lock()
+        self._failures = 0
+        self._opened_at = None
+        self.stats = {"failures": 0, "trips": 0, "short_circuited": 0}
+
+    @property
+    def state(self):
+        if self._opened_at is None:
+            return "closed"
+        if time.monotonic() - self._opened_at < self.cooldown:
+            return "open"
+        return "half_open"
+
+    def before_call(self):
+        with self._lock:
+            if self._opened_at is None:
+                return
+            now = time.monotonic()
+            if now - self._opened_at < self.cooldown:
+                self.stats["short_circuited"] += 1
+                raise CircuitOpen("Redis circuit breaker is open")
+            # half-open: this call is the probe, everyone else keeps waiting
+            self._opened_at = now
+
+    def record_success(self):
+        if self._failures or self._opened_at is not None:
+            with self._lock:
+                self._failures = 0
+                self._opened_at = None
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            self.stats["failures"] += 1
+            if self._failures >= self.failure_threshold:
+                if self._opened_at is None:
+                    self.stats["trips"] += 1
+                self._opened_at = time.monotonic()
+
+    def reset(self):
+        with self._lock:
+            self._failures = 0
+            self._opened_at = None
+            for name in self.stats:
+                self.stats[name] = 0
+
+    def snapshot(self):
+        with self._lock:
+            return {"state": self.state, "consecutive_failures": self._failures, **self.stats}
+
+
+def guarded(breaker, call, *args, **kwargs):
+    breaker.before_call()
+    try:
+        result = call(*args, **kwargs)
+    except CircuitOpen:
+        raise
+    except (RedisConnectionError, RedisTimeoutError):
+        breaker.record_failure()
+        raise
+    breaker.record_success()
+    return result
+
+
+class ResilientPipeline(Pipeline):
+    def __init__(self, breaker, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.breaker = breaker
+
+    def execute(self, raise_on_error=True):
+        return guarded(self.breaker, super().execute, raise_on_error)
+
+
+class ResilientRedis(redis.Redis):
+    """redis.Redis whose commands and pipelines go through a CircuitBreaker."""
+
+    def __init__(self, *args, breaker, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.breaker = breaker
+
+    def execute_command(self, *args, **options):
+        return guarded(self.breaker, super().execute_command, *args, **options)
+
+    def pipeline(self, transaction=True, shard_hint=None):
+        return ResilientPipeline(
+            self.breaker, self.connection_pool, self.response_callbacks, transaction, shard_hint
+        )
+
+
+def build_pool(url=None, **kwargs):
+    """
+    BlockingConnectionPool for settings.REDIS_URL: at most REDIS_MAX_CONNECTIONS
+    sockets, waiting at most REDIS_POOL_TIMEOUT for a free one, and every
+    connect/read bounded by REDIS_CONNECT_TIMEOUT / REDIS_SOCKET_TIMEOUT.
+    """
+    options = {
+        "max_connections": settings.REDIS_MAX_CONNECTIONS,
+        "timeout": settings.REDIS_POOL_TIMEOUT,
+        "socket_connect_timeout": settings.REDIS_CONNECT_TIMEOUT,
+        "socket_timeout": settings.REDIS_SOCKET_TIMEOUT,
+        "health_check_interval": 30,
+        **kwargs,
+    }
+    return redis.BlockingConnectionPool.from_url(url or settings.REDIS_URL, **options)
+
+
+def pool_stats(pool=None):
+    """Connection counts of a BlockingConnectionPool (default: the shared one)."""
+    pool = pool or redis_client.connection_pool
+    # a point-in-time read of redis-py's internals; good enough for metrics
+    created = len(pool._connections)
+    idle = sum(1 for conn in list(pool.pool.queue) if conn is not None)
+    return {
+        "max_connections": pool.max_connections,
+        "created": created,
+        "in_use": created - idle,
+        "idle": idle,
+    }
+
+
+def check_health():
+    """PING through the shared client; never raises."""
+    started = time.perf_counter()
+    try:
+        redis_client.ping()
+        status = "ok"
+    except CircuitOpen:
+        status = "circuit_open"
+    except REDIS_ERRORS:
+        status = "unavailable"
+    return {
+        "status": status,
+        "latency_ms": round((time.perf_counter() - started) * 1000, 3),
+        "breaker": redis_client.breaker.snapshot(),
+        "pool": pool_stats(),
+    }
+
+
+# Shared client for throttling, caches, idempotency and health checks.
+# Nothing connects until the first command.
+redis_client = ResilientRedis(
+    connection_pool=build_pool(),
+    breaker=CircuitBreaker(settings.REDIS_BREAKER_FAILURES, settings.REDIS_BREAKER_COOLDOWN),
+)
@@ -0,0 +1,94 @@
+import json
+import uuid
+
+from django.conf import settings
+from rest_framework.compat import INDENT_SEPARATORS, LONG_SEPARATORS, SHORT_SEPARATORS
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # optional: stdlib json is used instead
+    orjson = None
+
+
+class RawJSON:
+    """
+    Already-encoded JSON (e.g. a cached result) to embed verbatim in a
+    response rendered by FastJSONRenderer, without decoding it first.
+    """
+
+    __slots__ = ("data",)
+
+    def __init__(self, data):
+        self.data = data if isinstance(data, bytes) else data.encode()
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    Drop-in JSONRenderer producing the same bytes as DRF's.
+
+    Compact, non-ASCII-escaping output (DRF's defaults) is encoded with
+    orjson when it's installed and settings.JSON_RENDERER_BACKEND allows it;
+    indented output, other DRF JSON settings and anything orjson rejects go
+    through the stdlib encoder. Types orjson doesn't know (Decimal, lazy
+    strings, ...) are handed to DRF's JSONEncoder.default, so they come out
+    the same either way.
+
+    RawJSON values are spliced into the output as-is: the encoder writes a
+    per-render placeholder string in their place, replaced afterwards.
+    """
+
+    def use_orjson(self, indent):
+        backend = settings.JSON_RENDERER_BACKEND
+        if backend == "stdlib" or orjson is None:
+            if backend == "orjson" and orjson is None:
+                raise RuntimeError("JSON_RENDERER_BACKEND is 'orjson' but orjson is not installed")
+            return False
+        return indent is None and self.compact and not self.ensure_ascii
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if data is None:
+            return b""
+
+        renderer_context = renderer_context or {}
+        indent = self.get_indent(accepted_media_type, renderer_context)
+        fragments = []
+        nonce = []
+        fallback = self.encoder_class().default
+
+        def default(obj):
+            if isinstance(obj, RawJSON):
+                if not nonce:
+                    nonce.append(uuid.uuid4().hex)
+                fragments.append(obj.data)
+                return f"\x00{nonce[0]}:{len(fragments) - 1}\x00"
+            return fallback(obj)
+
+        ret = None
+        if self.use_orjson(indent):
+            try:
+                ret = orjson.dumps(
+                    data,
+                    default=default,
+                    option=orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME,
+                )
+            except TypeError:
+                # e.g. integers beyond 64 bits: let the stdlib encoder decide
+                fragments.clear()
+        if ret is None:
+            if indent is None:
+                separators = SHORT_SEPARATORS if self.compact else LONG_SEPARATORS
+            else:
+                separators = INDENT_SEPARATORS
+            ret = json.dumps(
+                data, cls=self.encoder_class, default=default,
+                indent=indent, ensure_ascii=self.ensure_ascii,
+                allow_nan=not self.strict, separators=separators,
+            ).encode()
+
+        # same escaping as DRF: keep the output a strict JavaScript subset
+        if b"\xe2\x80" in ret:
+            ret = ret.replace("\u2028".encode(), b"\\u2028").replace("\u2029".encode(), b"\\u2029")
+        for i, fragment in enumerate(fragments):
+            ret = ret.replace(f'"\\u0000{nonce[0]}:{i}\\u0000"'.encode(), fragment, 1)
+        return ret
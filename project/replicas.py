@@ -0,0 +1,196 @@
+"""
+Read-replica routing.
+
+Views opt in with `read_replica = True`. For a safe (GET/HEAD/OPTIONS)
+request to such a view, ReplicaRoutingMiddleware picks one replica from
+settings.DATABASE_REPLICAS and ReplicaRouter sends the request's reads of
+catalog models (settings.REPLICA_APPS) there. Everything else stays on
+"default":
+
+- writes, and every read after a write in the same request;
+- any request from a client that wrote recently: a request that writes (or
+  uses an unsafe method) sets a short-lived cookie, and while it is present
+  the client reads its own writes from the primary;
+- replicas lagging more than REPLICA_MAX_LAG_SECONDS, or unreachable. Lag is
+  measured per replica at most every REPLICA_LAG_CHECK_INTERVAL seconds:
+  pg_last_xact_replay_timestamp() on Postgres, and for SQLite replicas (file
+  copies, see `manage.py refresh_sqlite_replicas`) how long the primary file
+  has been modified past the copy.
+
+One replica serves the whole request, so its COUNT and page queries see the
+same snapshot. Results read from a replica may predate writes the primary
+already committed, so they must not be cached under the generation counters
+those writes bumped; check serving_from_replica() before caching.
+"""
+import logging
+import os
+import random
+import threading
+import time
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, DatabaseError, connections
+
+logger = logging.getLogger(__name__)
+
+SAFE_METHODS = ("GET", "HEAD", "OPTIONS")
+STICKY_COOKIE = "db_primary_until"
+
+POSTGRES_LAG_SQL = (
+    "SELECT CASE WHEN NOT pg_is_in_recovery() OR pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() "
+    "THEN 0 ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp()) END"
+)
+
+
+class RoutingState:
+    """Per-request routing decision, shared by the middleware and the router."""
+
+    def __init__(self):
+        self.replica = None  # alias reads go to, None for the primary
+        self.wrote = False
+
+
+_state = ContextVar("replica_routing", default=None)
+
+
+def serving_from_replica():
+    """True while the current request's reads go to a replica."""
+    state = _state.get()
+    return state is not None and state.replica is not None and not state.wrote
+
+
+def measure_lag(alias):
+    """Seconds `alias` is behind the primary; raises DatabaseError/OSError when unreachable."""
+    connection = connections[alias]
+    if connection.vendor == "postgresql":
+        with connection.cursor() as cursor:
+            cursor.execute(POSTGRES_LAG_SQL)
+            return float(cursor.fetchone()[0] or 0)
+    if connection.vendor == "sqlite":
+        return sqlite_copy_lag(connections[DEFAULT_DB_ALIAS].settings_dict["NAME"], connection.settings_dict["NAME"])
+    return 0.0
+
+
+def sqlite_copy_lag(primary, replica):
+    """
+    Lag of a file copy of a SQLite database: 0 while the primary hasn't been
+    written since the copy, else the time since the copy (what it misses).
+    """
+    primary, replica = str(primary), str(replica)
+    if replica == primary:  # e.g. a test mirror
+        return 0.0
+    copied_at = os.stat(replica).st_mtime
+    if os.stat(primary).st_mtime <= copied_at:
+        return 0.0
+    return time.time() - copied_at
+
+
+class ReplicaSet:
+    """Replicas fit to serve reads, with their lag cached per process."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._lag = {}  # alias -> (lag seconds or None if unreachable, measured at)
+
+    def lag(self, alias):
+        now = time.monotonic()
+        cached = self._lag.get(alias)
+        if cached is not None and now - cached[1] < settings.REPLICA_LAG_CHECK_INTERVAL:
+            return cached[0]
+        try:
+            lag = measure_lag(alias)
+        except (DatabaseError, OSError) as exc:
+            logger.warning("Replica %s unavailable: %s", alias, exc)
+            lag = None
+        with self._lock:
+            self._lag[alias] = (lag, now)
+        return lag
+
+    def choose(self):
+        """A random replica within REPLICA_MAX_LAG_SECONDS, or None for the primary."""
+        fresh = []
+        for alias in settings.DATABASE_REPLICAS:
+            lag = self.lag(alias)
+            if lag is not None and lag <= settings.REPLICA_MAX_LAG_SECONDS:
+                fresh.append(alias)
+        return random.choice(fresh) if fresh else None
+
+    def reset(self):
+        with self._lock:
+            self._lag.clear()
+
+
+replica_set = ReplicaSet()
+
+
+class ReplicaRouter:
+    def db_for_read(self, model, **hints):
+        state = _state.get()
+        if state is None or state.replica is None or state.wrote:
+            return None
+        if model._meta.app_label not in settings.REPLICA_APPS:
+            return None
+        return state.replica
+
+    def db_for_write(self, model, **hints):
+        state = _state.get()
+        if state is not None:
+            # read-your-writes for the rest of the request
+            state.wrote = True
+        # explicit: an instance read from a replica is still saved to the primary
+        return DEFAULT_DB_ALIAS
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # replicas hold the primary's rows
+        databases = {DEFAULT_DB_ALIAS, *settings.DATABASE_REPLICAS}
+        if obj1._state.db in databases and obj2._state.db in databases:
+            return True
+        return None
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
+
+
+class ReplicaRoutingMiddleware:
+    """Routes the reads of `read_replica` views to a replica; see the module docstring."""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        state = RoutingState()
+        token = _state.set(state)
+        try:
+            response = self.get_response(request)
+        finally:
+            _state.reset(token)
+        if state.wrote or request.method not in SAFE_METHODS:
+            sticky = settings.REPLICA_STICKY_SECONDS
+            response.set_cookie(
+                STICKY_COOKIE, str(int(time.time() + sticky)), max_age=sticky, httponly=True, samesite="Lax"
+            )
+        if state.replica is not None:
+            response["X-Database"] = "replica"
+        return response
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if not settings.DATABASE_REPLICAS or request.method not in SAFE_METHODS:
+            return None
+        if not getattr(getattr(view_func, "view_class", None), "read_replica", False):
+            return None
+        if self.wrote_recently(request):
+            return None
+        state = _state.get()
+        if state is not None:
+            state.replica = replica_set.choose()
+        return None
+
+    @staticmethod
+    def wrote_recently(request):
+        try:
+            return float(request.COOKIES[STICKY_COOKIE]) > time.time()
+        except (KeyError, ValueError):
+            return False
@@ -27,6 +27,9 @@ INSTALLED_APPS = [
 
 
 MIDDLEWARE = [
+    # first, so its timings cover the whole stack
+    "project.perf.PerformanceMiddleware",
+    "project.replicas.ReplicaRoutingMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "django.middleware.common.CommonMiddleware",
@@ -64,6 +67,36 @@ DATABASES = {
     }
 }
 
+# Postgres when configured through the environment (docker-compose, benchmarks)
+if os.getenv("POSTGRES_DB"):
+    DATABASES["default"] = {
+        "ENGINE": "django.db.backends.postgresql",
+        "NAME": os.getenv("POSTGRES_DB"),
+        "USER": os.getenv("POSTGRES_USER", "aforro"),
+        "PASSWORD": os.getenv("POSTGRES_PASSWORD", "aforro"),
+        "HOST": os.getenv("POSTGRES_HOST", "localhost"),
+        "PORT": os.getenv("POSTGRES_PORT", "5432"),
+    }
+
+# Read replicas (project/replicas.py): comma-separated SQLite files, or
+# Postgres host[:port]s that otherwise share the default's settings. Views
+# with `read_replica = True` read catalog data from one of them, unless the
+# client wrote within REPLICA_STICKY_SECONDS or the replica lags too far.
+for i, target in enumerate([t.strip() for t in os.getenv("DATABASE_REPLICAS", "").split(",") if t.strip()], 1):
+    replica = {**DATABASES["default"], "TEST": {"MIRROR": "default"}}
+    if replica["ENGINE"].endswith("sqlite3"):
+        replica["NAME"] = target
+    else:
+        host, _, port = target.partition(":")
+        replica.update(HOST=host, PORT=port or replica["PORT"])
+    DATABASES[f"replica{i}"] = replica
+DATABASE_REPLICAS = [alias for alias in DATABASES if alias != "default"]
+DATABASE_ROUTERS = ["project.replicas.ReplicaRouter"]
+REPLICA_APPS = ("products", "stores", "search")  # models read from replicas
+REPLICA_STICKY_SECONDS = int(os.getenv("REPLICA_STICKY_SECONDS", "5"))  # primary reads after a write
+REPLICA_MAX_LAG_SECONDS = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "2"))
+REPLICA_LAG_CHECK_INTERVAL = 1  # seconds a replica's measured lag is reused
+
 AUTH_PASSWORD_VALIDATORS = []
 
 LANGUAGE_CODE = "en-us"
@@ -77,14 +110,107 @@ DEFAULT_AUTO_FIELD = "django.db.models.BigAutoField"
 REST_FRAMEWORK = {
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 20,
+    "DEFAULT_RENDERER_CLASSES": [
+        "project.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
+    # per-scope limits of SlidingWindowRateThrottle (apps/search/throttling.py)
+    "DEFAULT_THROTTLE_RATES": {
+        "suggest": os.getenv("SUGGEST_RATE_LIMIT", "20/min"),
+    },
 }
 
+# JSON encoder behind FastJSONRenderer: "auto" (orjson when installed),
+# "orjson" or "stdlib"
+JSON_RENDERER_BACKEND = os.getenv("JSON_RENDERER_BACKEND", "auto")
+
 # Redis (rate limiting + Celery)
 REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
 
+# Shared Redis client (project/redis_client.py): bounded pool, timeouts and a
+# circuit breaker so a slow or dead Redis can't stall requests
+REDIS_MAX_CONNECTIONS = int(os.getenv("REDIS_MAX_CONNECTIONS", "50"))
+REDIS_POOL_TIMEOUT = 0.5  # seconds to wait for a free pooled connection
+REDIS_CONNECT_TIMEOUT = float(os.getenv("REDIS_CONNECT_TIMEOUT", "0.25"))
+REDIS_SOCKET_TIMEOUT = float(os.getenv("REDIS_SOCKET_TIMEOUT", "0.5"))
+REDIS_BREAKER_FAILURES = 5  # consecutive errors before Redis is skipped
+REDIS_BREAKER_COOLDOWN = 10  # seconds Redis is skipped before a probe
+
 CELERY_BROKER_URL = os.getenv("CELERY_BROKER_URL", REDIS_URL)
 CELERY_RESULT_BACKEND = os.getenv("CELERY_RESULT_BACKEND", "redis://localhost:6379/1")
+# Celery keeps its own pools; give them the same timeouts
+CELERY_BROKER_TRANSPORT_OPTIONS = {
+    "socket_connect_timeout": REDIS_CONNECT_TIMEOUT,
+    "socket_timeout": REDIS_SOCKET_TIMEOUT,
+}
+CELERY_REDIS_SOCKET_CONNECT_TIMEOUT = REDIS_CONNECT_TIMEOUT
+CELERY_REDIS_SOCKET_TIMEOUT = REDIS_SOCKET_TIMEOUT
+CELERY_REDIS_MAX_CONNECTIONS = REDIS_MAX_CONNECTIONS
+CELERY_BEAT_SCHEDULE = {
+    # publish confirmation emails recorded in the order outbox
+    "dispatch-order-outbox": {
+        "task": "apps.orders.tasks.dispatch_order_outbox",
+        "schedule": 1.0,
+    },
+}
+
+# Request profiling (project/perf.py): Server-Timing headers, /metrics/ and
+# per-view query budgets ("off", "warn" or "raise"; tests use "raise")
+PERF_INSTRUMENTATION = os.getenv("PERF_INSTRUMENTATION", "true") == "true"
+PERF_SERVER_TIMING = os.getenv("PERF_SERVER_TIMING", "true") == "true"
+PERF_QUERY_BUDGETS = os.getenv("PERF_QUERY_BUDGETS", "warn")
+PERF_DUPLICATE_QUERY_THRESHOLD = 5  # repeats of one statement logged as a possible N+1
+
+# Serialize hot list endpoints through compiled values_list() projections
+# (project/fastserializers.py) instead of DRF's per-field machinery
+FAST_SERIALIZERS = os.getenv("FAST_SERIALIZERS", "true") == "true"
+
+# Product search backend: "auto" (Postgres full-text / SQLite FTS5 depending
+# on the database), "postgres", "fts5" or "icontains" (substring match)
+SEARCH_BACKEND = os.getenv("SEARCH_BACKEND", "auto")
+SEARCH_TEXT_CONFIG = "english"  # Postgres text search configuration
+
+# Product search result cache: Redis shared tier + short-lived local tier,
+# invalidated through catalog/category/store generation counters
+SEARCH_CACHE_ENABLED = os.getenv("SEARCH_CACHE_ENABLED", "true") == "true"
+SEARCH_CACHE_TTL = int(os.getenv("SEARCH_CACHE_TTL", "300"))  # seconds in Redis
+SEARCH_CACHE_LOCAL_TTL = 5  # seconds in-process; bounds staleness across processes
+SEARCH_CACHE_LOCAL_MAX_ENTRIES = 2000
+
+# Upper edges of the ?facets=price buckets; the last bucket is open-ended
+SEARCH_PRICE_BUCKETS = (50, 100, 250, 500, 1000)
+
+# Per-store availability read model (apps/stores/availability.py): store
+# inventory listings and store-scoped searches read it instead of joining
+# Inventory, Product and Category. Run `manage.py rebuild_availability` after
+# turning it on; it is only kept in sync while on.
+AVAILABILITY_READ_MODEL = os.getenv("AVAILABILITY_READ_MODEL", "false") == "true"
+
+# Autocomplete: "index" (in-process SuggestionIndex) or "database"
+SUGGEST_BACKEND = os.getenv("SUGGEST_BACKEND", "index")
+SUGGEST_INDEX_MAX_OVERLAY = 5000  # pending changes before a background rebuild
+SUGGEST_INDEX_MAX_AGE = 300  # seconds; picks up writes made by other processes
+
+# Order placement engine: "locking" (SELECT ... FOR UPDATE, set-based) or
+# "conditional" (guarded UPDATE ... WHERE quantity >= n, no explicit locks)
+ORDER_PLACEMENT_ENGINE = os.getenv("ORDER_PLACEMENT_ENGINE", "locking")
+
+# Order intake: "direct" (one transaction per request) or "batched"
+# (in-process queue, micro-batches placed in one transaction)
+ORDER_INTAKE_MODE = os.getenv("ORDER_INTAKE_MODE", "direct")
+ORDER_BATCH_MAX_SIZE = int(os.getenv("ORDER_BATCH_MAX_SIZE", "64"))
+ORDER_BATCH_MAX_WAIT_MS = float(os.getenv("ORDER_BATCH_MAX_WAIT_MS", "5"))
+ORDER_BATCH_RESULT_TIMEOUT = 30  # seconds a request waits for its batch
+
+# Idempotency-Key support on order creation
+IDEMPOTENCY_TTL = int(os.getenv("IDEMPOTENCY_TTL", str(24 * 60 * 60)))  # seconds
+IDEMPOTENCY_LOCAL_MAX_ENTRIES = 10_000  # in-process fallback when Redis is down
+IDEMPOTENCY_WAIT_TIMEOUT = 10  # seconds a duplicate waits for the first request
+# seconds an in-flight (PENDING) claim lives if the request never completes or releases it
+IDEMPOTENCY_LOCK_TTL = IDEMPOTENCY_WAIT_TIMEOUT + ORDER_BATCH_RESULT_TIMEOUT
 
 # Email – console for dev
 EMAIL_BACKEND = "django.core.mail.backends.console.EmailBackend"
 DEFAULT_FROM_EMAIL = "no-reply@example.com"
+# orders per send_order_confirmations_batch task (one mail connection each)
+ORDER_CONFIRMATION_EMAIL_BATCH_SIZE = 100
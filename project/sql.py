@@ -0,0 +1,12 @@
+"""Helpers for hand-written SQL."""
+
+# values per IN (...) list; keeps every statement well below SQLite's bound-parameter limit
+IN_LIST_SIZE = 1000
+
+
+def in_lists(values, size=IN_LIST_SIZE):
+    """(placeholders, chunk) per `size` values: "%s, %s, ..." for an IN (...) list, and its values."""
+    values = list(values)
+    for start in range(0, len(values), size):
+        chunk = values[start:start + size]
+        yield ", ".join(["%s"] * len(chunk)), chunk
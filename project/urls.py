@@ -1,9 +1,14 @@
 from django.contrib import admin
 from django.urls import path, include
 
+from project.health import HealthView
+from project.metrics import MetricsView
+
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("orders/", include("apps.orders.urls")),
     path("stores/", include("apps.stores.urls")),
     path("api/search/", include("apps.search.urls")),
+    path("health/", HealthView.as_view(), name="health"),
+    path("metrics/", MetricsView.as_view(), name="metrics"),
 ]
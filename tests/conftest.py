@@ -9,8 +9,57 @@ os.environ.setdefault("DJANGO_SETTINGS_MODULE", "project.settings")
 # Initialize Django (so REST_FRAMEWORK & INSTALLED_APPS are loaded)
 django.setup()
 
+from project.celery import app as celery_app  # noqa: E402
+
+# Run Celery tasks inline so tests never wait on a broker connection.
+celery_app.conf.task_always_eager = True
+
 
 @pytest.fixture(autouse=True)
 def enable_db_access_for_all_tests(db):
     # gives all tests DB access by default
     pass
+
+
+@pytest.fixture(autouse=True)
+def enforce_query_budgets(settings):
+    # fail any request that runs over its view's query_budget
+    settings.PERF_QUERY_BUDGETS = "raise"
+
+
+@pytest.fixture(autouse=True)
+def reset_suggestion_index():
+    # the index is process-wide; never let one test see another's products
+    from apps.search.suggest import suggestion_index
+
+    suggestion_index.reset()
+    yield
+    suggestion_index.reset()
+
+
+@pytest.fixture(autouse=True)
+def reset_search_cache():
+    from apps.search.cache import search_cache
+
+    search_cache.reset()
+    yield
+    search_cache.reset()
+
+
+@pytest.fixture(autouse=True)
+def fake_redis(monkeypatch):
+    # the shared client talks to an in-memory Redis (with Lua); no server needed
+    import fakeredis
+    import redis
+    from project.redis_client import redis_client
+    from apps.search import throttling
+
+    pool = redis.BlockingConnectionPool(
+        connection_class=fakeredis.FakeConnection, server=fakeredis.FakeServer(), max_connections=10
+    )
+    monkeypatch.setattr(redis_client, "connection_pool", pool)
+    redis_client.breaker.reset()
+    throttling.local_buckets.clear()
+    yield redis_client
+    redis_client.breaker.reset()
+    pool.disconnect()
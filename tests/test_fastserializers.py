@@ -0,0 +1,106 @@
+import pytest
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.orders.models import Order
+from apps.orders.serializers import OrderSerializer
+from apps.products.models import Category, Product
+from apps.search.views import MultiStoreProductSearchSerializer
+from apps.stores.models import Store, Inventory
+from project.fastserializers import get_compiled_serializer
+
+
+@pytest.fixture
+def catalog():
+    phones = Category.objects.create(name="Phones")
+    audio = Category.objects.create(name="Äudio & more")
+    store = Store.objects.create(name="S1")
+    products = [
+        Product.objects.create(title="iPhone 15", description="Apple phone", price="999.99", category=phones),
+        Product.objects.create(title="Pixel 8", description=None, price=699, category=phones),
+        Product.objects.create(title="Earbuds “Pro”", description="", price="49.50", category=audio),
+        Product.objects.create(title="Cable", description="USB-C", price="0.10", category=audio),
+    ]
+    for product, qty in zip(products, [5, 0, 12]):
+        Inventory.objects.create(store=store, product=product, quantity=qty)
+    client = APIClient()
+    for basket in ([products[0], products[2]], [products[1]], [products[2]]):
+        client.post(
+            reverse("order-create"),
+            {"store_id": store.id, "items": [{"product_id": p.id, "quantity_requested": 1} for p in basket]},
+            format="json",
+        )
+    return store
+
+
+def both_paths(settings, url, params=None):
+    """Raw response bodies with the compiled serializers on and off."""
+    settings.SEARCH_CACHE_ENABLED = False
+    client = APIClient()
+    bodies = []
+    for fast in (True, False):
+        settings.FAST_SERIALIZERS = fast
+        resp = client.get(url, params or {})
+        assert resp.status_code == 200
+        bodies.append(resp.content)
+    return bodies
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize(
+    "params",
+    [
+        {},
+        {"q": "phone", "sort": "relevance"},
+        {"store_id": "STORE", "sort": "price"},
+        {"store_id": "STORE", "in_stock": "true", "sort": "newest"},
+        {"paginate": "cursor", "page_size": 2, "sort": "price"},
+        {"category": "CATEGORY", "facets": "category,price"},
+    ],
+)
+def test_product_search_parity(settings, catalog, params):
+    category = Category.objects.get(name="Phones")
+    params = {
+        k: catalog.id if v == "STORE" else category.id if v == "CATEGORY" else v for k, v in params.items()
+    }
+    fast, drf = both_paths(settings, reverse("product-search"), params)
+    assert fast == drf
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [{}, {"paginate": "cursor", "page_size": 2}])
+def test_store_inventory_parity(settings, catalog, params):
+    fast, drf = both_paths(settings, reverse("store-inventory", args=[catalog.id]), params)
+    assert fast == drf
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("params", [{}, {"paginate": "cursor", "page_size": 2}])
+def test_store_orders_parity(settings, catalog, params):
+    fast, drf = both_paths(settings, reverse("store-orders", args=[catalog.id]), params)
+    assert fast == drf
+    assert b'"items":[{' in fast
+
+
+@pytest.mark.django_db
+def test_compiled_order_serializer_matches_drf(catalog):
+    compiled = get_compiled_serializer(OrderSerializer)
+    orders = Order.objects.order_by("id")
+    expected = OrderSerializer(orders.prefetch_related("items__product"), many=True).data
+    assert JSONRenderer().render(compiled.serialize(compiled.project(orders))) == JSONRenderer().render(expected)
+
+
+def test_method_fields_fall_back_to_drf():
+    assert get_compiled_serializer(MultiStoreProductSearchSerializer) is None
+
+
+def test_hot_serializers_compile():
+    from apps.orders.serializers import OrderItemSerializer, StoreOrderSerializer
+    from apps.search.views import ProductSearchSerializer
+    from apps.stores.serializers import InventoryListSerializer
+
+    for serializer_class in (
+        ProductSearchSerializer, InventoryListSerializer, OrderSerializer, OrderItemSerializer, StoreOrderSerializer,
+    ):
+        assert get_compiled_serializer(serializer_class) is not None, serializer_class.__name__
@@ -45,3 +45,452 @@ def test_order_confirmed_on_sufficient_stock_and_stock_deducted():
 
     inv = Inventory.objects.get(store=store, product=product)
     assert inv.quantity == 7
+
+
+def _post_basket(client, store, products, qty=1):
+    url = reverse("order-create")
+    payload = {
+        "store_id": store.id,
+        "items": [{"product_id": p.id, "quantity_requested": qty} for p in products],
+    }
+    return client.post(url, payload, format="json")
+
+
+@pytest.mark.django_db
+def test_order_query_count_independent_of_basket_size():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client = APIClient()
+    store = Store.objects.create(name="S3")
+    cat = Category.objects.create(name="Cat3")
+    products = [
+        Product.objects.create(title=f"P{i}", price=10, category=cat) for i in range(50)
+    ]
+    Inventory.objects.bulk_create(
+        [Inventory(store=store, product=p, quantity=10) for p in products]
+    )
+
+    with CaptureQueriesContext(connection) as small:
+        resp = _post_basket(client, store, products[:1])
+    assert resp.data["status"] == "CONFIRMED"
+
+    with CaptureQueriesContext(connection) as large:
+        resp = _post_basket(client, store, products)
+    assert resp.data["status"] == "CONFIRMED"
+    assert len(resp.data["items"]) == 50
+
+    assert len(large.captured_queries) == len(small.captured_queries)
+    assert Inventory.objects.get(store=store, product=products[0]).quantity == 8
+    assert Inventory.objects.get(store=store, product=products[-1]).quantity == 9
+
+
+@pytest.mark.django_db
+def test_order_duplicate_lines_checked_against_total_quantity():
+    client = APIClient()
+    store = Store.objects.create(name="S4")
+    cat = Category.objects.create(name="Cat4")
+    product = Product.objects.create(title="P4", price=100, category=cat)
+    Inventory.objects.create(store=store, product=product, quantity=5)
+
+    resp = _post_basket(client, store, [product, product], qty=3)
+    assert resp.data["status"] == "REJECTED"
+    assert Inventory.objects.get(store=store, product=product).quantity == 5
+
+    resp = _post_basket(client, store, [product, product], qty=2)
+    assert resp.data["status"] == "CONFIRMED"
+    assert Inventory.objects.get(store=store, product=product).quantity == 1
+
+
+@pytest.mark.django_db
+def test_conditional_engine_confirms_and_deducts(settings):
+    from apps.orders.models import Order
+    from apps.orders.services import place_order
+
+    settings.ORDER_PLACEMENT_ENGINE = "conditional"
+    store = Store.objects.create(name="S5")
+    cat = Category.objects.create(name="Cat5")
+    p1 = Product.objects.create(title="P5a", price=10, category=cat)
+    p2 = Product.objects.create(title="P5b", price=10, category=cat)
+    Inventory.objects.create(store=store, product=p1, quantity=4)
+    Inventory.objects.create(store=store, product=p2, quantity=4)
+
+    order = place_order(
+        store,
+        [
+            {"product_id": p1.id, "quantity_requested": 3},
+            {"product_id": p2.id, "quantity_requested": 4},
+        ],
+    )
+    assert order.status == Order.STATUS_CONFIRMED
+    assert Inventory.objects.get(store=store, product=p1).quantity == 1
+    assert Inventory.objects.get(store=store, product=p2).quantity == 0
+
+
+@pytest.mark.django_db
+def test_conditional_engine_rolls_back_partial_basket(settings):
+    from apps.orders.models import Order
+    from apps.orders.services import place_order
+
+    settings.ORDER_PLACEMENT_ENGINE = "conditional"
+    store = Store.objects.create(name="S6")
+    cat = Category.objects.create(name="Cat6")
+    p1 = Product.objects.create(title="P6a", price=10, category=cat)
+    p2 = Product.objects.create(title="P6b", price=10, category=cat)
+    p3 = Product.objects.create(title="P6c", price=10, category=cat)
+    Inventory.objects.create(store=store, product=p1, quantity=4)
+    Inventory.objects.create(store=store, product=p2, quantity=1)
+
+    order = place_order(
+        store,
+        [
+            {"product_id": p1.id, "quantity_requested": 2},
+            {"product_id": p2.id, "quantity_requested": 2},
+        ],
+    )
+    assert order.status == Order.STATUS_REJECTED
+    assert order.items.count() == 2
+    assert Inventory.objects.get(store=store, product=p1).quantity == 4
+
+    # no inventory row at all for p3
+    order = place_order(store, [{"product_id": p3.id, "quantity_requested": 1}])
+    assert order.status == Order.STATUS_REJECTED
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("read_model", [False, True])
+def test_conditional_engine_view_stays_within_its_query_budget(settings, read_model):
+    # PERF_QUERY_BUDGETS="raise" (conftest): over budget would fail the request
+    settings.ORDER_PLACEMENT_ENGINE = "conditional"
+    settings.AVAILABILITY_READ_MODEL = read_model
+    client = APIClient()
+    store = Store.objects.create(name="S12")
+    cat = Category.objects.create(name="Cat12")
+    products = [Product.objects.create(title=f"P{i}", price=10, category=cat) for i in range(30)]
+    Inventory.objects.bulk_create([Inventory(store=store, product=p, quantity=10) for p in products])
+
+    resp = _post_basket(client, store, products)
+    assert resp.status_code == 201 and resp.data["status"] == "CONFIRMED"
+    assert Inventory.objects.get(store=store, product=products[-1]).quantity == 9
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batched_intake_places_each_order_independently(settings):
+    from concurrent.futures import ThreadPoolExecutor
+    from django.db import connection
+    from apps.orders.models import Order
+    from apps.orders.intake import intake_queue
+
+    settings.ORDER_BATCH_MAX_WAIT_MS = 50
+    store = Store.objects.create(name="S7")
+    cat = Category.objects.create(name="Cat7")
+    product = Product.objects.create(title="P7", price=10, category=cat)
+    Inventory.objects.create(store=store, product=product, quantity=5)
+    items = [{"product_id": product.id, "quantity_requested": 1}]
+    before = intake_queue.stats()["batch_size"]["count"]
+
+    def submit(_):
+        try:
+            return intake_queue.submit(store, items).status
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        statuses = list(pool.map(submit, range(8)))
+
+    assert statuses.count(Order.STATUS_CONFIRMED) == 5
+    assert statuses.count(Order.STATUS_REJECTED) == 3
+    assert Inventory.objects.get(store=store, product=product).quantity == 0
+
+    stats = intake_queue.stats()
+    # 8 orders went through in fewer transactions than orders
+    assert 0 < stats["batch_size"]["count"] - before < 8
+    assert stats["latency_seconds"]["count"] >= 8
+
+
+@pytest.mark.django_db(transaction=True)
+def test_batched_intake_view_rejects_and_reports_unknown_product(settings):
+    settings.ORDER_INTAKE_MODE = "batched"
+    client = APIClient()
+    store = Store.objects.create(name="S8")
+    cat = Category.objects.create(name="Cat8")
+    product = Product.objects.create(title="P8", price=10, category=cat)
+    Inventory.objects.create(store=store, product=product, quantity=1)
+
+    resp = _post_basket(client, store, [product], qty=2)
+    assert resp.status_code == 201
+    assert resp.data["status"] == "REJECTED"
+    assert len(resp.data["items"]) == 1
+
+    url = reverse("order-create")
+    payload = {"store_id": store.id, "items": [{"product_id": 999999, "quantity_requested": 1}]}
+    assert client.post(url, payload, format="json").status_code == 404
+
+    assert client.get(reverse("order-intake-stats")).data["batch_size"]["count"] >= 2
+
+
+@pytest.mark.django_db
+def test_batched_intake_timeout_withdraws_the_order(settings, monkeypatch):
+    from apps.orders.models import Order
+    from apps.orders.intake import OrderIntakeQueue
+
+    settings.ORDER_INTAKE_MODE = "batched"
+    settings.ORDER_BATCH_RESULT_TIMEOUT = 0.01
+    queue = OrderIntakeQueue()
+    monkeypatch.setattr(queue, "_ensure_worker", lambda: None)  # nothing drains the queue
+    monkeypatch.setattr("apps.orders.views.intake_queue", queue)
+    store = Store.objects.create(name="S11")
+    cat = Category.objects.create(name="Cat11")
+    product = Product.objects.create(title="P11", price=10, category=cat)
+    Inventory.objects.create(store=store, product=product, quantity=5)
+
+    resp = _post_basket(APIClient(), store, [product], qty=1)
+    assert resp.status_code == 503
+
+    # the worker reaching the withdrawn order later skips it
+    queue._place_batch([queue._queue.get_nowait()])
+    assert not Order.objects.filter(store=store).exists()
+    assert Inventory.objects.get(store=store, product=product).quantity == 5
+
+
+@pytest.mark.django_db
+def test_idempotency_key_replays_stored_response():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from apps.orders.models import Order
+
+    client = APIClient()
+    store = Store.objects.create(name="S9")
+    cat = Category.objects.create(name="Cat9")
+    product = Product.objects.create(title="P9", price=10, category=cat)
+    Inventory.objects.create(store=store, product=product, quantity=10)
+
+    url = reverse("order-create")
+    payload = {"store_id": store.id, "items": [{"product_id": product.id, "quantity_requested": 3}]}
+    headers = {"HTTP_IDEMPOTENCY_KEY": "retry-test-1"}
+
+    first = client.post(url, payload, format="json", **headers)
+    assert first.status_code == 201
+
+    with CaptureQueriesContext(connection) as ctx:
+        second = client.post(url, payload, format="json", **headers)
+    assert second.status_code == 201
+    assert second.json() == first.json()
+    assert len(ctx.captured_queries) == 0
+
+    assert Order.objects.filter(store=store).count() == 1
+    assert Inventory.objects.get(store=store, product=product).quantity == 7
+
+    # same key, different body
+    payload["items"][0]["quantity_requested"] = 1
+    assert client.post(url, payload, format="json", **headers).status_code == 422
+
+
+@pytest.mark.django_db(transaction=True)
+def test_idempotency_key_concurrent_duplicates_wait_for_first():
+    from concurrent.futures import ThreadPoolExecutor
+    from django.db import connection
+    from apps.orders.models import Order
+
+    store = Store.objects.create(name="S10")
+    cat = Category.objects.create(name="Cat10")
+    product = Product.objects.create(title="P10", price=10, category=cat)
+    Inventory.objects.create(store=store, product=product, quantity=10)
+
+    url = reverse("order-create")
+    payload = {"store_id": store.id, "items": [{"product_id": product.id, "quantity_requested": 2}]}
+
+    def post(_):
+        try:
+            resp = APIClient().post(
+                url, payload, format="json", HTTP_IDEMPOTENCY_KEY="retry-test-2"
+            )
+            return resp.status_code, resp.json()["id"]
+        finally:
+            connection.close()
+
+    with ThreadPoolExecutor(max_workers=4) as pool:
+        results = list(pool.map(post, range(4)))
+
+    assert {code for code, _ in results} == {201}
+    assert len({order_id for _, order_id in results}) == 1
+    assert Order.objects.filter(store=store).count() == 1
+    assert Inventory.objects.get(store=store, product=product).quantity == 8
+
+
+def test_idempotency_pending_claim_expires_with_the_lock_ttl(settings, fake_redis):
+    from apps.orders.idempotency import idempotency_store
+
+    key = idempotency_store.key("orders", "retry-test-3")
+    assert idempotency_store.begin(key, "fp") is None
+    # a request that dies here blocks retries only until the lock expires
+    assert 0 < fake_redis.ttl(key) <= settings.IDEMPOTENCY_LOCK_TTL < settings.IDEMPOTENCY_TTL
+
+    idempotency_store.complete(key, "fp", 201, {"id": 1})
+    assert fake_redis.ttl(key) > settings.IDEMPOTENCY_LOCK_TTL
+
+
+@pytest.mark.django_db
+def test_confirmed_order_writes_outbox_and_dispatcher_sends_email():
+    from django.core import mail
+    from apps.orders.models import OutboxMessage
+    from apps.orders.outbox import dispatch_pending
+
+    client = APIClient()
+    store = Store.objects.create(name="S11")
+    cat = Category.objects.create(name="Cat11")
+    product = Product.objects.create(title="P11", price=10, category=cat)
+    Inventory.objects.create(store=store, product=product, quantity=3)
+
+    confirmed = _post_basket(client, store, [product], qty=2)
+    _post_basket(client, store, [product], qty=2)  # rejected, no email
+
+    pending = OutboxMessage.objects.filter(status=OutboxMessage.STATUS_PENDING)
+    assert [m.payload["order_id"] for m in pending] == [confirmed.data["id"]]
+    assert mail.outbox == []
+
+    assert dispatch_pending() == 1
+    assert dispatch_pending() == 0
+    msg = OutboxMessage.objects.get()
+    assert msg.status == OutboxMessage.STATUS_SENT
+    assert msg.sent_at is not None
+    assert len(mail.outbox) == 1
+
+
+@pytest.mark.django_db
+def test_outbox_keeps_messages_pending_when_broker_fails(monkeypatch):
+    from apps.orders import outbox
+    from apps.orders.models import Order, OutboxMessage
+
+    store = Store.objects.create(name="S12")
+    order = Order.objects.create(store=store, status=Order.STATUS_CONFIRMED)
+    outbox.enqueue_order_confirmation(order)
+
+    def broken(messages):
+        raise ConnectionError("broker down")
+
+    monkeypatch.setitem(outbox.PUBLISHERS, OutboxMessage.TOPIC_ORDER_CONFIRMATION, broken)
+    with pytest.raises(ConnectionError):
+        outbox.dispatch_pending()
+
+    msg = OutboxMessage.objects.get()
+    assert msg.status == OutboxMessage.STATUS_PENDING
+    assert msg.attempts == 1
+
+
+@pytest.mark.django_db
+def test_confirmation_batch_task_uses_one_query_and_reports_failures():
+    from django.core import mail
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from apps.orders.models import Order, OrderItem
+    from apps.orders.tasks import send_order_confirmations_batch
+
+    store = Store.objects.create(name="S13")
+    cat = Category.objects.create(name="Cat13")
+    product = Product.objects.create(title="P13", price=10, category=cat)
+    orders = []
+    for _ in range(5):
+        order = Order.objects.create(store=store, status=Order.STATUS_CONFIRMED)
+        OrderItem.objects.create(order=order, product=product, quantity_requested=2)
+        orders.append(order)
+
+    ids = [o.id for o in orders] + [999999]
+    with CaptureQueriesContext(connection) as ctx:
+        result = send_order_confirmations_batch(ids)
+
+    assert len(ctx.captured_queries) == 1
+    assert result["sent"] == [o.id for o in orders]
+    assert result["failed"] == {999999: "order not found"}
+    assert len(mail.outbox) == 5
+    assert "P13 x 2" in mail.outbox[0].body
+
+
+def _seed_store_orders(n):
+    from apps.orders.models import Order, OrderItem
+
+    store = Store.objects.create(name=f"Orders-{n}")
+    cat = Category.objects.get_or_create(name="OrderListCat")[0]
+    p1 = Product.objects.create(title="LP1", price=10, category=cat)
+    p2 = Product.objects.create(title="LP2", price=10, category=cat)
+    for i in range(n):
+        order = Order.objects.create(store=store, status=Order.STATUS_CONFIRMED)
+        OrderItem.objects.create(order=order, product=p1, quantity_requested=1)
+        if i % 2:
+            OrderItem.objects.create(order=order, product=p2, quantity_requested=2)
+    return store
+
+
+@pytest.mark.django_db
+def test_store_order_list_total_items_and_constant_query_count():
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    client = APIClient()
+    small = _seed_store_orders(2)
+    large = _seed_store_orders(20)
+
+    with CaptureQueriesContext(connection) as ctx_small:
+        resp = client.get(reverse("store-orders", args=[small.id]))
+    with CaptureQueriesContext(connection) as ctx_large:
+        resp = client.get(reverse("store-orders", args=[large.id]))
+
+    assert len(ctx_small.captured_queries) == len(ctx_large.captured_queries)
+    assert resp.data["count"] == 20
+    for row in resp.data["results"]:
+        assert row["total_items"] == len(row["items"])
+
+
+@pytest.mark.django_db
+def test_store_order_list_cursor_pagination_walks_all_orders():
+    from apps.orders.models import Order
+
+    client = APIClient()
+    store = _seed_store_orders(7)
+    expected = list(
+        Order.objects.filter(store=store).order_by("-created_at", "-id").values_list("id", flat=True)
+    )
+
+    seen = []
+    resp = client.get(reverse("store-orders", args=[store.id]), {"paginate": "cursor", "page_size": 3})
+    while True:
+        assert resp.status_code == 200
+        assert "count" not in resp.data
+        seen.extend(row["id"] for row in resp.data["results"])
+        if not resp.data["next"]:
+            break
+        resp = client.get(resp.data["next"])
+
+    assert seen == expected
+    assert client.get(reverse("store-orders", args=[store.id]), {"cursor": "garbage"}).status_code == 404
+
+
+@pytest.mark.django_db
+def test_store_order_export_one_row_per_item():
+    import json
+
+    client = APIClient()
+    store = Store.objects.create(name="S1")
+    cat = Category.objects.create(name="C")
+    p1 = Product.objects.create(title="P1", price=10, category=cat)
+    p2 = Product.objects.create(title="P2", price=10, category=cat)
+    Inventory.objects.create(store=store, product=p1, quantity=10)
+    Inventory.objects.create(store=store, product=p2, quantity=10)
+    order_ids = [
+        _post_basket(client, store, [p1, p2]).data["id"],
+        _post_basket(client, store, [p2], qty=3).data["id"],
+    ]
+
+    resp = client.get(reverse("store-orders-export", args=[store.id, "ndjson"]))
+    rows = [json.loads(line) for line in b"".join(resp.streaming_content).decode().splitlines()]
+    assert [(r["order_id"], r["product_title"], r["quantity_requested"]) for r in rows] == [
+        (order_ids[0], "P1", 1),
+        (order_ids[0], "P2", 1),
+        (order_ids[1], "P2", 3),
+    ]
+    assert rows[0]["status"] == "CONFIRMED" and "T" in rows[0]["created_at"]
+
+    resp = client.get(reverse("store-orders-export", args=[store.id, "csv"]))
+    lines = b"".join(resp.streaming_content).decode().splitlines()
+    assert lines[0] == "order_id,status,created_at,item_id,product_id,product_title,quantity_requested"
+    assert len(lines) == 4
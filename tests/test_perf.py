@@ -0,0 +1,100 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders.models import Order, OrderItem
+from apps.products.models import Category, Product
+from apps.search.views import ProductSearchView
+from apps.stores.models import Store, Inventory
+from project.metrics import request_metrics
+from project.perf import QueryBudgetExceeded, RequestProfile
+
+
+@pytest.fixture(autouse=True)
+def reset_request_metrics():
+    request_metrics.reset()
+    yield
+    request_metrics.reset()
+
+
+def seed(n):
+    cats = [Category.objects.create(name=f"Cat {i}") for i in range(3)]
+    stores = [Store.objects.create(name=f"S{i}") for i in range(2)]
+    products = [
+        Product.objects.create(title=f"Phone {i}", price=10 + i, category=cats[i % 3]) for i in range(n)
+    ]
+    for store in stores:
+        for i, product in enumerate(products):
+            Inventory.objects.create(store=store, product=product, quantity=i % 4)
+    for product in products:
+        order = Order.objects.create(store=stores[0], status=Order.STATUS_CONFIRMED)
+        OrderItem.objects.create(order=order, product=product, quantity_requested=1)
+        OrderItem.objects.create(order=order, product=products[0], quantity_requested=2)
+    return stores, products
+
+
+def test_profile_counts_duplicates_but_not_transaction_control():
+    profile = RequestProfile()
+    profile.record_query('SAVEPOINT "s1"', 0.001)
+    for _ in range(3):
+        profile.record_query("SELECT * FROM product WHERE id = %s", 0.002)
+    profile.record_query("SELECT COUNT(*) FROM product", 0.001)
+    assert profile.queries == 4
+    assert profile.duplicate_queries == 2
+    assert profile.db_seconds == pytest.approx(0.008)
+
+
+def test_server_timing_header_and_metrics_endpoint(settings):
+    settings.SEARCH_CACHE_ENABLED = False
+    seed(3)
+    client = APIClient()
+    response = client.get(reverse("product-search"), {"q": "phone"})
+
+    timing = response["Server-Timing"]
+    assert timing.startswith('db;dur=') and 'desc="2 queries"' in timing
+    assert "serialize;dur=" in timing and "render;dur=" in timing and "total;dur=" in timing
+
+    metrics = client.get(reverse("metrics"))
+    assert metrics["Content-Type"].startswith("text/plain; version=0.0.4")
+    body = metrics.content.decode()
+    assert 'http_requests_total{view="product-search",method="GET",status="200"} 1' in body
+    assert 'http_request_queries_bucket{view="product-search",method="GET",le="2"} 1' in body
+    assert 'http_response_size_bytes_total{view="product-search",method="GET"} %d' % len(response.content) in body
+
+
+def test_query_budget_is_enforced(settings, monkeypatch):
+    settings.SEARCH_CACHE_ENABLED = False
+    monkeypatch.setattr(ProductSearchView, "query_budget", 1)
+    seed(2)
+    with pytest.raises(QueryBudgetExceeded, match="product-search ran 2 queries, budget is 1"):
+        APIClient().get(reverse("product-search"))
+
+    settings.PERF_QUERY_BUDGETS = "warn"
+    assert APIClient().get(reverse("product-search")).status_code == 200
+    body = APIClient().get(reverse("metrics")).content.decode()
+    assert 'http_query_budget_exceeded_total{view="product-search",method="GET"} 2' in body
+
+
+@pytest.mark.parametrize("fast", [True, False])
+def test_list_endpoints_stay_within_budget_as_data_grows(settings, fast):
+    # budgets are enforced by the middleware (PERF_QUERY_BUDGETS=raise in tests)
+    settings.SEARCH_CACHE_ENABLED = False
+    settings.FAST_SERIALIZERS = fast
+    stores, products = seed(25)
+    client = APIClient()
+    store_ids = ",".join(str(s.id) for s in stores)
+    requests = [
+        (reverse("product-search"), {"store_id": store_ids, "facets": "category,price,in_stock"}),
+        (reverse("product-search"), {"store_id": stores[0].id, "paginate": "cursor", "sort": "price"}),
+        (reverse("store-inventory", args=[stores[0].id]), {}),
+        (reverse("store-orders", args=[stores[0].id]), {}),
+        (reverse("store-orders", args=[stores[0].id]), {"paginate": "cursor"}),
+    ]
+    for url, params in requests:
+        assert client.get(url, params).status_code == 200
+
+    big_order = {
+        "store_id": stores[1].id,
+        "items": [{"product_id": p.id, "quantity_requested": 1} for p in products[:20]],
+    }
+    assert client.post(reverse("order-create"), big_order, format="json").status_code == 201
@@ -0,0 +1,96 @@
+import io
+
+import pytest
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.products.models import Category, Product
+from apps.stores.models import Inventory, Store
+from project.explain import capture_plans, explain
+
+# a handful of rows, where a sequential scan is the right plan
+SMALL_TABLES = {Category._meta.db_table, Store._meta.db_table}
+
+
+def endpoint_requests():
+    inventory = Inventory.objects.filter(quantity__gt=0).order_by("store_id", "product_id").first()
+    store_id, product_id = inventory.store_id, inventory.product_id
+    category_id = Product.objects.values_list("category_id", flat=True).first()
+    search = reverse("product-search")
+    return [
+        ("get", search, {}),
+        ("get", search, {"sort": "price"}),
+        ("get", search, {"sort": "newest", "paginate": "cursor"}),
+        ("get", search, {"price_min": 100, "price_max": 200, "sort": "price"}),
+        ("get", search, {"category": category_id, "facets": "category,price"}),
+        ("get", search, {"q": "the", "sort": "relevance"}),
+        ("get", search, {"store_id": store_id, "in_stock": "true", "facets": "in_stock"}),
+        ("get", reverse("store-inventory", args=[store_id]), {}),
+        ("get", reverse("store-inventory", args=[store_id]), {"paginate": "cursor"}),
+        ("get", reverse("store-orders", args=[store_id]), {}),
+        ("get", reverse("store-orders", args=[store_id]), {"paginate": "cursor"}),
+        (
+            "post",
+            reverse("order-create"),
+            {"store_id": store_id, "items": [{"product_id": product_id, "quantity_requested": 1}]},
+        ),
+    ]
+
+
+def sequential_scans(client):
+    """{(method, url, params): tables read in full} over every endpoint request."""
+    found = {}
+    for method, url, data in endpoint_requests():
+        with capture_plans() as plans:
+            if method == "get":
+                response = client.get(url, data)
+            else:
+                response = client.post(url, data, format="json")
+        assert response.status_code < 400, (url, data, response.status_code)
+        assert plans, (url, data)
+        scans = {table for plan in plans for table in plan.seq_scans} - SMALL_TABLES
+        if scans:
+            found[(method, url, str(data))] = sorted(scans)
+    return found
+
+
+def test_endpoint_queries_use_indexes(settings):
+    settings.SEARCH_CACHE_ENABLED = False
+    call_command(
+        "seed_data", products=5000, stores=3, orders=5000, distribution="zipf", seed=1, stdout=io.StringIO()
+    )
+    with connection.cursor() as cursor:
+        cursor.execute("ANALYZE")  # plans as the planner would pick them with statistics
+    client = APIClient()
+    assert sequential_scans(client) == {}
+
+    # the in-stock search of one store reads the partial index, not the rows
+    store_id = Inventory.objects.filter(quantity__gt=0).values_list("store_id", flat=True).first()
+    with capture_plans() as plans:
+        client.get(reverse("product-search"), {"store_id": store_id, "in_stock": "true"})
+    assert all("inventory_in_stock_idx" in plan.text for plan in plans), [plan.text for plan in plans]
+
+    settings.AVAILABILITY_READ_MODEL = True
+    call_command("rebuild_availability", stdout=io.StringIO())
+    assert sequential_scans(client) == {}
+
+
+def test_explain_reports_sequential_scans():
+    plan = explain(f"SELECT * FROM {Product._meta.db_table} WHERE description = %s", ["x"])
+    assert plan.seq_scans == [Product._meta.db_table]
+    assert plan.text
+
+    plan = explain(f"SELECT * FROM {Product._meta.db_table} WHERE id = %s", [1])
+    assert plan.seq_scans == []
+
+
+def test_order_item_quantity_check_constraint():
+    from apps.orders.models import Order, OrderItem
+
+    store = Store.objects.create(name="S")
+    product = Product.objects.create(title="P", price=1, category=Category.objects.create(name="C"))
+    order = Order.objects.create(store=store)
+    with pytest.raises(IntegrityError), transaction.atomic():
+        OrderItem.objects.create(order=order, product=product, quantity_requested=0)
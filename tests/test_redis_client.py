@@ -0,0 +1,55 @@
+import pytest
+from django.urls import reverse
+from redis.exceptions import ConnectionError as RedisConnectionError
+from rest_framework.test import APIClient
+
+from project.redis_client import CircuitBreaker, CircuitOpen, build_pool, pool_stats
+
+
+def test_circuit_breaker_opens_after_repeated_failures(fake_redis, monkeypatch):
+    monkeypatch.setattr(fake_redis, "breaker", CircuitBreaker(failure_threshold=2, cooldown=60))
+    monkeypatch.setattr(fake_redis, "connection_pool", build_pool("redis://127.0.0.1:1/0"))
+
+    for _ in range(2):
+        with pytest.raises(RedisConnectionError):
+            fake_redis.get("k")
+    assert fake_redis.breaker.state == "open"
+    # skipped without touching the network, pipelines included
+    with pytest.raises(CircuitOpen):
+        fake_redis.get("k")
+    with pytest.raises(CircuitOpen), fake_redis.pipeline() as pipe:
+        pipe.incr("k").execute()
+    assert fake_redis.breaker.snapshot()["short_circuited"] == 2
+
+
+def test_circuit_breaker_closes_after_successful_probe(fake_redis):
+    breaker = fake_redis.breaker
+    for _ in range(breaker.failure_threshold):
+        breaker.record_failure()
+    assert breaker.state == "open"
+    breaker._opened_at -= breaker.cooldown  # cooldown elapsed
+    assert breaker.state == "half_open"
+    assert fake_redis.set("k", "v")
+    assert breaker.state == "closed"
+    assert breaker.snapshot()["trips"] == 1
+
+
+def test_pool_stats_and_health_endpoint(fake_redis):
+    fake_redis.ping()
+    stats = pool_stats()
+    assert stats["max_connections"] == 10
+    assert stats["created"] >= 1 and stats["in_use"] == 0
+
+    resp = APIClient().get(reverse("health"))
+    assert resp.status_code == 200
+    assert resp.data["status"] == "ok"
+    assert resp.data["redis"]["status"] == "ok"
+    assert resp.data["redis"]["breaker"]["state"] == "closed"
+
+
+def test_health_reports_degraded_when_redis_is_down(fake_redis, monkeypatch):
+    monkeypatch.setattr(fake_redis, "connection_pool", build_pool("redis://127.0.0.1:1/0"))
+    resp = APIClient().get(reverse("health"))
+    assert resp.status_code == 200
+    assert resp.data["status"] == "degraded"
+    assert resp.data["redis"]["status"] == "unavailable"
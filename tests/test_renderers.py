@@ -0,0 +1,79 @@
+import datetime
+import decimal
+import uuid
+
+import pytest
+from django.urls import reverse
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APIClient
+
+from apps.products.models import Category, Product
+from project import renderers
+from project.renderers import FastJSONRenderer, RawJSON
+
+PAYLOAD = {
+    "results": [
+        {
+            "id": 1,
+            "title": "Earbuds “Pro” Äudio",
+            "price": decimal.Decimal("49.50"),
+            "created_at": datetime.datetime(2024, 5, 1, 12, 30, 15, 123456, tzinfo=datetime.timezone.utc),
+            "day": datetime.date(2024, 5, 1),
+            "uuid": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+            "notes": "line\u2028separator\u2029",
+            "tags": ("a", "b"),
+            "empty": None,
+            "flag": True,
+            "ratio": 0.1,
+        }
+    ],
+    "count": 2**70,
+    "next": None,
+}
+
+BACKENDS = ["stdlib"] + (["orjson"] if renderers.orjson is not None else [])
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+@pytest.mark.parametrize("media_type", ["application/json", "application/json; indent=2"])
+def test_same_bytes_as_drf(settings, backend, media_type):
+    settings.JSON_RENDERER_BACKEND = backend
+    expected = JSONRenderer().render(PAYLOAD, media_type)
+    assert FastJSONRenderer().render(PAYLOAD, media_type) == expected
+
+
+@pytest.mark.parametrize("backend", BACKENDS)
+def test_raw_json_is_spliced_verbatim(settings, backend):
+    settings.JSON_RENDERER_BACKEND = backend
+    data = {"facets": RawJSON(b'{"price":{"min":"1.00"}}'), "list": [RawJSON("[1,2]"), RawJSON("[]")]}
+    assert FastJSONRenderer().render(data) == b'{"facets":{"price":{"min":"1.00"}},"list":[[1,2],[]]}'
+
+
+def test_orjson_backend_requires_orjson(settings, monkeypatch):
+    settings.JSON_RENDERER_BACKEND = "orjson"
+    monkeypatch.setattr(renderers, "orjson", None)
+    with pytest.raises(RuntimeError):
+        FastJSONRenderer().render({"a": 1})
+
+
+@pytest.mark.django_db
+def test_cached_facets_and_suggestions_render_unchanged(settings):
+    settings.SEARCH_CACHE_ENABLED = True
+    settings.SUGGEST_BACKEND = "index"
+    cat = Category.objects.create(name="Phones")
+    Product.objects.create(title="iPhone 15", price="999.99", category=cat)
+    Product.objects.create(title="iPhone “Mini”", price=10, category=cat)
+    client = APIClient()
+
+    url = reverse("product-search")
+    params = {"q": "iphone", "facets": "category,price"}
+    first = client.get(url, params)
+    # a different page shares the facets cache entry but not the page's
+    second = client.get(url, {**params, "page_size": 1})
+    assert second["X-Search-Cache"] == "miss"
+    assert second.json()["facets"] == first.json()["facets"]
+
+    suggest_url = reverse("product-suggest")
+    fresh = client.get(suggest_url, {"q": "iph"}).content
+    assert client.get(suggest_url, {"q": "iph"}).content == fresh
+    assert JSONRenderer().render({"suggestions": ["iPhone 15", "iPhone “Mini”"]}) == fresh
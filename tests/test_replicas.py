@@ -0,0 +1,142 @@
+import os
+import time
+
+import pytest
+from django.db import OperationalError, router
+from django.http import HttpResponse
+from django.test import RequestFactory
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders.models import Order
+from apps.orders.views import OrderCreateView
+from apps.products.models import Category, Product
+from apps.search.cache import search_cache
+from apps.search.views import ProductSearchView, ProductSuggestView
+from apps.stores.models import Inventory, Store
+from apps.stores.views import StoreInventoryListView
+from project import replicas
+from project.replicas import STICKY_COOKIE, ReplicaRoutingMiddleware, replica_set, sqlite_copy_lag
+
+
+@pytest.fixture
+def replica(settings, monkeypatch):
+    """One configured replica, lag 0 unless a test says otherwise; no real queries are sent to it."""
+    settings.DATABASE_REPLICAS = ["replica1"]
+    lag = {"replica1": 0.0}
+
+    def measure(alias):
+        if isinstance(lag[alias], Exception):
+            raise lag[alias]
+        return lag[alias]
+
+    monkeypatch.setattr(replicas, "measure_lag", measure)
+    replica_set.reset()
+    yield lag
+    replica_set.reset()
+
+
+def route(view_class, method="get", cookies=None, write=False):
+    """Run a request through the middleware; returns (alias reads went to, response)."""
+    request = getattr(RequestFactory(), method)("/")
+    request.COOKIES.update(cookies or {})
+    seen = {}
+
+    def get_response(request):
+        middleware.process_view(request, view_class.as_view(), (), {})
+        seen["before"] = router.db_for_read(Product)
+        if write:
+            router.db_for_write(Order)
+            seen["after"] = router.db_for_read(Product)
+        return HttpResponse()
+
+    middleware = ReplicaRoutingMiddleware(get_response)
+    response = middleware(request)
+    return seen, response
+
+
+def test_catalog_reads_of_opted_in_views_go_to_the_replica(replica):
+    for view_class in (ProductSearchView, ProductSuggestView, StoreInventoryListView):
+        seen, response = route(view_class)
+        assert seen["before"] == "replica1"
+        assert response["X-Database"] == "replica"
+        assert STICKY_COOKIE not in response.cookies
+
+    # not opted in, or not a safe method
+    assert route(OrderCreateView)[0]["before"] == "default"
+    assert route(ProductSearchView, method="post")[0]["before"] == "default"
+    # outside a request nothing is routed
+    assert router.db_for_read(Product) == "default"
+
+
+def test_writes_stick_to_the_primary(replica):
+    seen, response = route(ProductSearchView, write=True)
+    assert seen == {"before": "replica1", "after": "default"}
+    assert router.db_for_write(Product) == "default"
+
+    _, response = route(OrderCreateView, method="post")
+    cookie = response.cookies[STICKY_COOKIE]
+    assert float(cookie.value) > time.time()
+
+    # the same client reads its own writes until the cookie expires
+    assert route(ProductSearchView, cookies={STICKY_COOKIE: cookie.value})[0]["before"] == "default"
+    assert route(ProductSearchView, cookies={STICKY_COOKIE: str(time.time() - 1)})[0]["before"] == "replica1"
+
+
+def test_lagging_or_unreachable_replicas_fall_back_to_the_primary(replica, settings):
+    replica["replica1"] = settings.REPLICA_MAX_LAG_SECONDS + 1
+    seen, response = route(ProductSearchView)
+    assert seen["before"] == "default" and "X-Database" not in response
+
+    # the measurement is reused for REPLICA_LAG_CHECK_INTERVAL
+    replica["replica1"] = 0.0
+    assert route(ProductSearchView)[0]["before"] == "default"
+    settings.REPLICA_LAG_CHECK_INTERVAL = 0
+    assert route(ProductSearchView)[0]["before"] == "replica1"
+
+    replica["replica1"] = OperationalError("unable to open database file")
+    assert route(ProductSearchView)[0]["before"] == "default"
+
+
+def test_replica_served_searches_are_not_cached(replica, monkeypatch, django_capture_on_commit_callbacks):
+    # the test database stands in for an up-to-date replica
+    monkeypatch.setattr(replica_set, "choose", lambda: "default")
+    client = APIClient()
+    with django_capture_on_commit_callbacks(execute=True):
+        phone = Product.objects.create(title="iPhone 15", price=1000, category=Category.objects.create(name="P"))
+        store = Store.objects.create(name="S1")
+        inventory = Inventory.objects.create(store=store, product=phone, quantity=5)
+
+    # the stock change bumps the store's generation; a lagging replica may
+    # still return 5, which must not be cached under the new generation
+    with django_capture_on_commit_callbacks(execute=True):
+        inventory.quantity = 4
+        inventory.save()
+    params = {"q": "iphone", "store_id": store.id, "facets": "in_stock"}
+    for _ in range(2):
+        response = client.get(reverse("product-search"), params)
+        assert response["X-Database"] == "replica"
+        assert response["X-Search-Cache"] == "miss"
+    assert search_cache.snapshot()["local_entries"] == 0
+
+    # served by the primary, the result is cached as before
+    monkeypatch.setattr(replica_set, "choose", lambda: None)
+    assert client.get(reverse("product-search"), params)["X-Search-Cache"] == "miss"
+    assert client.get(reverse("product-search"), params)["X-Search-Cache"] == "hit"
+
+
+def test_sqlite_copy_lag(tmp_path):
+    primary, copy = tmp_path / "db.sqlite3", tmp_path / "replica.sqlite3"
+    primary.write_bytes(b"x")
+    copy.write_bytes(b"x")
+    now = time.time()
+    os.utime(primary, (now - 10, now - 10))
+    os.utime(copy, (now - 5, now - 5))
+    assert sqlite_copy_lag(primary, copy) == 0.0
+
+    # written after the copy was taken
+    os.utime(primary, (now, now))
+    assert 4 < sqlite_copy_lag(primary, copy) < 10
+    assert sqlite_copy_lag(primary, primary) == 0.0
+    with pytest.raises(OSError):
+        sqlite_copy_lag(primary, tmp_path / "missing.sqlite3")
@@ -17,3 +17,411 @@ def test_product_search_basic():
     assert resp.status_code == 200
     assert resp.data["count"] == 1
     assert resp.data["results"][0]["title"].startswith("iPhone")
+
+
+def _walk_cursor(client, url, params):
+    seen = []
+    resp = client.get(url, {**params, "paginate": "cursor"})
+    while True:
+        assert resp.status_code == 200
+        assert "count" not in resp.data
+        seen.extend(row["id"] for row in resp.data["results"])
+        if not resp.data["next"]:
+            return seen
+        resp = client.get(resp.data["next"])
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("sort", ["title", "price", "newest", "relevance"])
+def test_product_search_cursor_mode_matches_page_mode(sort):
+    client = APIClient()
+    cat = Category.objects.create(name="Phones")
+    for i in range(9):
+        # repeated prices and titles exercise the id tie-breaker
+        Product.objects.create(
+            title=f"Phone {i % 3}",
+            description="phone case" if i % 2 else "",
+            price=100 + (i % 2),
+            category=cat,
+        )
+
+    url = reverse("product-search")
+    params = {"q": "phone", "sort": sort, "page_size": 4}
+    paged = []
+    for page in (1, 2, 3):
+        paged.extend(row["id"] for row in client.get(url, {**params, "page": page}).data["results"])
+
+    assert _walk_cursor(client, url, params) == paged
+    assert len(paged) == 9
+
+
+@pytest.mark.django_db
+def test_cursor_with_tampered_values_is_rejected():
+    import base64
+    import json
+
+    from apps.stores.models import Store
+
+    def cursor(ordering, values):
+        payload = json.dumps({"o": ordering, "v": values}).encode()
+        return base64.urlsafe_b64encode(payload).decode().rstrip("=")
+
+    client = APIClient()
+    Product.objects.create(title="Lamp", price=10, category=Category.objects.create(name="Home"))
+    store = Store.objects.create(name="S")
+    search, orders = reverse("product-search"), reverse("store-orders", args=[store.id])
+
+    for url, params in [
+        (search, {"sort": "price", "cursor": cursor(["price", "id"], ["abc", 1])}),
+        (search, {"sort": "price", "cursor": cursor(["price", "id"], [10, {"x": 1}])}),
+        (search, {"q": "lamp", "sort": "relevance", "cursor": cursor(["-relevance", "title", "id"], ["x", "a", 1])}),
+        (orders, {"cursor": cursor(["-created_at", "-id"], ["nope", 1])}),
+        (orders, {"cursor": cursor(["-created_at", "-id"], ["2024-01-01T00:00:00+00:00", "one"])}),
+    ]:
+        assert client.get(url, params).status_code == 404, params
+
+    # untampered values of the same shape still work
+    assert client.get(search, {"sort": "price", "cursor": cursor(["price", "id"], ["5.00", 0])}).status_code == 200
+    valid = cursor(["-created_at", "-id"], ["2024-01-01T00:00:00+00:00", 1])
+    assert client.get(orders, {"cursor": valid}).status_code == 200
+
+
+@pytest.mark.django_db
+def test_product_search_cursor_mode_estimated_count():
+    client = APIClient()
+    cat = Category.objects.create(name="Books")
+    for i in range(5):
+        Product.objects.create(title=f"Book {i}", price=10, category=cat)
+
+    resp = client.get(
+        reverse("product-search"),
+        {"paginate": "cursor", "page_size": 2, "estimate_count": "true"},
+    )
+    assert resp.data["estimated_count"] == 5
+    assert resp.data["page_size"] == 2
+    assert len(resp.data["results"]) == 2
+
+
+@pytest.mark.django_db
+def test_full_text_search_prefix_ranking_and_index_sync():
+    from apps.search.backends import get_search_backend
+
+    client = APIClient()
+    url = reverse("product-search")
+    phones = Category.objects.create(name="Phones")
+    acc = Category.objects.create(name="Accessories")
+    in_title = Product.objects.create(title="Galaxy Charger", price=10, category=acc)
+    in_desc = Product.objects.create(
+        title="Wall plug", description="Fast charger for phones", price=5, category=acc
+    )
+    Product.objects.create(title="Pixel 9", price=700, category=phones)
+
+    if get_search_backend().name == "icontains":
+        pytest.skip("full-text backend not available on this database")
+
+    resp = client.get(url, {"q": "charg", "sort": "relevance"})
+    assert [r["id"] for r in resp.data["results"]] == [in_title.id, in_desc.id]
+
+    # index follows product updates and deletes
+    in_title.title = "Galaxy Cable"
+    in_title.save()
+    resp = client.get(url, {"q": "charger"})
+    assert [r["id"] for r in resp.data["results"]] == [in_desc.id]
+
+    in_desc.delete()
+    assert client.get(url, {"q": "charger"}).data["count"] == 0
+
+    # and category renames
+    phones.name = "Smartphones"
+    phones.save()
+    assert client.get(url, {"q": "smartphones"}).data["count"] == 1
+
+
+SUGGEST_TITLES = [
+    "iPhone 15", "iPhone 15 Pro", "iphone case", "Apple iPhone Charger", "Samsung TV",
+    "Old iPhone", "IPHONE cable", "Phone stand", "Smart phone holder", "iPad Air",
+]
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("q", ["iph", "iphone", "PHONE", "phone s", "pro", "xyz", "ipa"])
+def test_suggest_index_matches_database_path(settings, q):
+    client = APIClient()
+    cat = Category.objects.create(name="Phones")
+    for title in SUGGEST_TITLES:
+        Product.objects.create(title=title, price=10, category=cat)
+    url = reverse("product-suggest")
+
+    settings.SUGGEST_BACKEND = "database"
+    expected = client.get(url, {"q": q}).json()["suggestions"]
+    settings.SUGGEST_BACKEND = "index"
+    assert client.get(url, {"q": q}).json()["suggestions"] == expected
+
+
+def test_suggest_index_precomputed_answers_match_a_full_scan():
+    import random
+
+    from apps.search.suggest import SuggestionIndex
+
+    rng = random.Random(5)
+    words = ["Apple", "apple", "Samsung", "sam", "Phone", "phone", "ab", "Ba", "cab", "x", "Stand-up"]
+    titles = {
+        pid: " ".join(rng.choice(words) for _ in range(rng.randint(1, 4))) + f" {rng.randint(0, 50)}"
+        for pid in range(2000)
+    }
+    index = SuggestionIndex(titles.items())
+
+    def reference(q, limit=10):
+        ordered = [title for title, _ in sorted((t, pid) for pid, t in titles.items())]
+        prefix = [t for t in ordered if t.lower().startswith(q)]
+        return (prefix + [t for t in ordered if q in t.lower() and not t.lower().startswith(q)])[:limit]
+
+    queries = ["", "a", "s", "sa", "sam", "samsung a", "p", "ph", "hone", "one 1", "b", "-", "zz", "qqq", " 4"]
+    for q in queries:
+        assert index.suggest(q) == reference(q), q
+    # hiding many entries pushes the precomputed answers below a page
+    for pid in range(0, 2000, 3):
+        index.remove(pid)
+        del titles[pid]
+    for q in queries:
+        assert index.suggest(q) == reference(q), q
+
+
+@pytest.mark.django_db
+def test_suggest_index_follows_product_changes(django_capture_on_commit_callbacks):
+    from apps.search.suggest import suggestion_index
+
+    cat = Category.objects.create(name="Phones")
+    old = Product.objects.create(title="Pixel 8", price=10, category=cat)
+    index = suggestion_index.get()
+    assert index.suggest("pix") == ["Pixel 8"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        Product.objects.create(title="Pixel 9", price=10, category=cat)
+        old.title = "Google Pixel 8"
+        old.save()
+    assert index.suggest("pix") == ["Pixel 9", "Google Pixel 8"]
+
+    with django_capture_on_commit_callbacks(execute=True):
+        old.delete()
+    assert index.suggest("pix") == ["Pixel 9"]
+
+    # a rebuild yields the same answer as the patched index
+    assert suggestion_index.rebuild().suggest("pix") == ["Pixel 9"]
+
+
+@pytest.mark.django_db
+def test_search_cache_hits_and_per_store_invalidation(django_capture_on_commit_callbacks):
+    from apps.stores.models import Store, Inventory
+    from apps.stores.signals import inventory_changed
+
+    client = APIClient()
+    url = reverse("product-search")
+    cat = Category.objects.create(name="Phones")
+    with django_capture_on_commit_callbacks(execute=True):
+        phone = Product.objects.create(title="iPhone 15", price=1000, category=cat)
+        s1 = Store.objects.create(name="S1")
+        s2 = Store.objects.create(name="S2")
+        inv1 = Inventory.objects.create(store=s1, product=phone, quantity=5)
+        Inventory.objects.create(store=s2, product=phone, quantity=7)
+
+    def get(params):
+        resp = client.get(url, params)
+        assert resp.status_code == 200
+        return resp["X-Search-Cache"], resp.json()
+
+    assert get({"q": "iphone", "store_id": s1.id})[0] == "miss"
+    # equivalent query after normalization
+    state, body = get({"q": "  IPhone ", "store_id": s1.id, "price_min": ""})
+    assert state == "hit" and body["results"][0]["quantity"] == 5
+    assert get({"q": "iphone", "store_id": s2.id})[0] == "miss"
+
+    # stock change in store 1 leaves store 2's entry alone
+    with django_capture_on_commit_callbacks(execute=True):
+        inv1.quantity = 4
+        inv1.save()
+    state, body = get({"q": "iphone", "store_id": s1.id})
+    assert state == "miss" and body["results"][0]["quantity"] == 4
+    assert get({"q": "iphone", "store_id": s2.id})[0] == "hit"
+
+    # bulk updates announce themselves through inventory_changed
+    Inventory.objects.filter(store=s2).update(quantity=1)
+    inventory_changed.send(sender=Inventory, store_id=s2.id, product_ids=[phone.id])
+    state, body = get({"q": "iphone", "store_id": s2.id})
+    assert state == "miss" and body["results"][0]["quantity"] == 1
+
+    # product edits invalidate catalog-wide entries
+    with django_capture_on_commit_callbacks(execute=True):
+        phone.title = "iPhone 15 Pro"
+        phone.save()
+    state, body = get({"q": "iphone", "store_id": s2.id})
+    assert state == "miss" and body["results"][0]["title"] == "iPhone 15 Pro"
+
+    stats = client.get(reverse("search-cache-stats")).data
+    assert stats["local_hits"] + stats["redis_hits"] == 2
+    assert stats["misses"] == 5
+
+
+@pytest.mark.django_db
+def test_search_cache_moving_product_invalidates_old_category(django_capture_on_commit_callbacks):
+    client = APIClient()
+    url = reverse("product-search")
+    with django_capture_on_commit_callbacks(execute=True):
+        phones = Category.objects.create(name="Phones")
+        tablets = Category.objects.create(name="Tablets")
+        ipad = Product.objects.create(title="iPad", price=500, category=phones)
+    assert client.get(url, {"category": phones.id}).json()["count"] == 1
+
+    ipad = Product.objects.get(id=ipad.id)
+    with django_capture_on_commit_callbacks(execute=True):
+        ipad.category = tablets
+        ipad.save()
+    resp = client.get(url, {"category": phones.id})
+    assert resp["X-Search-Cache"] == "miss"
+    assert resp.json()["count"] == 0
+
+
+@pytest.mark.django_db
+def test_search_multi_store_quantities():
+    from apps.stores.models import Store, Inventory
+
+    client = APIClient()
+    url = reverse("product-search")
+    cat = Category.objects.create(name="Phones")
+    a = Product.objects.create(title="Phone A", price=10, category=cat)
+    b = Product.objects.create(title="Phone B", price=10, category=cat)
+    c = Product.objects.create(title="Phone C", price=10, category=cat)
+    s1, s2, s3 = (Store.objects.create(name=f"S{i}") for i in range(3))
+    Inventory.objects.create(store=s1, product=a, quantity=3)
+    Inventory.objects.create(store=s2, product=a, quantity=0)
+    Inventory.objects.create(store=s2, product=b, quantity=2)
+    Inventory.objects.create(store=s1, product=c, quantity=0)
+
+    store_ids = f"{s1.id},{s2.id},{s3.id}"
+    rows = client.get(url, {"store_id": store_ids}).data["results"]
+    assert [(r["title"], r["quantity"], r["quantities"]) for r in rows] == [
+        ("Phone A", 3, {str(s1.id): 3, str(s2.id): 0, str(s3.id): None}),
+        ("Phone B", 2, {str(s1.id): None, str(s2.id): 2, str(s3.id): None}),
+        ("Phone C", 0, {str(s1.id): 0, str(s2.id): None, str(s3.id): None}),
+    ]
+
+    rows = client.get(url, {"store_id": store_ids, "in_stock": "true"}).data["results"]
+    assert [r["title"] for r in rows] == ["Phone A", "Phone B"]
+
+    # single store keeps the original shape
+    rows = client.get(url, {"store_id": s2.id, "in_stock": "true"}).data["results"]
+    assert [(r["title"], r["quantity"]) for r in rows] == [("Phone B", 2)]
+    assert "quantities" not in rows[0]
+
+    assert client.get(url, {"store_id": "1,x"}).status_code == 400
+
+
+@pytest.mark.django_db
+def test_search_store_stock_plan_uses_inventory_index():
+    from django.db import connection
+    from apps.search.views import annotate_store_stock
+
+    qs = annotate_store_stock(Product.objects.select_related("category"), [1], in_stock=True)
+    plan = qs.order_by("title", "id").explain()
+    sql = str(qs.query)
+
+    # one join on the inventory table, no per-row subquery
+    assert sql.count('"stores_inventory"') == 1
+    assert "SELECT" not in sql.split("FROM", 1)[1]
+    if connection.vendor == "sqlite":
+        # driven from the store's stocked rows, read from the partial index alone
+        first = plan.splitlines()[0]
+        assert "SEARCH store_stock USING COVERING INDEX inventory_in_stock_idx" in first
+        assert "CORRELATED" not in plan
+    elif connection.vendor == "postgresql":
+        assert "SubPlan" not in plan
+
+
+@pytest.mark.django_db
+def test_search_reads_stock_from_availability_read_model(settings):
+    import io
+
+    from django.core.management import call_command
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+    from apps.stores.models import Store, Inventory
+
+    settings.SEARCH_CACHE_ENABLED = False
+    client = APIClient()
+    url = reverse("product-search")
+    phones = Category.objects.create(name="Phones")
+    cables = Category.objects.create(name="Cables")
+    s1, s2 = Store.objects.create(name="S1"), Store.objects.create(name="S2")
+    for title, cat, stock in [
+        ("Phone A", phones, {s1: 3, s2: 0}),
+        ("Phone B", phones, {s2: 2}),
+        ("Cable", cables, {s1: 0}),
+        ("Cable XL", cables, {}),
+    ]:
+        product = Product.objects.create(title=title, price=10, category=cat)
+        for store, qty in stock.items():
+            Inventory.objects.create(store=store, product=product, quantity=qty)
+
+    queries = [
+        {"store_id": s1.id},
+        {"store_id": s1.id, "in_stock": "true"},
+        {"store_id": s2.id, "in_stock": "true", "facets": "category,in_stock"},
+        {"store_id": f"{s1.id},{s2.id}", "in_stock": "true"},
+    ]
+    expected = [client.get(url, params).json() for params in queries]
+
+    settings.AVAILABILITY_READ_MODEL = True
+    call_command("rebuild_availability", stdout=io.StringIO())
+    assert [client.get(url, params).json() for params in queries] == expected
+
+    with CaptureQueriesContext(connection) as ctx:
+        client.get(url, {"store_id": s1.id, "in_stock": "true"})
+    page_sql = ctx.captured_queries[-1]["sql"]
+    assert "stores_storeproductavailability" in page_sql
+    assert "stores_inventory" not in page_sql and "products_category" not in page_sql
+
+
+@pytest.mark.django_db
+def test_search_facets_single_query(django_assert_num_queries):
+    from apps.stores.models import Store, Inventory
+
+    client = APIClient()
+    url = reverse("product-search")
+    phones = Category.objects.create(name="Phones")
+    cables = Category.objects.create(name="Cables")
+    store = Store.objects.create(name="S1")
+    for title, price, cat, qty in [
+        ("Phone A", 40, phones, 1),
+        ("Phone B", 600, phones, 0),
+        ("Phone C", 1500, phones, None),
+        ("Cable", 10, cables, 3),
+    ]:
+        product = Product.objects.create(title=title, price=price, category=cat)
+        if qty is not None:
+            Inventory.objects.create(store=store, product=product, quantity=qty)
+
+    params = {"store_id": store.id, "facets": "category,price,in_stock", "page_size": 2}
+    with django_assert_num_queries(3):  # facets + COUNT + page
+        data = client.get(url, params).json()
+    assert len(data["results"]) == 2
+    facets = data["facets"]
+    assert facets["category"] == [
+        {"id": cables.id, "name": "Cables", "count": 1},
+        {"id": phones.id, "name": "Phones", "count": 3},
+    ]
+    assert [(b["label"], b["count"]) for b in facets["price"]] == [
+        ("0-50", 2), ("50-100", 0), ("100-250", 0), ("250-500", 0), ("500-1000", 1), ("1000+", 1),
+    ]
+    assert facets["in_stock"] == {"in_stock": 2, "out_of_stock": 2}
+
+    # facets follow the same filters as the results, in both pagination modes
+    data = client.get(url, {"category": phones.id, "price_min": 100, "facets": "category", "paginate": "cursor"}).json()
+    assert data["facets"]["category"] == [{"id": phones.id, "name": "Phones", "count": 2}]
+    assert client.get(url, {"facets": "in_stock"}).json()["facets"] == {"in_stock": None}
+
+    # another page reuses the cached facets: only COUNT + page
+    with django_assert_num_queries(2):
+        client.get(url, {**params, "page": 2})
+
+    assert client.get(url, {"facets": "brand"}).status_code == 400
+    assert "facets" not in client.get(url).json()
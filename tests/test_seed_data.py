@@ -0,0 +1,57 @@
+import io
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import Count
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.orders.management.commands.seed_data import Command
+from apps.orders.models import Order, OrderItem
+from apps.products.models import Product
+from apps.search.backends import index_tables
+from apps.stores.models import Store, Inventory
+
+
+def seed(**options):
+    call_command("seed_data", stdout=io.StringIO(), **options)
+
+
+def test_seed_data_sizes_and_search_index():
+    seed(products=300, stores=4, orders=120, seed=7, chunk_size=100)
+    assert Product.objects.count() == 300
+    assert Store.objects.count() == 4
+    assert Order.objects.count() == 120
+    assert OrderItem.objects.count() >= 120
+    # 40% of the catalog per store by default
+    assert set(Inventory.objects.values_list("store").annotate(n=Count("id")).values_list("n", flat=True)) == {120}
+
+    word = Product.objects.first().title.split()[0]
+    response = APIClient().get(reverse("product-search"), {"q": word})
+    assert response.json()["count"] > 0
+
+    # clearing empties the full-text index with the rest, not via rebuild()
+    Command().clear()
+    with connection.cursor() as cursor:
+        for table in index_tables():
+            cursor.execute(f"SELECT COUNT(*) FROM {table}")
+            assert cursor.fetchone()[0] == 0
+
+
+def test_seed_data_is_reproducible():
+    seed(products=50, stores=2, orders=10, seed=3)
+    first = list(Product.objects.order_by("id").values_list("title", "price", "category__name"))
+    seed(products=50, stores=2, orders=10, seed=3)
+    assert list(Product.objects.order_by("id").values_list("title", "price", "category__name")) == first
+
+
+def test_zipf_distribution_concentrates_orders_and_stock():
+    seed(products=2000, stores=5, orders=1000, seed=11, distribution="zipf")
+    lines = OrderItem.objects.values("product").annotate(n=Count("id")).order_by("-n")
+    top = sum(row["n"] for row in lines[:20])
+    assert top > OrderItem.objects.count() * 0.3  # 1% of the products, a third of the lines
+    per_store = list(Order.objects.values("store").annotate(n=Count("id")).order_by("-n").values_list("n", flat=True))
+    assert per_store[0] > 2 * per_store[-1]
+    stocked = Inventory.objects.values("product").annotate(n=Count("id"))
+    assert stocked.filter(n=5).exists() and stocked.filter(n=1).exists()
+    assert abs(Inventory.objects.count() - 5 * 2000 * 0.4) < 5 * 2000 * 0.05
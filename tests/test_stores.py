@@ -0,0 +1,304 @@
+import pytest
+from django.urls import reverse
+from rest_framework.test import APIClient
+
+from apps.stores.models import Store, Inventory
+from apps.products.models import Product, Category
+
+
+@pytest.mark.django_db
+def test_store_inventory_cursor_pagination():
+    client = APIClient()
+    store = Store.objects.create(name="S1")
+    cat = Category.objects.create(name="Cat1")
+    for i in range(5):
+        product = Product.objects.create(title=f"Item {i % 2}", price=10 + i, category=cat)
+        Inventory.objects.create(store=store, product=product, quantity=i)
+
+    url = reverse("store-inventory", args=[store.id])
+    expected = [row["id"] for row in client.get(url).data["results"]]
+
+    seen = []
+    resp = client.get(url, {"paginate": "cursor", "page_size": 2})
+    while True:
+        assert "count" not in resp.data
+        seen.extend(row["id"] for row in resp.data["results"])
+        if not resp.data["next"]:
+            break
+        resp = client.get(resp.data["next"])
+
+    assert seen == expected
+    assert len(seen) == 5
+
+
+@pytest.mark.django_db
+def test_store_inventory_export_streams_ndjson_and_csv(django_assert_num_queries):
+    import csv
+    import io
+    import json
+
+    client = APIClient()
+    store = Store.objects.create(name="S1")
+    other = Store.objects.create(name="S2")
+    cat = Category.objects.create(name="Cat1")
+    products = [
+        Product.objects.create(title=f'Item "{i}", big', price=10 + i, category=cat) for i in range(3)
+    ]
+    for i, product in enumerate(products):
+        Inventory.objects.create(store=store, product=product, quantity=i)
+    Inventory.objects.create(store=other, product=products[0], quantity=99)
+
+    resp = client.get(reverse("store-inventory-export", args=[store.id, "ndjson"]))
+    assert resp.streaming
+    assert resp["Content-Type"] == "application/x-ndjson"
+    with django_assert_num_queries(1):  # no COUNT(*)
+        body = b"".join(resp.streaming_content)
+    rows = [json.loads(line) for line in body.decode().splitlines()]
+    assert [(r["product_id"], r["quantity"]) for r in rows] == [(p.id, i) for i, p in enumerate(products)]
+    assert rows[0]["price"] == "10.00" and rows[0]["category_name"] == "Cat1"
+
+    resp = client.get(reverse("store-inventory-export", args=[store.id, "csv"]))
+    assert resp["Content-Disposition"] == f'attachment; filename="store-{store.id}-inventory.csv"'
+    table = list(csv.reader(io.StringIO(b"".join(resp.streaming_content).decode())))
+    assert table[0] == ["id", "product_id", "product_title", "price", "category_name", "quantity"]
+    assert [row[2] for row in table[1:]] == [p.title for p in products]
+
+    assert client.get(reverse("store-inventory-export", args=[store.id, "xml"])).status_code == 404
+
+
+def stocked_store(n=5):
+    store = Store.objects.create(name="POS")
+    cat = Category.objects.create(name="Feed")
+    products = [Product.objects.create(title=f"Feed {i}", price=1, category=cat) for i in range(n)]
+    Inventory.objects.create(store=store, product=products[0], quantity=10)
+    Inventory.objects.create(store=store, product=products[1], quantity=3)
+    return store, products
+
+
+def quantities(store):
+    return dict(Inventory.objects.filter(store=store).values_list("product_id", "quantity"))
+
+
+@pytest.mark.django_db
+def test_bulk_inventory_set_json_upserts_in_chunks(django_capture_on_commit_callbacks, monkeypatch):
+    from apps.stores.signals import inventory_changed
+    from apps.stores.views import StoreInventoryBulkView
+
+    store, products = stocked_store()
+    monkeypatch.setattr(StoreInventoryBulkView, "chunk_size", 2)
+    sent = []
+    inventory_changed.connect(lambda sender, **kw: sent.append(kw["product_ids"]), weak=False, dispatch_uid="t")
+    body = {
+        "mode": "set",
+        "updates": [
+            {"product_id": products[0].id, "quantity": 7},
+            {"product_id": products[2].id, "quantity": 4},
+            {"product_id": 999_999, "quantity": 1},
+            {"product_id": products[3].id, "quantity": -1},
+            {"product_id": products[1].id, "quantity": "x"},
+        ],
+    }
+    try:
+        with django_capture_on_commit_callbacks(execute=True):
+            resp = APIClient().post(reverse("store-inventory-bulk", args=[store.id]), body, format="json")
+    finally:
+        inventory_changed.disconnect(dispatch_uid="t")
+
+    assert resp.status_code == 200
+    assert resp.data["rows"] == 5 and resp.data["applied"] == 2 and resp.data["rejected"] == 3
+    assert {e["error"] for e in resp.data["errors"]} == {
+        "unknown product",
+        "quantity must be zero or more",
+        "product_id and quantity must be integers",
+    }
+    assert quantities(store) == {products[0].id: 7, products[1].id: 3, products[2].id: 4}
+    assert sent == [sorted([products[0].id, products[2].id])]
+
+
+@pytest.mark.django_db
+def test_bulk_inventory_delta_csv_stream():
+    store, products = stocked_store()
+    feed = "product_id,quantity\n" + "\n".join(
+        f"{pid},{qty}"
+        for pid, qty in [
+            (products[0].id, -4),
+            (products[0].id, -1),  # same product twice: deltas add up
+            (products[1].id, -10),  # clamps at zero
+            (products[4].id, 6),  # not stocked yet: starts from zero
+        ]
+    )
+    resp = APIClient().generic(
+        "POST",
+        reverse("store-inventory-bulk", args=[store.id]) + "?mode=delta",
+        feed.encode(),
+        content_type="text/csv",
+    )
+    assert resp.status_code == 200, resp.data
+    assert quantities(store) == {products[0].id: 5, products[1].id: 0, products[4].id: 6}
+
+    bad = APIClient().generic(
+        "POST", reverse("store-inventory-bulk", args=[store.id]), b"sku,qty\n1,2\n", content_type="text/csv"
+    )
+    assert bad.status_code == 400
+
+
+@pytest.mark.django_db
+def test_bulk_inventory_rejects_out_of_range_values_and_clamps_deltas():
+    from apps.stores.services import MAX_QUANTITY
+
+    store, products = stocked_store()
+    url = reverse("store-inventory-bulk", args=[store.id])
+    body = {
+        "mode": "set",
+        "updates": [
+            {"product_id": products[0].id, "quantity": 10**20},
+            {"product_id": 10**20, "quantity": 1},
+            {"product_id": products[2].id, "quantity": MAX_QUANTITY},
+        ],
+    }
+    resp = APIClient().post(url, body, format="json")
+    assert resp.status_code == 200, resp.data
+    assert resp.data["applied"] == 1 and resp.data["rejected"] == 2
+    assert {e["error"] for e in resp.data["errors"]} == {"unknown product", f"quantity must be at most {MAX_QUANTITY}"}
+
+    # deltas adding up past the column's range stop at its top
+    feed = "product_id,quantity\n" + f"{products[2].id},{MAX_QUANTITY}\n" * 3 + f"{products[0].id},{MAX_QUANTITY}\n"
+    resp = APIClient().generic("POST", url + "?mode=delta", feed.encode(), content_type="text/csv")
+    assert resp.status_code == 200, resp.data
+    assert quantities(store) == {products[0].id: MAX_QUANTITY, products[1].id: 3, products[2].id: MAX_QUANTITY}
+
+
+@pytest.mark.django_db
+def test_bulk_inventory_rejects_rows_that_are_not_utf8():
+    store, products = stocked_store()
+    feed = b"product_id,quantity\n%d,\xff\xfe\n%d,7\n" % (products[0].id, products[2].id)
+    resp = APIClient().generic(
+        "POST", reverse("store-inventory-bulk", args=[store.id]), feed, content_type="text/csv"
+    )
+    assert resp.status_code == 200, resp.data
+    assert resp.data["applied"] == 1 and resp.data["rejected"] == 1
+    assert resp.data["errors"][0]["line"] == 2
+    assert quantities(store) == {products[0].id: 10, products[1].id: 3, products[2].id: 7}
+
+    ndjson = b'{"product_id": %d, "quantity": 1}\n{"product_id": 1, "quantity": "\xc3"}\n' % products[3].id
+    resp = APIClient().generic(
+        "POST", reverse("store-inventory-bulk", args=[store.id]), ndjson, content_type="application/x-ndjson"
+    )
+    assert resp.status_code == 200, resp.data
+    assert resp.data["applied"] == 1 and resp.data["rejected"] == 1
+
+
+@pytest.mark.django_db
+def test_bulk_inventory_command_reads_ndjson(tmp_path):
+    import io
+    import json
+
+    from django.core.management import call_command
+
+    store, products = stocked_store()
+    feed = tmp_path / "feed.ndjson"
+    feed.write_text("\n".join(json.dumps({"product_id": p.id, "quantity": 2}) for p in products) + "\n")
+    out = io.StringIO()
+    call_command("bulk_inventory", store.id, str(feed), "--mode", "delta", "--chunk-size", "2", stdout=out)
+
+    assert "Updated 5 products from 5 rows (delta, 0 rejected) in 3 chunks" in out.getvalue()
+    assert quantities(store) == {
+        products[0].id: 12,
+        products[1].id: 5,
+        products[2].id: 2,
+        products[3].id: 2,
+        products[4].id: 2,
+    }
+
+
+def availability(store):
+    from apps.stores.models import StoreProductAvailability
+
+    return {
+        row.product_id: (row.title, str(row.price), row.category_name, row.quantity)
+        for row in StoreProductAvailability.objects.filter(store=store)
+    }
+
+
+@pytest.mark.django_db
+def test_availability_read_model_follows_writes(settings, django_capture_on_commit_callbacks):
+    import io
+
+    from django.core.management import call_command
+
+    settings.AVAILABILITY_READ_MODEL = True
+    store, products = stocked_store()
+    assert availability(store) == {
+        products[0].id: ("Feed 0", "1.00", "Feed", 10),
+        products[1].id: ("Feed 1", "1.00", "Feed", 3),
+    }
+
+    # product and category edits
+    products[0].title, products[0].price = "Renamed", 2
+    products[0].save()
+    products[0].category.name = "Bulk"
+    products[0].category.save()
+    assert availability(store)[products[0].id] == ("Renamed", "2.00", "Bulk", 10)
+
+    # order stock deduction (queryset update, no Inventory.save())
+    body = {"store_id": store.id, "items": [{"product_id": products[1].id, "quantity_requested": 2}]}
+    with django_capture_on_commit_callbacks(execute=True):
+        assert APIClient().post(reverse("order-create"), body, format="json").status_code == 201
+    assert availability(store)[products[1].id][3] == 1
+
+    # bulk feed (upsert, no Inventory.save())
+    feed = {"updates": [{"product_id": products[2].id, "quantity": 5}]}
+    APIClient().post(reverse("store-inventory-bulk", args=[store.id]), feed, format="json")
+    assert availability(store)[products[2].id] == ("Feed 2", "1.00", "Bulk", 5)
+
+    # deletes cascade
+    Inventory.objects.filter(store=store, product=products[1]).delete()
+    assert products[1].id not in availability(store)
+
+    synced = availability(store)
+    call_command("rebuild_availability", "--store", str(store.id), stdout=io.StringIO())
+    assert availability(store) == synced
+
+
+@pytest.mark.django_db
+def test_availability_is_not_written_while_disabled():
+    import io
+
+    from django.core.management import call_command
+
+    store, products = stocked_store()
+    assert availability(store) == {}
+    call_command("rebuild_availability", stdout=io.StringIO())
+    assert set(availability(store)) == {products[0].id, products[1].id}
+
+
+@pytest.mark.django_db
+@pytest.mark.parametrize("fast", [True, False])
+def test_store_inventory_listing_from_read_model(settings, django_assert_num_queries, fast):
+    import io
+
+    from django.core.management import call_command
+
+    settings.FAST_SERIALIZERS = fast
+    client = APIClient()
+    store = Store.objects.create(name="S1")
+    cat = Category.objects.create(name="Cat1")
+    for i in range(5):
+        product = Product.objects.create(title=f"Item {i % 2}", price=10 + i, category=cat)
+        Inventory.objects.create(store=store, product=product, quantity=i)
+    url = reverse("store-inventory", args=[store.id])
+    expected = client.get(url).json()
+
+    settings.AVAILABILITY_READ_MODEL = True
+    call_command("rebuild_availability", stdout=io.StringIO())
+    with django_assert_num_queries(2):
+        assert client.get(url).json() == expected
+
+    rows = []
+    resp = client.get(url, {"paginate": "cursor", "page_size": 2}).json()
+    while True:
+        rows.extend(resp["results"])
+        if not resp["next"]:
+            break
+        resp = client.get(resp["next"]).json()
+    assert rows == expected["results"]